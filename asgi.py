@@ -0,0 +1,3 @@
+from department_app.aio import create_asgi_app
+
+app = create_asgi_app()
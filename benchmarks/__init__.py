@@ -0,0 +1,19 @@
+"""Benchmarks of the application, not a part of the installed package."""
+import os
+
+from config import Config
+from department_app import create_app
+
+
+def create_benchmark_app(database_url="sqlite://"):
+    """
+    Create the application with the database from DATABASE_URL.
+    Config reads DATABASE_URL when it is imported, so the default
+    is applied with a subclass instead of setting the variable.
+    :param database_url: The database url used if DATABASE_URL is not set.
+    """
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", database_url)
+
+    return create_app(BenchmarkConfig)
@@ -0,0 +1,73 @@
+"""
+Benchmark of the JSON representation of the REST-API responses: the time
+output_json takes to make the response of a large employees list with every
+available encoder, against the default representation of Flask-RESTful.
+
+Usage (an in-memory SQLite database is used if DATABASE_URL is not set):
+
+    python -m benchmarks.json_encoding --employees 20000 --repeat 5
+"""
+import argparse
+import time
+
+from flask_restful.representations.json import output_json as restful_output_json
+
+from benchmarks import create_benchmark_app
+from department_app.models import db
+from department_app.models.insert_data import seed_db
+from department_app.rest.representations import ENCODERS, output_json
+from department_app.rest.serializers import serialize_employees
+from department_app.service import (
+    EMPLOYEE_FIELDS,
+    DepartmentServices,
+    EmployeeServices,
+)
+
+
+def best_time(function, repeat):
+    """:return: the shortest of "repeat" runs of the function in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    """Parse the arguments and print the encoding speed of every encoder."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--departments", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = create_benchmark_app()
+    with app.test_request_context():
+        db.create_all()
+        if not EmployeeServices.get_all(limit=1):
+            seed_db(args.departments, args.employees)
+        data = serialize_employees(
+            EmployeeServices.get_fields(EMPLOYEE_FIELDS, limit=args.employees),
+            DepartmentServices.get_salary_stats(),
+        )
+        size = len(output_json(data, 200).data)
+        results = {
+            "flask-restful default": best_time(
+                lambda: restful_output_json(data, 200), args.repeat
+            )
+        }
+        for name in sorted(set(ENCODERS) - {"auto"}):
+            app.config["API_JSON_ENCODER"] = name
+            results[name] = best_time(lambda: output_json(data, 200), args.repeat)
+    print(f"{len(data)} employees, {size / 1024:.0f} KiB, best of {args.repeat} runs")
+    baseline = results["flask-restful default"]
+    for name, seconds in results.items():
+        print(
+            f"{name:<24} {seconds * 1000:>8.1f} ms"
+            f" {size / seconds / 2 ** 20:>8.0f} MiB/s {baseline / seconds:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+Load test of the REST-API and the html views: seeds a data set, then runs
+every scenario (see scenarios) with concurrent clients and reports latency
+percentiles, requests per second and SQL statements per request.
+
+Usage (the Flask test client and a temporary SQLite database by default):
+
+    python -m benchmarks.load --employees 10000 --requests 500 --concurrency 8
+
+    # against the gunicorn server from install_and_run.sh, seeding its database
+    python -m benchmarks.load --target http://127.0.0.1:5000
+
+    # compare with a previous run, exit with status 1 on regressions
+    python -m benchmarks.load --compare benchmarks/results/load-previous.json
+"""
@@ -0,0 +1,164 @@
+"""Command line entry point of the load test, see benchmarks.load."""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks import create_benchmark_app
+from benchmarks.load import __doc__ as description
+from benchmarks.load.runner import compare, run_scenario
+from benchmarks.load.scenarios import SCENARIOS, DataSet
+from benchmarks.load.transports import HttpTransport, TestClientTransport
+from config import Config
+from department_app.models import db
+from department_app.models.insert_data import clear_db, seed_db
+from department_app.service import DepartmentServices, EmployeeServices
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results")
+
+
+def parse_args(argv=None):
+    """:return: The parsed command line arguments."""
+    parser = argparse.ArgumentParser(
+        description=description.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--target",
+        default="test-client",
+        help='"test-client" or the url of a server, e.g. "http://127.0.0.1:5000".',
+    )
+    parser.add_argument("--departments", type=int, default=100)
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--reseed", action="store_true", help="Replace the data of a non-empty DB."
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Per scenario.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--warmup", type=int, default=20, help="Untimed requests per scenario."
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="Comma separated names of the scenarios to run, all by default.",
+    )
+    parser.add_argument(
+        "--output", help="The json file of results, in benchmarks/results by default."
+    )
+    parser.add_argument("--compare", help="The json file of a previous run.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="The allowed relative change of p95 latency and req/s.",
+    )
+    args = parser.parse_args(argv)
+    args.scenarios = args.scenarios.split(",")
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def prepare_data(args):
+    """
+    Seed the database from DATABASE_URL if it is empty (or --reseed is given).
+    :return: The application and the DataSet with the ids of the seeded data.
+    """
+    if args.target == "test-client":
+        app = create_benchmark_app(
+            "sqlite:///" + os.path.join(tempfile.mkdtemp(), "load.db")
+        )
+    else:
+        app = create_benchmark_app(Config.SQLALCHEMY_DATABASE_URI)
+    with app.app_context():
+        db.create_all()
+        if args.reseed:
+            clear_db()
+        if args.reseed or not EmployeeServices.get_all(limit=1):
+            seed_db(args.departments, args.employees, args.seed)
+        data = DataSet(
+            [row.id for row in DepartmentServices.get_rows()],
+            [row.id for row in EmployeeServices.get_fields(["id"])],
+        )
+    return app, data
+
+
+def create_employees(transport, data, number, rng):
+    """Create employees for the "delete" scenario."""
+    for _ in range(number):
+        reply = transport.send(SCENARIOS["create"](rng, data))
+        data.to_delete.append(json.loads(reply.body)["id"])
+
+
+def main(argv=None):
+    """Run the scenarios, print and save the results."""
+    args = parse_args(argv)
+    app, data = prepare_data(args)
+    if args.target == "test-client":
+        transport = TestClientTransport(app)
+    else:
+        transport = HttpTransport(args.target, args.concurrency)
+
+    results = {
+        "target": args.target,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "options": {
+            name: getattr(args, name)
+            for name in ("departments", "employees", "seed", "requests", "concurrency")
+        },
+        "scenarios": {},
+    }
+    print(
+        f"{'scenario':<18} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        f" {'errors':>7} {'sql/req':>8}"
+    )
+    try:
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            if name == "delete":
+                create_employees(
+                    transport, data, args.requests + args.warmup, random.Random(0)
+                )
+            if args.warmup:
+                run_scenario(transport, scenario, data, args.warmup, args.concurrency)
+            result = run_scenario(
+                transport, scenario, data, args.requests, args.concurrency, args.seed
+            )
+            results["scenarios"][name] = result
+            latency, statements = result["latency_ms"], result["sql_statements"]
+            print(
+                f"{name:<18} {result['rps']:>8} {latency['p50']:>8} {latency['p95']:>8}"
+                f" {latency['p99']:>8} {result['errors']:>7}"
+                f" {'-' if statements is None else statements:>8}"
+            )
+    finally:
+        transport.close()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results saved to {os.path.normpath(output)}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
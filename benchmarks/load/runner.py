@@ -0,0 +1,106 @@
+"""
+Module contains the runner of the load test scenarios and the statistics
+of the results: latency percentiles, requests per second and the number
+of SQL statements per request.
+"""
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, percent):
+    """
+    :param values: Sorted values.
+    :param percent: The percentile, from 0 to 100.
+    :return: The nearest-rank percentile of the values.
+    """
+    if not values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(latencies, statements, errors, elapsed, concurrency):
+    """
+    :param latencies: Latencies of the requests in seconds.
+    :param statements: Numbers of SQL statements of the requests, None if unknown.
+    :param errors: The number of failed requests.
+    :param elapsed: Wall time of the run in seconds.
+    :return: A json-serializable dict with the statistics of a scenario run.
+    """
+    latencies = sorted(latencies)
+    counted = [count for count in statements if count is not None]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            name: round(percentile(latencies, percent) * 1000, 2)
+            for name, percent in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "sql_statements": round(sum(counted) / len(counted), 2) if counted else None,
+    }
+
+
+def run_scenario(transport, scenario, data, requests, concurrency, seed=0):
+    """
+    Send the requests of a scenario from concurrent clients.
+    :param transport: The transport to send the requests with.
+    :param scenario: A function making a Request from a random generator
+    and the DataSet.
+    :param requests: The total number of requests to send.
+    :param concurrency: The number of clients sending requests at the same time.
+    :param seed: The seed of the random generators of the clients.
+    :return: The statistics of the run (see summarize).
+    """
+    latencies, statements = [], []
+    errors = 0
+    lock = threading.Lock()
+
+    def client(number):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + number)
+        for _ in range(number, requests, concurrency):
+            request = scenario(rng, data)
+            start = time.perf_counter()
+            try:
+                reply = transport.send(request)
+            except Exception:  # pylint: disable=W0703
+                reply = None
+            latency = time.perf_counter() - start
+            with lock:
+                latencies.append(latency)
+                if reply is None or reply.status >= 400:
+                    errors += 1
+                statements.append(reply and reply.statements)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, statements, errors, elapsed, concurrency)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare the results of a run with the results of a previous run.
+    :param tolerance: The allowed relative change, e.g. 0.2 for 20%.
+    :return: The list of regressions: descriptions of the scenarios whose p95
+    latency grew or whose requests per second fell by more than the tolerance.
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        before, after = previous["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        if after > before * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before} ms -> {after} ms")
+        before, after = previous["rps"], result["rps"]
+        if before and after < before * (1 - tolerance):
+            regressions.append(f"{name}: {before} req/s -> {after} req/s")
+    return regressions
@@ -0,0 +1,143 @@
+"""
+Module contains the scenarios of the load test: every scenario makes
+the requests to one endpoint, with ids and parameters picked at random
+from the seeded data set.
+"""
+import collections
+import threading
+from datetime import date, timedelta
+
+from department_app.models.insert_data import BIRTH_DATES_RANGE, FIRST_BIRTH_DATE
+
+Request = collections.namedtuple("Request", "method url json", defaults=(None,))
+
+
+class DataSet:
+    """
+    The ids the scenarios pick from. Employees to delete are created
+    before the "delete" scenario is run, every one is deleted once.
+    """
+
+    def __init__(self, department_ids, employee_ids):
+        self.department_ids = department_ids
+        self.employee_ids = employee_ids
+        self.to_delete = collections.deque()
+        self.lock = threading.Lock()
+
+    def pop_deleted(self):
+        """:return: The id of an employee to delete."""
+        with self.lock:
+            return self.to_delete.popleft()
+
+
+def new_employee(rng, data):
+    """:return: The json of a random new employee."""
+    born = FIRST_BIRTH_DATE + timedelta(days=rng.randrange(BIRTH_DATES_RANGE))
+    return {
+        "name": f"Load Test Employee {rng.randrange(10 ** 6)}",
+        "date_of_birth": born.isoformat(),
+        "salary": rng.randrange(500, 10000),
+        "department_id": rng.choice(data.department_ids),
+    }
+
+
+def departments_list(rng, data):
+    """GET all departments."""
+    return Request("GET", "/api/v1/departments")
+
+
+def department_detail(rng, data):
+    """GET a random department."""
+    return Request("GET", f"/api/v1/departments/{rng.choice(data.department_ids)}")
+
+
+def salary_stats(rng, data):
+    """GET the salary distribution of a random department."""
+    dep_id = rng.choice(data.department_ids)
+    return Request("GET", f"/api/v1/departments/{dep_id}/stats")
+
+
+def employees_list(rng, data):
+    """GET a page of employees starting after a random id."""
+    after = rng.choice(data.employee_ids)
+    return Request("GET", f"/api/v1/employees?limit=100&after={after}")
+
+
+def employee_detail(rng, data):
+    """GET a random employee."""
+    return Request("GET", f"/api/v1/employees/{rng.choice(data.employee_ids)}")
+
+
+def search(rng, data):
+    """Search employees born in a random 30 days interval."""
+    start = FIRST_BIRTH_DATE + timedelta(days=rng.randrange(BIRTH_DATES_RANGE))
+    end = start + timedelta(days=30)
+    return Request(
+        "GET",
+        f"/api/v1/employees/search?date_of_birth={start}&date_for_interval={end}",
+    )
+
+
+def birthday_search(rng, data):
+    """Search employees with birthdays in a random week of the year."""
+    start = date(2001, 1, 1) + timedelta(days=rng.randrange(365))
+    end = start + timedelta(days=7)
+    return Request(
+        "GET",
+        "/api/v1/employees/search"
+        f"?birthday_from={start:%m-%d}&birthday_to={end:%m-%d}",
+    )
+
+
+def create(rng, data):
+    """POST a new random employee."""
+    return Request("POST", "/api/v1/employees", new_employee(rng, data))
+
+
+def patch(rng, data):
+    """PATCH the salary of a random employee."""
+    return Request(
+        "PATCH",
+        f"/api/v1/employees/{rng.choice(data.employee_ids)}",
+        {"salary": rng.randrange(500, 10000)},
+    )
+
+
+def delete(rng, data):
+    """DELETE one of the employees created for the scenario."""
+    return Request("DELETE", f"/api/v1/employees/{data.pop_deleted()}")
+
+
+def departments_view(rng, data):
+    """GET the html page of all departments."""
+    return Request("GET", "/departments")
+
+
+def department_view(rng, data):
+    """GET the html page of a random department."""
+    return Request("GET", f"/departments/{rng.choice(data.department_ids)}")
+
+
+def employees_view(rng, data):
+    """GET the html page of all employees."""
+    return Request("GET", "/employees")
+
+
+SCENARIOS = {
+    scenario.__name__: scenario
+    for scenario in (
+        departments_list,
+        department_detail,
+        salary_stats,
+        employees_list,
+        employee_detail,
+        search,
+        birthday_search,
+        create,
+        patch,
+        delete,
+        departments_view,
+        department_view,
+        employees_view,
+    )
+}
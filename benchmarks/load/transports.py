@@ -0,0 +1,81 @@
+"""
+Module contains the transports the load test sends requests with:
+the Flask test client, calling the application in the same process, and
+an HTTP client for a running server (e.g. gunicorn from install_and_run.sh).
+"""
+import collections
+import re
+import threading
+
+from sqlalchemy import event
+
+from department_app.models import db
+from department_app.views.client import ApiClient
+
+Reply = collections.namedtuple("Reply", "status body statements")
+STATEMENTS = re.compile(r'db;dur=[\d.]+;desc="(\d+) statements"')
+
+
+class TestClientTransport:
+    """
+    Sends requests with the Flask test client, one client per thread.
+    Counts the SQL statements executed for every request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+        with app.app_context():
+            self.engine = db.engine
+        event.listen(self.engine, "before_cursor_execute", self.count_statement)
+
+    def count_statement(self, *args):
+        """Count a statement executed by the current thread."""
+        self.local.statements = getattr(self.local, "statements", 0) + 1
+
+    @property
+    def client(self):
+        """The test client of the current thread."""
+        if not hasattr(self.local, "client"):
+            self.local.client = self.app.test_client()
+        return self.local.client
+
+    def send(self, request):
+        """
+        :param request: The scenario Request to send.
+        :return: Reply with the status, the body and the number of statements.
+        """
+        self.local.statements = 0
+        response = self.client.open(
+            request.url, method=request.method, json=request.json
+        )
+        return Reply(response.status_code, response.data, self.local.statements)
+
+    def close(self):
+        """Stop counting statements."""
+        event.remove(self.engine, "before_cursor_execute", self.count_statement)
+
+
+class HttpTransport:
+    """
+    Sends requests to a running server over kept-alive connections.
+    The number of statements is taken from the "Server-Timing" header.
+    """
+
+    def __init__(self, base_url, pool_size):
+        self.client = ApiClient(base_url, pool_size=pool_size, retries=0)
+
+    def send(self, request):
+        """
+        :param request: The scenario Request to send.
+        :return: Reply with the status, the body and the number of statements,
+        None if the server does not report it.
+        """
+        response = self.client.request(request.method, request.url, json=request.json)
+        match = STATEMENTS.match(response.headers.get("Server-Timing", ""))
+        statements = int(match.group(1)) if match else None
+        return Reply(response.status_code, response.content, statements)
+
+    def close(self):
+        """Close the connections."""
+        self.client.close()
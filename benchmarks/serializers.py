@@ -0,0 +1,92 @@
+"""
+Microbenchmark of the employees list read path: ORM objects serialized with
+EmployeeSchema against plain rows serialized with the fast serializers
+(see department_app.rest.serializers). Both the whole read (query and
+serialization) and the serialization alone are measured, in rows per second.
+
+Usage (an in-memory SQLite database is used if DATABASE_URL is not set):
+
+    python -m benchmarks.serializers --employees 20000 --repeat 5
+"""
+import argparse
+import time
+
+from benchmarks import create_benchmark_app
+from department_app.models import db
+from department_app.models.insert_data import seed_db
+from department_app.rest.schemas import EmployeeSchema
+from department_app.rest.serializers import serialize_employees
+from department_app.service import (
+    EMPLOYEE_FIELDS,
+    WITH_DEPARTMENT,
+    DepartmentServices,
+    EmployeeServices,
+)
+
+
+def best_time(function, repeat, expire=True):
+    """
+    :param expire: Expire the ORM objects in the session before every run,
+    so they are loaded again.
+    :return: the shortest of "repeat" runs of the function in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        if expire:
+            db.session.expire_all()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    """Parse the arguments and print the rows per second of both read paths."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--departments", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = create_benchmark_app()
+    with app.app_context():
+        db.create_all()
+        if not EmployeeServices.get_all(limit=1):
+            seed_db(args.departments, args.employees)
+        count = len(EmployeeServices.get_fields(["id"], limit=args.employees))
+        stats = DepartmentServices.get_salary_stats()
+        schema = EmployeeSchema(context={"salary_stats": stats})
+
+        def orm_objects():
+            return EmployeeServices.get_all(
+                options=[WITH_DEPARTMENT], limit=args.employees
+            )
+
+        def rows():
+            return EmployeeServices.get_fields(EMPLOYEE_FIELDS, limit=args.employees)
+
+        employees, selected = orm_objects(), rows()
+        results = {
+            "marshmallow, query + dump": best_time(
+                lambda: schema.dump(orm_objects(), many=True), args.repeat
+            ),
+            "fast, query + dump": best_time(
+                lambda: serialize_employees(rows(), stats), args.repeat
+            ),
+            "marshmallow, dump only": best_time(
+                lambda: schema.dump(employees, many=True), args.repeat, expire=False
+            ),
+            "fast, dump only": best_time(
+                lambda: serialize_employees(selected, stats), args.repeat, expire=False
+            ),
+        }
+    print(f"{count} employees, best of {args.repeat} runs")
+    for name, seconds in results.items():
+        print(f"{name:<28} {count / seconds:>12,.0f} rows/s")
+    for part in ("query + dump", "dump only"):
+        gain = results[f"marshmallow, {part}"] / results[f"fast, {part}"]
+        print(f"gain, {part}: {gain:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark of the serving modes: gunicorn sync workers (wsgi.py) against
+uvicorn serving the ASGI mode (asgi.py) with the same number of worker
+processes. Every mode is started on the database from DATABASE_URL and
+the load test (see benchmarks.load) is run against it at every concurrency,
+the requests per second and the latency percentiles are printed side by side.
+
+With --views-backend http the html views call the REST-API of a separate
+gunicorn server, so the measured views mostly wait for I/O.
+
+Usage (needs gunicorn and uvicorn, and aiosqlite or asyncpg):
+
+    python -m benchmarks.serving --workers 4 --concurrency 8,64,256 \\
+        --scenarios department_detail,employees_list,departments_view
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+MODES = {
+    "sync": "gunicorn --workers {workers} --bind 127.0.0.1:{port} wsgi:app",
+    "asgi": "uvicorn --workers {workers} --port {port} --log-level warning asgi:app",
+}
+API_PORT_OFFSET = 1
+
+
+def parse_args(argv=None):
+    """:return: The parsed command line arguments."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--concurrency",
+        default="8,64,256",
+        help="Comma separated numbers of concurrent clients.",
+    )
+    parser.add_argument("--requests", type=int, default=500, help="Per scenario.")
+    parser.add_argument(
+        "--scenarios", default="department_detail,employees_list,departments_view"
+    )
+    parser.add_argument(
+        "--views-backend", choices=("service", "http"), default="service"
+    )
+    parser.add_argument("--port", type=int, default=5090)
+    args = parser.parse_args(argv)
+    args.modes = args.modes.split(",")
+    args.concurrency = [int(number) for number in args.concurrency.split(",")]
+    return args
+
+
+def start_server(command, port, env):
+    """
+    Start a server and wait until it answers.
+    :return: The server process.
+    """
+    process = subprocess.Popen(command.split(), env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/api/v1/departments?limit=1")
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{command!r} did not start in 30 seconds")
+
+
+def stop_server(process):
+    """Stop a server started with start_server."""
+    process.terminate()
+    process.wait(timeout=30)
+
+
+def run_load(args, port, concurrency):
+    """
+    Run the load test against a server.
+    :return: The results of the scenarios (see benchmarks.load.runner).
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json") as output:
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.load",
+                f"--target=http://127.0.0.1:{port}",
+                f"--requests={args.requests}",
+                f"--concurrency={concurrency}",
+                f"--scenarios={args.scenarios}",
+                f"--output={output.name}",
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        return json.load(output)["scenarios"]
+
+
+def main(argv=None):
+    """Benchmark the serving modes and print the results."""
+    args = parse_args(argv)
+    env = dict(os.environ, VIEWS_BACKEND=args.views_backend)
+    api = None
+    if args.views_backend == "http":
+        api_port = args.port + API_PORT_OFFSET
+        api = start_server(
+            MODES["sync"].format(workers=args.workers, port=api_port), api_port, env
+        )
+        env["API_BASE_URL"] = f"http://127.0.0.1:{api_port}"
+    results = {}
+    try:
+        for mode in args.modes:
+            server = start_server(
+                MODES[mode].format(workers=args.workers, port=args.port), args.port, env
+            )
+            try:
+                for concurrency in args.concurrency:
+                    results[mode, concurrency] = run_load(args, args.port, concurrency)
+            finally:
+                stop_server(server)
+    finally:
+        if api is not None:
+            stop_server(api)
+
+    print(
+        f"{'scenario':<18} {'clients':>7}"
+        + "".join(f" {mode + ' req/s':>11} {mode + ' p99':>9}" for mode in args.modes)
+    )
+    for scenario in args.scenarios.split(","):
+        for concurrency in args.concurrency:
+            line = f"{scenario:<18} {concurrency:>7}"
+            for mode in args.modes:
+                result = results[mode, concurrency][scenario]
+                line += f" {result['rps']:>11} {result['latency_ms']['p99']:>9}"
+                if result["errors"]:
+                    line += f" ({result['errors']} errors)"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,88 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv(
         "DATABASE_URL", "sqlite:///" + os.path.join(BASE_DIR, "department_app.db")
     )
+    # The database url of the ASGI mode (see asgi.py), by default DATABASE_URL
+    # with the asyncio driver of the database (aiosqlite, asyncpg).
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+    # Read replicas of the database (comma separated urls): GET requests read
+    # from them, except for REPLICA_STICKY_SECONDS after a write of the client.
+    DATABASE_REPLICA_URLS = [
+        url.strip()
+        for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # The connection pool of the engine (see department_app.models.engine):
+    # the kept connections, the extra ones opened under load, the seconds to
+    # wait for a free one, the age in seconds after which a connection is
+    # replaced (-1 - never) and whether connections are tested on checkout.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0").lower() in ("1", "true")
+    # Pragmas set on every new SQLite connection, foreign keys are always on.
+    # cache_size is in pages, or in KiB if negative, mmap_size in bytes.
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     SECRET_KEY = "arealybigsecret"
+    API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+    API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    API_BULK_MAX_ITEMS = int(os.getenv("API_BULK_MAX_ITEMS", "50000"))
+    # "auto" - orjson if installed, else the stdlib json module
+    API_JSON_ENCODER = os.getenv("API_JSON_ENCODER", "auto")
+    # Defaults of the salary stats endpoints: the percentiles (0-100) and the
+    # width of the histogram buckets, histograms with more buckets than
+    # SALARY_HISTOGRAM_MAX_BUCKETS are refused.
+    SALARY_PERCENTILES = [
+        float(percentile)
+        for percentile in os.getenv("SALARY_PERCENTILES", "50,90").split(",")
+        if percentile.strip()
+    ]
+    SALARY_HISTOGRAM_BUCKET_WIDTH = int(
+        os.getenv("SALARY_HISTOGRAM_BUCKET_WIDTH", "1000")
+    )
+    SALARY_HISTOGRAM_MAX_BUCKETS = int(os.getenv("SALARY_HISTOGRAM_MAX_BUCKETS", "1000"))
+    # Statements running longer than this number of seconds are logged with
+    # their parameters and query plans (SQLite, PostgreSQL), 0 - disabled.
+    SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD", "0.5"))
+    # Profiling of single requests with a token from "flask profile-token":
+    # the stats are saved to PROFILER_DIR or returned inline.
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0").lower() in ("1", "true")
+    PROFILER_DIR = os.getenv("PROFILER_DIR", os.path.join("log", "profiles"))
+    PROFILER_TOKEN_MAX_AGE = int(os.getenv("PROFILER_TOKEN_MAX_AGE", "3600"))
+    PROFILER_SORT = os.getenv("PROFILER_SORT", "cumulative")
+    PROFILER_RESTRICTIONS = int(os.getenv("PROFILER_RESTRICTIONS", "40"))
+    # Response compression: the accepted encodings in the order of preference
+    # ("br" needs the brotli package, empty - disabled), the minimal size of
+    # compressed bodies in bytes (streamed bodies are always compressed),
+    # the gzip level (1-9) and the brotli quality (0-11).
+    COMPRESS_ENCODINGS = [
+        encoding.strip()
+        for encoding in os.getenv("COMPRESS_ENCODINGS", "br,gzip").split(",")
+        if encoding.strip()
+    ]
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+    # Response cache of the REST-API: "lru" - in-process, "shared" - shared
+    # by all application instances, "null" - disabled.
+    CACHE_TYPE = os.getenv("CACHE_TYPE", "lru")
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_DEFAULT_TIMEOUT", "30"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    # "service" - views call the service layer in-process,
+    # "http" - views call the REST-API of a separately deployed service.
+    VIEWS_BACKEND = os.getenv("VIEWS_BACKEND", "service")
+    # Settings of the HTTP client used by the "http" views backend.
+    API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:5000")
+    API_CLIENT_POOL_SIZE = int(os.getenv("WEB_CONCURRENCY", "4"))
+    API_CLIENT_CONNECT_TIMEOUT = float(os.getenv("API_CLIENT_CONNECT_TIMEOUT", "3.05"))
+    API_CLIENT_READ_TIMEOUT = float(os.getenv("API_CLIENT_READ_TIMEOUT", "10"))
+    API_CLIENT_RETRIES = int(os.getenv("API_CLIENT_RETRIES", "2"))
 
 
 class TestConfig(Config):
@@ -5,7 +5,13 @@ from logging.handlers import RotatingFileHandler
 from flask import Flask
 from flask_migrate import Migrate
 from config import Config
+from .cache import cache
+from .compression import compression
+from .instrumentation import instrumentation
+from .profiler import ProfilerMiddleware
+from .replicas import replica_routing
 from .models import db
+from .models.engine import configure_engine, engine_options
 from flask_bootstrap import Bootstrap
 
 bootstrap = Bootstrap()
@@ -23,10 +29,18 @@ def create_app(config_class=Config):
     """
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
     db.init_app(app)
+    replica_routing.init_app(app)
     migrate.init_app(app, db)
     bootstrap.init_app(app)
+    cache.init_app(app)
+    # registered before compression, so its after_request hook runs last
+    instrumentation.init_app(app)
+    compression.init_app(app)
+    app.wsgi_app = ProfilerMiddleware(app.wsgi_app, app)
     with app.app_context():
+        configure_engine(db.engine, app.config)
         from department_app.rest import api
 
         api.init_app(app)
@@ -36,6 +50,9 @@ def create_app(config_class=Config):
         from department_app.errors import bp as errors_bp
 
         app.register_blueprint(errors_bp)
+        from department_app import cli
+
+        cli.init_app(app)
 
     if not app.debug and not app.testing:
         if not os.path.exists("log"):
@@ -51,5 +68,15 @@ def create_app(config_class=Config):
         file_handler.setLevel(logging.DEBUG)
         app.logger.addHandler(file_handler)
         app.logger.setLevel(logging.DEBUG)
+        # request lines go to their own file, so they do not rotate out
+        # the warnings and errors of log/departments.log
+        access_logger = app.logger.getChild("access")
+        if not access_logger.handlers:
+            access_handler = RotatingFileHandler(
+                "log/access.log", maxBytes=1024 * 1024, backupCount=5
+            )
+            access_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            access_logger.addHandler(access_handler)
+        access_logger.propagate = False
 
     return app
@@ -0,0 +1,213 @@
+"""
+Module contains the ASGI serving mode of the application (see asgi.py).
+
+Flask 1.1 views can not be coroutines, so the application is served by
+an event loop the way SQLAlchemy's asyncio extension runs the ORM: every
+request is handled by the unchanged WSGI application in its own greenlet,
+and the database is accessed with an asyncio driver (aiosqlite, asyncpg).
+When a statement waits for the database the greenlet switches back to
+the event loop, which meanwhile serves other requests, so the number of
+requests in flight is not bound by a number of threads. Flask contexts and
+the Flask-SQLAlchemy session are greenlet-local, since Werkzeug identifies
+contexts by greenlet when the greenlet package is installed.
+
+Blocking calls other than the database (the HTTP client of the "http" views
+backend) go through run_blocking, which runs them in the default executor
+of the loop in ASGI mode.
+"""
+import asyncio
+import io
+import sys
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.util import await_only, greenlet_spawn
+
+from config import Config
+from department_app import create_app
+from department_app.models import db
+
+# The asyncio drivers of the databases, see async_database_url.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url):
+    """
+    :param url: A database url, e.g. "postgresql://user:password@db/departments".
+    :return: The url with the asyncio driver of the database, e.g.
+    "postgresql+asyncpg://user:password@db/departments".
+    :raise ValueError: if there is no asyncio driver for the database.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver for {backend!r} databases")
+    if url.get_dialect().is_async:
+        return str(url)
+    return str(url.set(drivername=ASYNC_DRIVERS[backend]))
+
+
+def run_blocking(function, *args, **kwargs):
+    """
+    Call a blocking function. In a greenlet of an ASGI request it runs in
+    the default executor of the event loop, so other requests are served
+    while it blocks, otherwise it is just called.
+    :return: The result of the function.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return function(*args, **kwargs)
+    return await_only(loop.run_in_executor(None, lambda: function(*args, **kwargs)))
+
+
+def build_environ(scope, body):
+    """
+    :param scope: The scope of an ASGI HTTP request.
+    :param body: The body of the request.
+    :return: The WSGI environ of the request.
+    """
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = map(str, scope["client"])
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_LENGTH", "CONTENT_TYPE"):
+            key = "HTTP_" + key
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # the body is read whole, including chunked bodies without the header
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return environ
+
+
+class AsgiApp:
+    """ASGI application serving a Flask application in greenlets."""
+
+    def __init__(self, app):
+        """
+        :param app: The Flask application, its database engine should
+        use an asyncio driver.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            body = bytearray()
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+            environ = build_environ(scope, bytes(body))
+            await greenlet_spawn(self.handle, environ, send)
+
+    async def lifespan(self, receive, send):
+        """Handle the lifespan messages, the engine is disposed on shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await greenlet_spawn(self.dispose)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def dispose(self):
+        """Close the pooled database connections."""
+        with self.app.app_context():
+            db.engine.dispose()
+        self.app.extensions["replicas"].dispose()
+
+    def handle(self, environ, send):
+        """
+        Call the WSGI application and send its response, run in a greenlet.
+        The body is iterated in the same greenlet as the application was
+        called, so streamed bodies keep their Flask contexts.
+        """
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ]
+
+        def send_start():
+            await_only(
+                send(
+                    {
+                        "type": "http.response.start",
+                        "status": response["status"],
+                        "headers": response["headers"],
+                    }
+                )
+            )
+
+        app_iter = self.app(environ, start_response)
+        try:
+            started = False
+            for chunk in app_iter:
+                if not started:
+                    send_start()
+                    started = True
+                if chunk:
+                    await_only(
+                        send(
+                            {
+                                "type": "http.response.body",
+                                "body": chunk,
+                                "more_body": True,
+                            }
+                        )
+                    )
+            if not started:
+                send_start()
+            await_only(send({"type": "http.response.body", "body": b""}))
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+
+def create_asgi_app(config_class=Config):
+    """
+    Create the application (see create_app) with the database engine using
+    the asyncio driver of ASYNC_DATABASE_URL, or of DATABASE_URL if it is
+    not set, the replicas use the asyncio drivers of their databases too,
+    and wrap it in AsgiApp.
+    :param config_class: a class with configuration data.
+    :return: The ASGI application, the Flask application is its "app".
+    """
+    url = config_class.ASYNC_DATABASE_URL or async_database_url(
+        config_class.SQLALCHEMY_DATABASE_URI
+    )
+    config = type(
+        config_class.__name__,
+        (config_class,),
+        {
+            "SQLALCHEMY_DATABASE_URI": url,
+            "DATABASE_REPLICA_URLS": [
+                async_database_url(replica)
+                for replica in config_class.DATABASE_REPLICA_URLS
+            ],
+        },
+    )
+    return AsgiApp(create_app(config_class=config))
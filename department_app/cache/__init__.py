@@ -0,0 +1,102 @@
+"""
+Module contains the response cache for the read methods of the REST-API
+Resources. Entries are keyed by the ETag of the request (see
+department_app.rest.conditional), made from the url and the versions of
+the tables, so a write made by any process is seen by the next read.
+They are tagged with the data they were built from ("departments",
+"department:<id>", "employees", "employee:<id>"), and the service layer
+invalidates the tags affected by every write to free the stale entries.
+"""
+import functools
+
+from flask import current_app, has_app_context, request
+
+from department_app.cache.backends import LRUCache, NullCache, SharedCache
+from department_app.profiler import PROFILING
+
+# The key of the ETag of the current request in the WSGI environ.
+ETAG = "department_app.etag"
+
+
+class ResponseCache:
+    """Flask extension caching the results of REST-API Resource methods."""
+
+    def init_app(self, app):
+        """
+        Create the cache backend of the application, selected by the
+        CACHE_TYPE config value: "lru", "shared" or "null".
+        """
+        cache_type = app.config["CACHE_TYPE"]
+        if cache_type == "lru":
+            backend = LRUCache(
+                app.config["CACHE_MAX_ENTRIES"], app.config["CACHE_DEFAULT_TIMEOUT"]
+            )
+        elif cache_type == "shared":
+            backend = SharedCache(app.config["CACHE_DEFAULT_TIMEOUT"])
+        elif cache_type == "null":
+            backend = NullCache()
+        else:
+            raise ValueError(f"Unknown CACHE_TYPE {cache_type!r}")
+        app.extensions["cache"] = backend
+
+    @property
+    def backend(self):
+        """The backend of the current application, NullCache outside of apps."""
+        if has_app_context():
+            return current_app.extensions.get("cache") or NullCache()
+        return NullCache()
+
+    def cached(self, tags):
+        """
+        Decorator caching the results of a Resource method with status 200
+        by the ETag of the request set by conditional(), which has to be
+        applied above it, results of requests without an ETag are not cached.
+        The response has the "X-Cache" header set to "HIT" or "MISS".
+        Profiled requests (see department_app.profiler) are never a hit.
+        :param tags: A function called with the result data and the view
+        arguments of the method, returns the tags to store the result with.
+        """
+
+        def decorator(method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                etag = request.environ.get(ETAG)
+                backend = self.backend if etag else NullCache()
+                key = "response:" + str(etag)
+                result = None if request.environ.get(PROFILING) else backend.get(key)
+                if result is not None:
+                    data, status, headers = result
+                    return data, status, dict(headers, **{"X-Cache": "HIT"})
+                data, status, *headers = method(*args, **kwargs)
+                headers = headers[0] if headers else {}
+                if status == 200:
+                    backend.set(key, (data, status, headers), tags(data, **kwargs))
+                return data, status, dict(headers, **{"X-Cache": "MISS"})
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, *tags):
+        """Remove the cached results stored with any of the tags."""
+        self.backend.invalidate(tags)
+
+    def stats(self):
+        """:return: A dict with the numbers of cache hits and misses."""
+        backend = self.backend
+        return {"hits": backend.hits, "misses": backend.misses}
+
+
+def id_tag(name, value):
+    """
+    Make a tag for an entity with id taken from the url,
+    so "/departments/01" and "/departments/1" get the same tag.
+    """
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        pass
+    return f"{name}:{value}"
+
+
+cache = ResponseCache()
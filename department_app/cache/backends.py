@@ -0,0 +1,155 @@
+"""
+Module contains the storage backends of the response cache.
+Every backend stores values under string keys with a time to live and a set
+of tags, so entries can be invalidated by tag, and counts hits and misses.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class NullCache:
+    """Backend that stores nothing, used to disable caching."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """:return: None, the value is never found."""
+        self.misses += 1
+
+    def set(self, key, value, tags=()):
+        """Do nothing."""
+
+    def invalidate(self, tags):
+        """Do nothing."""
+
+    def clear(self):
+        """Do nothing."""
+
+
+class LRUCache:
+    """
+    In-process backend keeping at most "maxsize" entries, the least
+    recently used entries are evicted first. Entries expire "ttl" seconds
+    after they are stored. The backend is shared by the threads of one
+    process only, so with several worker processes a write invalidates
+    the entries of its own process, the others see the change after ttl.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30):
+        """
+        :param maxsize: The maximal number of entries.
+        :param ttl: Time to live of entries in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """:return: The value stored under key, None if not found or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, tags=()):
+        """Store the value under key and tags, evicting the oldest entries."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        """Remove all entries stored with any of the tags."""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        """Remove the entry and its key from the tags index."""
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+class SharedCache:
+    """
+    Backend with the semantics of a shared network cache (like Redis or
+    Memcached): values are serialized, every instance created with the same
+    store sees the entries and invalidations of the others. The default
+    store is a dict shared by the whole process, a stand-in that lets
+    several application instances share the cache locally and in tests.
+    """
+
+    STORE = {}
+    LOCK = threading.Lock()
+
+    def __init__(self, ttl=30, store=None, prefix="department_app:"):
+        """
+        :param ttl: Time to live of entries in seconds.
+        :param store: A dict-like object to keep the entries in.
+        :param prefix: A prefix of the keys, separates applications sharing a store.
+        """
+        self.ttl = ttl
+        self.store = self.STORE if store is None else store
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """:return: The value stored under key, None if not found or expired."""
+        with self.LOCK:
+            entry = self.store.get(self.prefix + key)
+        if entry is None or entry[0] < time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(entry[1])
+
+    def set(self, key, value, tags=()):
+        """Store the value under key and tags."""
+        entry = (time.time() + self.ttl, pickle.dumps(value))
+        with self.LOCK:
+            self.store[self.prefix + key] = entry
+            for tag in tags:
+                self.store.setdefault(self.prefix + "tag:" + tag, set()).add(key)
+
+    def invalidate(self, tags):
+        """Remove all entries stored with any of the tags."""
+        with self.LOCK:
+            for tag in tags:
+                for key in self.store.pop(self.prefix + "tag:" + tag, ()):
+                    self.store.pop(self.prefix + key, None)
+
+    def clear(self):
+        """Remove all entries with the prefix of this cache."""
+        with self.LOCK:
+            for key in [key for key in self.store if key.startswith(self.prefix)]:
+                del self.store[key]
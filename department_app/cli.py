@@ -0,0 +1,96 @@
+"""Module contains the custom "flask" commands of the application."""
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from department_app.models.insert_data import clear_db, is_db_empty, seed_db
+from department_app.profiler import make_token
+from department_app.service import DepartmentServices
+
+
+@click.command("seed")
+@click.option(
+    "--departments", default=10, show_default=True, help="Departments to create."
+)
+@click.option(
+    "--employees", default=100, show_default=True, help="Employees to create."
+)
+@click.option(
+    "--seed", default=0, show_default=True, help="Seed of the random generator."
+)
+@click.option(
+    "--chunk-size", default=10000, show_default=True, help="Rows inserted at a time."
+)
+@click.option("--clear", is_flag=True, help="Delete existing data first.")
+@with_appcontext
+def seed_command(departments, employees, seed, chunk_size, clear):
+    """
+    Populate DB with generated departments and employees. The same
+    arguments always produce the same data. The database should be empty,
+    the generated department names would not be unique otherwise.
+    """
+    if clear:
+        clear_db()
+    elif not is_db_empty():
+        raise click.ClickException("database is not empty, use --clear")
+
+    def report(table, inserted, elapsed):
+        click.echo(f"\r{table}: {inserted} rows", nl=False)
+
+    try:
+        stats = seed_db(departments, employees, seed, chunk_size, report)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+    click.echo()
+    for table, (inserted, elapsed) in stats.items():
+        rate = inserted / elapsed if elapsed else 0
+        click.echo(f"{table}: {inserted} rows in {elapsed:.2f} s ({rate:.0f} rows/s)")
+
+
+@click.command("rebuild-stats")
+@with_appcontext
+def rebuild_stats_command():
+    """Recalculate the stats of all departments from their employees."""
+    DepartmentServices.rebuild_stats()
+    click.echo("Department stats rebuilt.")
+
+
+@click.command("check-stats")
+@click.option("--repair", is_flag=True, help="Rebuild the inconsistent stats.")
+@with_appcontext
+def check_stats_command(repair):
+    """
+    Compare the department stats with the aggregates of the employees,
+    exit with status 1 if any differ (and are not repaired).
+    """
+    mismatches = DepartmentServices.check_stats()
+    for dep_id, expected, actual in mismatches:
+        click.echo(
+            f"department {dep_id}: expected {expected}, stored {actual}"
+            " (headcount, salary sum, min salary, max salary)"
+        )
+    if not mismatches:
+        click.echo("Department stats are consistent.")
+    elif repair:
+        DepartmentServices.rebuild_stats([dep_id for dep_id, _, _ in mismatches])
+        click.echo(f"Rebuilt the stats of {len(mismatches)} departments.")
+    else:
+        raise SystemExit(1)
+
+
+@click.command("profile-token")
+@with_appcontext
+def profile_token_command():
+    """
+    Print a token to profile requests with, valid for PROFILER_TOKEN_MAX_AGE
+    seconds: send it in the "X-Profile" header (PROFILER_ENABLED must be set).
+    """
+    click.echo(make_token(current_app.config))
+
+
+def init_app(app):
+    """Register the commands with the application."""
+    app.cli.add_command(seed_command)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(check_stats_command)
+    app.cli.add_command(profile_token_command)
@@ -0,0 +1,164 @@
+"""
+Module contains the compression of responses negotiated with the
+"Accept-Encoding" header of the request. Bodies smaller than COMPRESS_MIN_SIZE
+are sent as they are, streamed bodies are compressed chunk by chunk while they
+are generated. Brotli ("br") is available if the brotli package is installed.
+"""
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/csv",
+    "text/css",
+    "text/html",
+    "text/plain",
+}
+
+
+class GzipCompressor:
+    """Incremental gzip compressor."""
+
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        """:return: The compressed bytes available after adding the data."""
+        return self.compressor.compress(data)
+
+    def finish(self):
+        """:return: The rest of the compressed stream."""
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    """Incremental brotli compressor."""
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data):
+        """:return: The compressed bytes available after adding the data."""
+        return self.compressor.process(data)
+
+    def finish(self):
+        """:return: The rest of the compressed stream."""
+        return self.compressor.finish()
+
+
+COMPRESSORS = {"gzip": (GzipCompressor, "COMPRESS_LEVEL")}
+if brotli is not None:
+    COMPRESSORS["br"] = (BrotliCompressor, "COMPRESS_BROTLI_QUALITY")
+
+
+def etag_variants(etag):
+    """
+    :return: The ETag of the uncompressed response and the ETags the same
+    response gets when it is compressed with every available encoding.
+    """
+    return [etag] + [f"{etag}-{encoding}" for encoding in COMPRESSORS]
+
+
+class Compression:
+    """Flask extension compressing the responses of the application."""
+
+    def init_app(self, app):
+        """
+        Register the compression of responses with the application.
+        COMPRESS_ENCODINGS lists the encodings in the order of preference,
+        unavailable ones are ignored and an empty list disables compression.
+        """
+        if self.encodings(app.config):
+            app.after_request(self.compress)
+
+    @staticmethod
+    def encodings(config):
+        """:return: The available encodings of COMPRESS_ENCODINGS."""
+        return [
+            encoding
+            for encoding in config["COMPRESS_ENCODINGS"]
+            if encoding in COMPRESSORS
+        ]
+
+    def negotiate(self):
+        """
+        :return: The encoding with the highest quality in the "Accept-Encoding"
+        header of the request, the preferred one among equal, or None.
+        """
+        accepted = request.accept_encodings
+        best, best_quality = None, 0
+        for encoding in self.encodings(current_app.config):
+            quality = accepted.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    @staticmethod
+    def make_compressor(encoding):
+        """:return: A compressor of the encoding with the configured level."""
+        compressor_class, level_key = COMPRESSORS[encoding]
+        return compressor_class(current_app.config[level_key])
+
+    def compress(self, response):
+        """
+        Compress the body of the response with the negotiated encoding.
+        The strong ETag of the response gets the encoding as a suffix,
+        because the compressed body is a different representation.
+        :param response: The response of the view.
+        :return: The response, compressed if it should be.
+        """
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+        compressor = self.make_compressor(encoding)
+        if response.is_streamed:
+            response.response = self.stream(compressor, response.response)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < current_app.config["COMPRESS_MIN_SIZE"]:
+                return response
+            response.set_data(compressor.process(data) + compressor.finish())
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+        return response
+
+    @staticmethod
+    def stream(compressor, chunks):
+        """
+        Compress the chunks of a streamed body, yielding compressed data as
+        soon as the compressor produces it.
+        """
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                data = compressor.process(chunk)
+                if data:
+                    yield data
+            yield compressor.finish()
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+
+compression = Compression()
@@ -0,0 +1,340 @@
+"""
+Module contains the per-request instrumentation of the application:
+the number and the time of SQL statements, the time spent serializing data
+and the time of the requests the "http" views backend sends to the REST-API.
+Every response gets a "Server-Timing" header, every request is logged as
+a line of key=value pairs to the "access" child of the app logger, and
+the totals of the process are served at "/metrics" in the Prometheus text
+format, with the hits and misses of the response cache. Statements slower
+than SLOW_QUERY_THRESHOLD are logged with their parameters and query plans.
+"""
+import contextlib
+import threading
+import time
+from collections import defaultdict
+
+from flask import (
+    Response,
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from department_app.cache import cache
+
+TIMERS = ("db", "serialize", "client")
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+EXPLAIN = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+EXPLAINED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE")
+EXPLAIN_SAVEPOINT = "explain_plan"
+MAX_PARAMETERS_LENGTH = 1000
+
+
+class RequestStats:
+    """The statements and the timings of a request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.slow_statements = 0
+        self.timings = dict.fromkeys(TIMERS, 0.0)
+        self.active = set()
+
+    def server_timing(self, total):
+        """:return: The value of the "Server-Timing" header."""
+        metrics = [f"{name};dur={self.timings[name] * 1000:.2f}" for name in TIMERS]
+        metrics[0] += f';desc="{self.statements} statements"'
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+def current_endpoint():
+    """:return: The url rule of the current request, None outside of requests."""
+    if not has_request_context():
+        return None
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def current_stats():
+    """:return: RequestStats of the current request, None outside of requests."""
+    if has_app_context():
+        return g.get("request_stats")
+    return None
+
+
+@contextlib.contextmanager
+def timed(name):
+    """
+    Context manager (or decorator) adding the time of the block to a timer
+    of the current request. Nested blocks of the same timer are counted once,
+    and the time of SQL statements executed in the block is not included,
+    e.g. of relationships loaded during serialization.
+    :param name: The timer, one of TIMERS.
+    """
+    stats = current_stats()
+    if stats is None or name in stats.active:
+        yield
+        return
+    stats.active.add(name)
+    db_time = stats.timings["db"]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stats.active.discard(name)
+        stats.timings[name] += elapsed - (stats.timings["db"] - db_time)
+
+
+def before_cursor_execute(conn, *args):
+    """Remember the start time of a statement."""
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Add the statement and its time to the stats of the current request,
+    log the statement if it is slow.
+    """
+    elapsed = time.perf_counter() - conn.info["statement_start"].pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.statements += 1
+        stats.timings["db"] += elapsed
+    if not has_app_context():
+        return
+    threshold = current_app.config["SLOW_QUERY_THRESHOLD"]
+    if threshold and elapsed >= threshold:
+        if stats is not None:
+            stats.slow_statements += 1
+        plan = None if executemany else explain(conn, statement, parameters)
+        parameters = repr(parameters)
+        if len(parameters) > MAX_PARAMETERS_LENGTH:
+            parameters = parameters[:MAX_PARAMETERS_LENGTH] + "..."
+        current_app.logger.warning(
+            "slow query duration_ms=%.2f endpoint=%s statement=%s parameters=%s"
+            " plan=%s",
+            elapsed * 1000,
+            current_endpoint(),
+            " ".join(statement.split()),
+            parameters,
+            " | ".join(plan) if plan else None,
+        )
+
+
+def explain(conn, statement, parameters):
+    """
+    Get the query plan of a statement with a separate cursor of the same
+    database connection, so the result of the statement is not affected.
+    EXPLAIN runs in a savepoint: on PostgreSQL a failed statement aborts
+    the transaction, which would fail the request.
+    :param conn: The Connection the statement was executed with.
+    :return: The lines of the plan, None if the dialect or the statement
+    is not supported.
+    """
+    prefix = EXPLAIN.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(
+        EXPLAINED_STATEMENTS
+    ):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = [str(row[-1]) for row in cursor.fetchall()]
+        except conn.dialect.dbapi.Error:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            plan = None
+        cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return plan
+    except conn.dialect.dbapi.Error:
+        return None
+    finally:
+        cursor.close()
+
+
+def handle_error(context):
+    """Forget the start time of a failed statement."""
+    if context.connection is not None:
+        starts = context.connection.info.get("statement_start")
+        if starts:
+            starts.pop()
+
+
+def escape(value):
+    """Escape a label value of the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values):
+    """:return: The formatted labels of a Prometheus sample."""
+    return ",".join(f'{name}="{escape(value)}"' for name, value in values.items())
+
+
+class Metrics:
+    """The totals of the requests handled by the process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.statements = defaultdict(int)
+        self.slow_statements = defaultdict(int)
+        self.timings = defaultdict(float)
+
+    def observe(self, method, endpoint, status, duration, stats):
+        """Add a handled request to the totals."""
+        with self.lock:
+            self.requests[method, endpoint, status] += 1
+            buckets = self.buckets[method, endpoint]
+            for number, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[number] += 1
+            self.durations[method, endpoint] += duration
+            self.counts[method, endpoint] += 1
+            self.statements[endpoint] += stats.statements
+            if stats.slow_statements:
+                self.slow_statements[endpoint] += stats.slow_statements
+            for name, seconds in stats.timings.items():
+                self.timings[endpoint, name] += seconds
+
+    def render(self, cache_stats=None):
+        """
+        :param cache_stats: The hits and misses of the response cache
+        (see ResponseCache.stats), None - not reported.
+        :return: The totals in the Prometheus text format.
+        """
+        lines = []
+        with self.lock:
+            lines += [
+                "# HELP http_requests_total Requests handled by the process.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, endpoint, status), count in sorted(self.requests.items()):
+                sample = labels(method=method, endpoint=endpoint, status=status)
+                lines.append(f"http_requests_total{{{sample}}} {count}")
+            lines += [
+                "# HELP http_request_duration_seconds Time to handle a request.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, endpoint), buckets in sorted(self.buckets.items()):
+                sample = labels(method=method, endpoint=endpoint)
+                count = self.counts[method, endpoint]
+                bounds = DURATION_BUCKETS + ("+Inf",)
+                for bound, value in zip(bounds, buckets + [count]):
+                    lines.append(
+                        f'http_request_duration_seconds_bucket{{{sample},le="{bound}"}}'
+                        f" {value}"
+                    )
+                lines += [
+                    f"http_request_duration_seconds_sum{{{sample}}}"
+                    f" {self.durations[method, endpoint]:.6f}",
+                    f"http_request_duration_seconds_count{{{sample}}} {count}",
+                ]
+            lines += [
+                "# HELP db_statements_total SQL statements executed by requests.",
+                "# TYPE db_statements_total counter",
+            ]
+            for endpoint, count in sorted(self.statements.items()):
+                sample = labels(endpoint=endpoint)
+                lines.append(f"db_statements_total{{{sample}}} {count}")
+            lines += [
+                "# HELP db_slow_statements_total SQL statements slower than"
+                " SLOW_QUERY_THRESHOLD.",
+                "# TYPE db_slow_statements_total counter",
+            ]
+            for endpoint, count in sorted(self.slow_statements.items()):
+                sample = labels(endpoint=endpoint)
+                lines.append(f"db_slow_statements_total{{{sample}}} {count}")
+            lines += [
+                "# HELP request_component_seconds_total Time of requests spent in"
+                " the database (db), serializing (serialize) and calling the REST-API"
+                " (client).",
+                "# TYPE request_component_seconds_total counter",
+            ]
+            for (endpoint, name), seconds in sorted(self.timings.items()):
+                sample = labels(endpoint=endpoint, component=name)
+                lines.append(
+                    f"request_component_seconds_total{{{sample}}} {seconds:.6f}"
+                )
+        if cache_stats is not None:
+            lines += [
+                "# HELP response_cache_requests_total Lookups of the response cache.",
+                "# TYPE response_cache_requests_total counter",
+                f'response_cache_requests_total{{result="hit"}} {cache_stats["hits"]}',
+                f'response_cache_requests_total{{result="miss"}}'
+                f' {cache_stats["misses"]}',
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class Instrumentation:
+    """Flask extension collecting the statements and the timings of requests."""
+
+    def init_app(self, app):
+        """
+        Register the request hooks and the "/metrics" endpoint with the
+        application, and the statement listeners with SQLAlchemy.
+        """
+        app.extensions["metrics"] = Metrics()
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        app.add_url_rule("/metrics", "metrics", self.metrics)
+        if not event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+            event.listen(Engine, "handle_error", handle_error)
+
+    @staticmethod
+    def start_request():
+        """Start collecting the stats of the request."""
+        g.request_stats = RequestStats()
+
+    @staticmethod
+    def finish_request(response):
+        """
+        Add the "Server-Timing" header to the response, log the request
+        and add it to the metrics. The time of streamed bodies, generated
+        after the response is returned, is not included.
+        :param response: The response of the view.
+        :return: The response.
+        """
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.start
+        response.headers["Server-Timing"] = stats.server_timing(total)
+        endpoint = current_endpoint()
+        current_app.extensions["metrics"].observe(
+            request.method, endpoint, response.status_code, total, stats
+        )
+        current_app.logger.getChild("access").info(
+            "request method=%s path=%s endpoint=%s status=%s duration_ms=%.2f"
+            " db_statements=%s db_ms=%.2f serialize_ms=%.2f client_ms=%.2f",
+            request.method,
+            request.path,
+            endpoint,
+            response.status_code,
+            total * 1000,
+            stats.statements,
+            *(stats.timings[name] * 1000 for name in TIMERS),
+        )
+        return response
+
+    @staticmethod
+    def metrics():
+        """:return: The metrics of the process in the Prometheus text format."""
+        return Response(
+            current_app.extensions["metrics"].render(cache.stats()),
+            mimetype="text/plain; version=0.0.4",
+        )
+
+
+instrumentation = Instrumentation()
@@ -2,9 +2,27 @@
 Module contains classes thad define database models,
 based on Flask-SQLAlchemy db.Model
 """
-from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
 
-db = SQLAlchemy()
+from sqlalchemy.orm import validates
+
+from department_app.models.engine import RoutingSQLAlchemy
+
+db = RoutingSQLAlchemy()
+
+
+def month_day(date):
+    """
+    :param date: A date object.
+    :return: The month and day of the date as an int, e.g. 1225 for December 25.
+    """
+    return date.month * 100 + date.day
+
+
+def birth_mmdd_default(context):
+    """Calculate Employee.birth_mmdd of rows inserted without it (e.g. in bulk)."""
+    date_of_birth = context.get_current_parameters().get("date_of_birth")
+    return month_day(date_of_birth) if date_of_birth else None
 
 
 class Department(db.Model):
@@ -14,18 +32,78 @@ class Department(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
     employees = db.relationship(
-        "Employee", cascade="all,delete", backref=db.backref("department")
+        "Employee",
+        cascade="all,delete",
+        back_populates="department",
+        order_by="Employee.id",
     )
+    stats = db.relationship("DepartmentStats", uselist=False, cascade="all,delete")
 
 
 class Employee(db.Model):
     """This class defines a database table for employees"""
 
     __tablename__ = "employees"
+    __table_args__ = (
+        # department_id leads both indexes, so they serve the foreign key
+        # lookups (e.g. the cascade delete) as well as the filters by date
+        # of birth within a department and the salary aggregates, the latter
+        # read from the index only.
+        db.Index(
+            "ix_employees_department_id_date_of_birth", "department_id", "date_of_birth"
+        ),
+        db.Index("ix_employees_department_id_salary", "department_id", "salary"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     date_of_birth = db.Column(db.Date, nullable=False, index=True)
+    # month and day of date_of_birth (see month_day), stored to search
+    # birthdays regardless of the year with an index range scan
+    birth_mmdd = db.Column(
+        db.SmallInteger, nullable=False, index=True, default=birth_mmdd_default
+    )
     salary = db.Column(db.Integer, nullable=False)
     department_id = db.Column(
         db.Integer, db.ForeignKey("departments.id"), nullable=False
     )
+    department = db.relationship("Department", back_populates="employees")
+
+    @validates("date_of_birth")
+    def validate_date_of_birth(self, key, date_of_birth):
+        """Keep the birth_mmdd column in sync with the date of birth."""
+        self.birth_mmdd = month_day(date_of_birth) if date_of_birth else None
+        return date_of_birth
+
+
+class DepartmentStats(db.Model):
+    """
+    This class defines a database table with the salary aggregates of every
+    department, kept current by the service layer in the same transactions
+    that write employees, so they are read with a primary key lookup instead
+    of aggregating the employees.
+    """
+
+    __tablename__ = "department_stats"
+    department_id = db.Column(
+        db.Integer,
+        db.ForeignKey("departments.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    headcount = db.Column(db.Integer, nullable=False, default=0)
+    salary_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    # None if the department has no employees
+    min_salary = db.Column(db.Integer)
+    max_salary = db.Column(db.Integer)
+    last_modified = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class TableVersion(db.Model):
+    """
+    This class defines a database table with a version counter of every
+    data table, incremented by each write to the table. The versions
+    are used to make ETags of the REST-API responses.
+    """
+
+    __tablename__ = "table_versions"
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,109 @@
+"""
+Module contains the configuration of the database engine: the connection
+pool options (the DB_POOL_* config values) and the SQLite pragmas, set once
+per connection when it is opened (the SQLITE_* config values).
+
+SQLite databases run in the WAL journal mode, so readers are not blocked by
+a writer, and foreign keys are enforced on every connection. The pragmas
+take effect for the life of the pooled connection, so file databases are
+served from a QueuePool instead of the NullPool SQLAlchemy 1.4 defaults to.
+
+The session of the application can be routed to a read replica (see
+department_app.replicas): while a replica engine is set in its info,
+statements are executed by the replica, except for flushes and INSERT,
+UPDATE and DELETE statements, which always go to the primary database.
+"""
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+
+# The key of the replica engine in the session info.
+REPLICA = "replica"
+
+
+def engine_options(config):
+    """
+    :param config: The application config.
+    :return: The SQLALCHEMY_ENGINE_OPTIONS for the SQLALCHEMY_DATABASE_URI.
+    In-memory SQLite databases keep the single connection of their StaticPool.
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = {
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+    }
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return options
+        if url.get_dialect().is_async:
+            options["poolclass"] = AsyncAdaptedQueuePool
+        else:
+            options["poolclass"] = QueuePool
+            # pooled connections are used by the thread checking them out
+            options["connect_args"] = {"check_same_thread": False}
+    options.update(
+        pool_size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_MAX_OVERFLOW"],
+        pool_timeout=config["DB_POOL_TIMEOUT"],
+    )
+    return options
+
+
+def sqlite_pragmas(config):
+    """:return: A list of (pragma, value) set on every new SQLite connection."""
+    return [
+        ("journal_mode", config["SQLITE_JOURNAL_MODE"]),
+        ("synchronous", config["SQLITE_SYNCHRONOUS"]),
+        ("foreign_keys", "ON"),
+        ("cache_size", config["SQLITE_CACHE_SIZE"]),
+        ("mmap_size", config["SQLITE_MMAP_SIZE"]),
+    ]
+
+
+def configure_engine(engine, config):
+    """
+    Register the listener setting the SQLite pragmas on new connections
+    of the engine, other databases are left as they are.
+    :param engine: The engine of the application.
+    :param config: The application config.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    statements = [
+        f"PRAGMA {name}={value}" for name, value in sqlite_pragmas(config)
+    ]
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", set_pragmas)
+
+
+class RoutingSession(SignallingSession):
+    """Session executing the reads with the replica set in its info."""
+
+    def get_bind(self, mapper=None, clause=None):
+        """
+        :return: The replica engine for reads if one is set in the session
+        info, the engine of the primary database otherwise.
+        """
+        replica = self.info.get(REPLICA)
+        if replica is None or self._flushing or isinstance(clause, UpdateBase):
+            return super().get_bind(mapper, clause)
+        return replica
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy extension with sessions of RoutingSession."""
+
+    def create_session(self, options):
+        """:return: The factory of RoutingSession."""
+        return sessionmaker(class_=RoutingSession, db=self, **options)
@@ -1,61 +1,218 @@
 # pylint: disable=E1101
-"""Module contains a function to populate test data in DB."""
-from datetime import date
-from department_app import db, create_app
-from department_app.models import Department, Employee
+"""
+Module contains functions to populate DB: the small fixed data set
+used during tests and the generator of large deterministic data sets
+used by "flask seed" command.
+"""
+import csv
+import io
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+from department_app.models import (
+    Department,
+    DepartmentStats,
+    Employee,
+    TableVersion,
+    db,
+    month_day,
+)
+from department_app.service import DepartmentServices, bump_versions
+
+FIRST_NAMES = [
+    "Olena", "Andrii", "Iryna", "Taras", "Oksana", "Dmytro", "Natalia",
+    "Serhii", "Yulia", "Mykola", "Sofia", "Bohdan", "Kateryna", "Oleh",
+    "Mariia", "Vasyl", "Anna", "Ivan", "Halyna", "Petro",
+]
+LAST_NAMES = [
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko",
+    "Oliinyk", "Shevchuk", "Polishchuk", "Lysenko", "Marchenko", "Rudenko",
+    "Savchenko", "Petrenko", "Melnyk", "Moroz", "Pavlenko", "Kozak",
+    "Onysko", "Boiko", "Ivanenko",
+]
+DEPARTMENT_AREAS = [
+    "Accounting", "Development", "Design", "Logistics", "Marketing",
+    "Quality Assurance", "Research", "Sales", "Security", "Support",
+]
+FIRST_BIRTH_DATE = date(1955, 1, 1)
+BIRTH_DATES_RANGE = (date(2003, 12, 31) - FIRST_BIRTH_DATE).days
 
 
 def populate_db():
     """Populates DB with data, used during tests."""
-    d_1 = Department(name="Dep 1")
-    d_2 = Department(name="Dep 2")
-
-    e_1 = Employee(
-        name="Employee 1",
-        date_of_birth=date(year=1991, month=1, day=1),
-        salary=1000,
-        department_id=1,
+    db.session.execute(
+        Department.__table__.insert(), [{"name": "Dep 1"}, {"name": "Dep 2"}]
     )
-
-    e_2 = Employee(
-        name="Employee 2",
-        date_of_birth=date(year=1992, month=2, day=2),
-        salary=1000,
-        department_id=1,
+    db.session.execute(
+        Employee.__table__.insert(),
+        [
+            {
+                "name": f"Employee {number}",
+                "date_of_birth": date(1990 + number, number, number),
+                "salary": 1000 if number < 3 else 2000,
+                "department_id": 1 if number < 3 else 2,
+            }
+            for number in range(1, 6)
+        ],
     )
-
-    e_3 = Employee(
-        name="Employee 3",
-        date_of_birth=date(year=1993, month=3, day=3),
-        salary=2000,
-        department_id=2,
+    db.session.execute(
+        TableVersion.__table__.insert(),
+        [{"name": "departments", "version": 0}, {"name": "employees", "version": 0}],
     )
+    DepartmentServices._rebuild_stats()
+    db.session.commit()
 
-    e_4 = Employee(
-        name="Employee 4",
-        date_of_birth=date(year=1994, month=4, day=4),
-        salary=2000,
-        department_id=2,
-    )
 
-    e_5 = Employee(
-        name="Employee 5",
-        date_of_birth=date(year=1995, month=5, day=5),
-        salary=2000,
-        department_id=2,
-    )
+def generate_departments(count, rng):
+    """
+    Generate rows with data of departments.
+    :param count: The number of departments to generate.
+    :param rng: random.Random instance, the same seed gives the same rows.
+    :return: An iterator over dicts with department data.
+    """
+    for number in range(1, count + 1):
+        yield {"name": f"{rng.choice(DEPARTMENT_AREAS)} {number:04}"}
+
+
+def generate_employees(count, dep_ids, rng):
+    """
+    Generate rows with data of employees.
+    :param count: The number of employees to generate.
+    :param dep_ids: A list with ids of departments to assign the employees to.
+    :param rng: random.Random instance, the same seed gives the same rows.
+    :return: An iterator over dicts with employee data.
+    """
+    for _ in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        date_of_birth = FIRST_BIRTH_DATE + timedelta(
+            days=rng.randrange(BIRTH_DATES_RANGE)
+        )
+        yield {
+            "name": name,
+            "date_of_birth": date_of_birth,
+            # set explicitly, COPY does not apply the column defaults
+            "birth_mmdd": month_day(date_of_birth),
+            "salary": rng.randrange(500, 10000),
+            "department_id": rng.choice(dep_ids),
+        }
+
+
+def chunked(rows, size):
+    """Split an iterator into lists of at most "size" items."""
+    rows = iter(rows)
+    chunk = list(islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, size))
 
-    db.session.add(d_1)
-    db.session.add(d_2)
-    db.session.add(e_1)
-    db.session.add(e_2)
-    db.session.add(e_3)
-    db.session.add(e_4)
-    db.session.add(e_5)
+
+def insert_rows(table, rows):
+    """
+    Insert rows into table with the fastest way available: COPY on
+    PostgreSQL, executemany of a core INSERT statement on other databases.
+    :param table: sqlalchemy Table to insert rows into.
+    :param rows: A list of dicts with the same keys.
+    """
+    if db.engine.dialect.name != "postgresql":
+        db.session.execute(table.insert(), rows)
+        return
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def insert_chunks(table, rows, chunk_size, stats, report=None):
+    """
+    Insert rows into table in chunks, committing every chunk.
+    :param table: sqlalchemy Table to insert rows into.
+    :param rows: An iterator over dicts with row data.
+    :param chunk_size: The number of rows inserted at a time.
+    :param stats: A dict to store (rows inserted, seconds elapsed) by table name.
+    :param report: A function called with (table name, rows inserted so far,
+    seconds elapsed) after every chunk.
+    :return: An iterator over inserted chunks.
+    """
+    start, inserted = time.perf_counter(), 0
+    stats[table.name] = (0, 0)
+    for chunk in chunked(rows, chunk_size):
+        insert_rows(table, chunk)
+        db.session.commit()
+        inserted += len(chunk)
+        stats[table.name] = (inserted, time.perf_counter() - start)
+        if report:
+            report(table.name, *stats[table.name])
+        yield chunk
+
+
+def seed_db(departments, employees, seed=0, chunk_size=10000, report=None):
+    """
+    Populate DB with generated departments and employees. The data depends
+    only on the arguments, so the same data set can be recreated for load tests.
+    :param departments: The number of departments to create.
+    :param employees: The number of employees to create.
+    :param seed: The seed of the random generator.
+    :param chunk_size: The number of rows inserted at a time.
+    :param report: A function called with (table name, rows inserted so far,
+    seconds elapsed) after every chunk.
+    :return: A dict mapping table name to (rows inserted, seconds elapsed).
+    """
+    if employees and not departments:
+        raise ValueError("Employees can not be created without departments.")
+    rng = random.Random(seed)
+    stats, dep_ids = {}, []
+    for chunk in insert_chunks(
+        Department.__table__,
+        generate_departments(departments, rng),
+        chunk_size,
+        stats,
+        report,
+    ):
+        dep_ids += get_department_ids([row["name"] for row in chunk])
+    for _ in insert_chunks(
+        Employee.__table__,
+        generate_employees(employees, dep_ids, rng),
+        chunk_size,
+        stats,
+        report,
+    ):
+        pass
+    DepartmentServices._rebuild_stats()
+    bump_versions("departments", "employees")
     db.session.commit()
+    return stats
+
 
-if __name__ == "__main__":
-    app = create_app()
-    with app.app_context():
-        populate_db()
+def get_department_ids(names):
+    """:return: A list with ids of departments with specified names."""
+    query = db.session.query(Department.id).filter(Department.name.in_(names))
+    return sorted(dep_id for dep_id, in query)
 
+
+def is_db_empty():
+    """:return: True if there are no departments and no employees."""
+    return not (
+        db.session.query(Department.id).first()
+        or db.session.query(Employee.id).first()
+    )
+
+
+def clear_db():
+    """Delete all employees and departments."""
+    db.session.execute(DepartmentStats.__table__.delete())
+    db.session.execute(Employee.__table__.delete())
+    db.session.execute(Department.__table__.delete())
+    bump_versions("departments", "employees")
+    db.session.commit()
@@ -0,0 +1,139 @@
+"""
+Module contains the opt-in profiler of single requests. With PROFILER_ENABLED
+set, a request with a valid token in the "X-Profile" header (or the "profile"
+query parameter) runs under cProfile. The stats are saved to PROFILER_DIR,
+or returned instead of the response body if "X-Profile-Output: inline"
+(or "profile_output=inline") is given. Tokens are signed with SECRET_KEY
+and expire after PROFILER_TOKEN_MAX_AGE seconds, see "flask profile-token".
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.wrappers import Request, Response
+
+SALT = "profiler"
+# set in the WSGI environ of profiled requests, they are not served from cache
+PROFILING = "department_app.profiling"
+
+
+def make_token(config):
+    """:return: A new profiling token signed with the SECRET_KEY of the config."""
+    return URLSafeTimedSerializer(config["SECRET_KEY"], salt=SALT).dumps("profile")
+
+
+def check_token(config, token):
+    """:return: True if the token is valid and not expired."""
+    serializer = URLSafeTimedSerializer(config["SECRET_KEY"], salt=SALT)
+    try:
+        serializer.loads(token, max_age=config["PROFILER_TOKEN_MAX_AGE"])
+    except BadSignature:
+        return False
+    return True
+
+
+class ProfilerMiddleware:
+    """WSGI middleware profiling the requests with a valid profiling token."""
+
+    def __init__(self, wsgi_app, app):
+        """
+        :param wsgi_app: The WSGI application to profile.
+        :param app: The Flask application, its config and logger are used.
+        """
+        self.wsgi_app = wsgi_app
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        config = self.app.config
+        if not config["PROFILER_ENABLED"]:
+            return self.wsgi_app(environ, start_response)
+        request = Request(environ)
+        token = request.headers.get("X-Profile") or request.args.get("profile")
+        if not token:
+            return self.wsgi_app(environ, start_response)
+        if not check_token(config, token):
+            self.app.logger.warning("profiler: invalid token for %s", request.path)
+            return self.wsgi_app(environ, start_response)
+        inline = (
+            request.headers.get("X-Profile-Output")
+            or request.args.get("profile_output")
+        ) == "inline"
+        return self.profile(environ, start_response, request, inline)
+
+    def profile(self, environ, start_response, request, inline):
+        """
+        Run the request under the profiler, including the generation of
+        a streamed body. The response cache is bypassed, so the work of
+        building the response is profiled.
+        :param inline: Return the stats instead of the response body.
+        """
+        environ[PROFILING] = True
+        response = {}
+
+        def catching_start_response(status, headers, exc_info=None):
+            response.update(status=status, headers=headers)
+            return lambda data: None
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            app_iter = self.wsgi_app(environ, catching_start_response)
+            try:
+                body = b"".join(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+
+        if inline:
+            stats = io.StringIO()
+            pstats.Stats(profiler, stream=stats).sort_stats(
+                self.app.config["PROFILER_SORT"]
+            ).print_stats(self.app.config["PROFILER_RESTRICTIONS"])
+            result = Response(stats.getvalue(), mimetype="text/plain")
+            result.headers["X-Profiled-Status"] = response["status"]
+            return result(environ, start_response)
+
+        path = self.save(profiler, request, elapsed)
+        self.app.logger.info(
+            "profiler: %s %s in %.2f ms saved to %s",
+            request.method,
+            request.path,
+            elapsed * 1000,
+            path,
+        )
+        headers = [
+            (name, value)
+            for name, value in response["headers"]
+            if name.lower() != "content-length"
+        ]
+        headers += [
+            ("Content-Length", str(len(body))),
+            ("X-Profile-File", os.path.basename(path)),
+        ]
+        start_response(response["status"], headers)
+        return [body]
+
+    def save(self, profiler, request, elapsed):
+        """
+        Dump the stats to PROFILER_DIR, they can be read with pstats or
+        visualized, e.g. with snakeviz.
+        :return: The path of the file.
+        """
+        directory = self.app.config["PROFILER_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+        path = os.path.join(
+            directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{name}"
+            f"-{elapsed * 1000:.0f}ms.prof",
+        )
+        profiler.dump_stats(path)
+        return path
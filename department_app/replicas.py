@@ -0,0 +1,135 @@
+"""
+Module contains the routing of reads to the read replicas of the database
+(DATABASE_REPLICA_URLS). GET and HEAD requests read from a replica chosen
+at random, so the read methods of the service layer are served by the
+replicas, while other requests, and every write, use the primary database.
+
+Replicas lag behind the primary, so a client reads from the primary for
+REPLICA_STICKY_SECONDS after its write: the response to a request that
+committed a write (see record_write), whatever its method, sets a cookie
+with the end of this window. The process that handled a write reads
+from the primary for the same time too, so its response cache is not
+refilled with data the replicas do not have yet. Views writing with GET
+requests (the delete links of the html views) are marked with read_primary,
+so they do not load what they write from a lagging replica.
+"""
+import math
+import random
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import create_engine
+
+from department_app.models import db
+from department_app.models.engine import REPLICA, configure_engine, engine_options
+
+STICKY_COOKIE = "read_primary_until"
+READ_METHODS = ("GET", "HEAD")
+
+
+def record_write():
+    """Mark the current request as one that committed a write to the primary."""
+    if has_request_context():
+        g.wrote_primary = True
+
+
+def read_primary(view):
+    """Decorator keeping all statements of a view on the primary database."""
+    view.read_primary = True
+    return view
+
+
+class Replicas:
+    """The replica engines of an application and the time of its last write."""
+
+    def __init__(self, engines, sticky_seconds):
+        self.engines = engines
+        self.sticky_seconds = sticky_seconds
+        self.last_write = 0.0
+
+    def choose(self):
+        """
+        :return: The engine of a replica to read the current request from,
+        None if it should read from the primary database.
+        """
+        if not self.engines or request.method not in READ_METHODS:
+            return None
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, "read_primary", False):
+            return None
+        now = time.time()
+        if now < self.last_write + self.sticky_seconds:
+            return None
+        try:
+            if now < float(request.cookies.get(STICKY_COOKIE, 0)):
+                return None
+        except ValueError:
+            pass
+        return random.choice(self.engines)
+
+    def dispose(self):
+        """Close the pooled connections of the replicas."""
+        for engine in self.engines:
+            engine.dispose()
+
+
+class ReplicaRouting:
+    """Flask extension routing the reads of requests to the replicas."""
+
+    def init_app(self, app):
+        """
+        Create the engines of the replicas, configured as the engine of
+        the primary database, and register the request hooks.
+        """
+        engines = []
+        for url in app.config["DATABASE_REPLICA_URLS"]:
+            options = engine_options(dict(app.config, SQLALCHEMY_DATABASE_URI=url))
+            engine = create_engine(url, **options)
+            configure_engine(engine, app.config)
+            engines.append(engine)
+        app.extensions["replicas"] = Replicas(
+            engines, app.config["REPLICA_STICKY_SECONDS"]
+        )
+        if engines:
+            app.before_request(self.route_request)
+            app.after_request(self.remember_write)
+            app.teardown_request(self.reset_route)
+
+    @staticmethod
+    def route_request():
+        """Route the session of the request to a replica or to the primary."""
+        replica = current_app.extensions["replicas"].choose()
+        if replica is None:
+            db.session.info.pop(REPLICA, None)
+        else:
+            db.session.info[REPLICA] = replica
+
+    @staticmethod
+    def remember_write(response):
+        """
+        Start the window of reads from the primary database after a write
+        of the client and of the process.
+        :param response: The response of the view.
+        :return: The response.
+        """
+        if not g.pop("wrote_primary", False):
+            return response
+        replicas = current_app.extensions["replicas"]
+        replicas.last_write = time.time()
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{replicas.last_write + replicas.sticky_seconds:.3f}",
+            max_age=math.ceil(replicas.sticky_seconds),
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
+
+    @staticmethod
+    def reset_route(exception=None):
+        """Route the session back to the primary after the request."""
+        g.pop("wrote_primary", None)
+        db.session.info.pop(REPLICA, None)
+
+
+replica_routing = ReplicaRouting()
@@ -8,11 +8,19 @@ from department_app.rest.department_resourses import (
     DepartmentsAPI,
     DepartmentsEmployeesAPI,
 )
-from department_app.rest.employee_resources import EmployeesAPI, EmployeesSearchAPI
+from department_app.rest.employee_resources import (
+    EmployeesAPI,
+    EmployeesBulkAPI,
+    EmployeesExportAPI,
+    EmployeesSearchAPI,
+)
+from department_app.rest.representations import output_json
+from department_app.rest.stats_resources import SalaryStatsAPI
 
 api = Api(
     prefix="/api/v1",
 )
+api.representations["application/json"] = output_json
 
 api.add_resource(
     DepartmentsAPI,
@@ -37,7 +45,13 @@ api.add_resource(
     strict_slashes=False,
 )
 
-
+api.add_resource(
+    SalaryStatsAPI,
+    "/stats",
+    "/departments/<dep_id>/stats",
+    methods=["GET"],
+    strict_slashes=False,
+)
 
 api.add_resource(
     EmployeesAPI,
@@ -55,6 +69,20 @@ api.add_resource(
     strict_slashes=False,
 )
 
+api.add_resource(
+    EmployeesBulkAPI,
+    "/employees/bulk",
+    methods=["POST"],
+    strict_slashes=False,
+)
+
+api.add_resource(
+    EmployeesExportAPI,
+    "/employees/export",
+    methods=["GET"],
+    strict_slashes=False,
+)
+
 api.add_resource(
     EmployeesSearchAPI,
     "/employees/search",
@@ -0,0 +1,62 @@
+"""
+Module contains the support of conditional GET requests for the REST-API
+Resources. ETags are made from the url of the request and the versions of
+the tables the response is built from (see TableVersion), so the ETag of
+the current data is known before the data is queried and serialized.
+The response cache (see department_app.cache) stores the responses by their
+ETag, so a cached body is never sent with the ETag of other data.
+"""
+import functools
+
+from flask import Response, request
+from werkzeug.http import generate_etag, quote_etag
+
+from department_app.cache import ETAG
+from department_app.compression import etag_variants
+from department_app.service import get_versions
+
+
+def make_etag(tables):
+    """
+    Make the ETag of the current request url with the current versions
+    of the tables.
+    :param tables: Names of the tables the response is built from.
+    :return: The unquoted strong ETag.
+    """
+    versions = get_versions(tables)
+    state = ";".join(f"{table}={versions.get(table, 0)}" for table in tables)
+    return generate_etag(f"{request.full_path}|{state}".encode())
+
+
+def conditional(*tables):
+    """
+    Decorator adding the "ETag" header to responses with status 200 of
+    a Resource method and answering requests with a matching "If-None-Match"
+    header with status 304 without calling the method. The ETags of
+    the compressed responses (see department_app.compression) match too.
+    The ETag is the key of the response in the cache (see ResponseCache.cached).
+    :param tables: Names of the tables the response is built from.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            etag = make_etag(tables)
+            for variant in etag_variants(etag):
+                if request.if_none_match.contains_weak(variant):
+                    return Response(status=304, headers={"ETag": quote_etag(variant)})
+            request.environ[ETAG] = etag
+            result = method(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code == 200:
+                    result.set_etag(etag)
+                return result
+            data, status, *headers = result
+            headers = dict(headers[0]) if headers else {}
+            if status == 200:
+                headers["ETag"] = quote_etag(etag)
+            return data, status, headers
+
+        return wrapper
+
+    return decorator
@@ -3,8 +3,22 @@ from flask_restful import Resource
 from flask import request
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError
-from department_app.service import DepartmentServices, EmployeeServices
+from department_app.cache import cache, id_tag
+from department_app.service import (
+    DepartmentServices,
+    EmployeeServices,
+    EMPLOYEE_FIELDS,
+    WITH_EMPLOYEES,
+)
+from .conditional import conditional
+from .pagination import PaginationError, paginate, parse_page_args
 from .schemas import DepartmentSchema, EmployeeSchema
+from .serializers import serialize_departments, serialize_employees
+
+
+def department_tags(data, dep_id=None):
+    """:return: cache tags of a response with department(s) data."""
+    return [id_tag("department", dep_id)] if dep_id else ["departments"]
 
 
 class DepartmentsAPI(Resource):
@@ -15,17 +29,37 @@ class DepartmentsAPI(Resource):
 
     department_schema = DepartmentSchema()
 
+    @conditional("departments", "employees")
+    @cache.cached(department_tags)
     def get(self, dep_id=None):
         """
         This method is called when GET request is sent to "/api/v1/departments/[<int:id>]" url
-        :return: if "id" not specified the list of all departments in json format,
-        status code 200. If id specified -  the department with the specified id
+        :return: if "id" not specified a page of departments ordered by id
+        in json format, status code 200 and the "Link" header pointing to
+        the next page (see the "limit" and "after" query parameters).
+        If id specified -  the department with the specified id
         serialized to json. If invalid id - error message and status code 404.
         """
         if not dep_id:
-            departments = DepartmentServices.get_all()
-            return self.department_schema.dump(departments, many=True), 200
-        department = DepartmentServices.get_by_id(dep_id)
+            try:
+                after, limit = parse_page_args()
+            except PaginationError as e:
+                return {"message": str(e)}, 400
+            rows, headers = paginate(
+                DepartmentServices.get_rows(after=after, limit=limit + 1), limit
+            )
+            dep_ids = [row.id for row in rows]
+            if not dep_ids:
+                return [], 200, headers
+            employees = {}
+            for employee in EmployeeServices.get_fields(
+                ("id", "name", "date_of_birth", "salary"),
+                filters={"department_ids": dep_ids},
+            ):
+                employees.setdefault(employee.department_id, []).append(employee)
+            salary_stats = DepartmentServices.get_salary_stats(dep_ids)
+            return serialize_departments(rows, salary_stats, employees), 200, headers
+        department = DepartmentServices.get_by_id(dep_id, options=[WITH_EMPLOYEES])
         if not department:
             return {"message": f"Department with id {dep_id} not found"}, 404
         return self.department_schema.dump(department), 200
@@ -118,19 +152,35 @@ class DepartmentsEmployeesAPI(Resource):
 
     employee_schema = EmployeeSchema()
 
+    @conditional("departments", "employees")
+    @cache.cached(department_tags)
     def get(self, dep_id):
         """
         This method is called when GET request is sent to
         "/api/v1/departments/<int:dep_id>/employees" url.
-        :return: return the json-serialized list of employees working in
-        department with id specified in url, status code 200. If invalid id -
+        :return: return the json-serialized page of employees working in
+        department with id specified in url, status code 200 and the "Link"
+        header pointing to the next page. If invalid id -
         error message and status code 404.
         """
         department = DepartmentServices.get_by_id(dep_id)
         if not department:
             return {"message": f"Department with id {dep_id} not found"}, 404
-        employees = EmployeeServices.get_all_for_department(dep_id)
-        return self.employee_schema.dump(employees, many=True), 200
+        try:
+            after, limit = parse_page_args()
+        except PaginationError as e:
+            return {"message": str(e)}, 400
+        rows, headers = paginate(
+            EmployeeServices.get_fields(
+                EMPLOYEE_FIELDS,
+                after=after,
+                limit=limit + 1,
+                filters={"department_ids": [dep_id]},
+            ),
+            limit,
+        )
+        salary_stats = DepartmentServices.get_salary_stats([dep_id])
+        return serialize_employees(rows, salary_stats), 200, headers
 
     def post(self, dep_id):
         """
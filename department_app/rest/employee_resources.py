@@ -3,13 +3,58 @@
 Module contains Flask-Restful Resources for Employees
 and for EmployeesSearch.
 """
+import csv
+import io
+import itertools
+import json
 from datetime import datetime
 from flask_restful import Resource
-from flask import request
+from flask import Response, current_app, request, stream_with_context
 from marshmallow import ValidationError
-from sqlalchemy.exc import IntegrityError
-from department_app.service import EmployeeServices, DepartmentServices
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from department_app.cache import cache, id_tag
+from department_app.models import month_day
+from department_app.service import (
+    EmployeeServices,
+    DepartmentServices,
+    EMPLOYEE_FIELDS,
+    EMPLOYEE_SORT_COLUMNS,
+    WITH_DEPARTMENT,
+)
+from .conditional import conditional
+from .filtering import FilterError, parse_employee_filters, parse_fields, parse_sort
+from .pagination import PaginationError, paginate, parse_page_args
 from .schemas import EmployeeSchema
+from .serializers import serialize_employees
+
+
+def employee_tags(data, emp_id=None):
+    """
+    :return: cache tags of a response with employee(s) data. An employee
+    is shown with the average salary of their department, so it is tagged
+    with the department as well.
+    """
+    if not emp_id:
+        return ["employees"]
+    return [
+        id_tag("employee", emp_id),
+        id_tag("department", data["department"]["id"]),
+    ]
+
+
+def parse_month_day(value):
+    """
+    Parse a birthday in "MM-DD" format.
+    :return: The month and day as an int, e.g. 1225 for "12-25" (see month_day).
+    :raise ValueError: if the value is not a valid month and day.
+    """
+    # a leap year, so "02-29" is valid
+    return month_day(datetime.strptime(f"2000-{value}", "%Y-%m-%d"))
+
+
+def search_tags(data, dep_id=None):
+    """:return: cache tags of a response with found employees."""
+    return [id_tag("department", dep_id)] if dep_id else ["employees"]
 
 
 class EmployeesAPI(Resource):
@@ -20,22 +65,73 @@ class EmployeesAPI(Resource):
 
     employee_schema = EmployeeSchema()
 
+    @conditional("employees", "departments")
+    @cache.cached(employee_tags)
     def get(self, emp_id=None):
         """
         This method is called when GET request is sent to
         "/api/v1/employees/[<int:id>]" url.
-        :return: if "id" not specified the list of all employees in json format,
-        status code 200. If id specified -  the employee with the specified id
+        :return: if "id" not specified a page of employees ordered by id
+        in json format, status code 200 and the "Link" header pointing to
+        the next page (see the "limit" and "after" query parameters).
+        The list can be filtered, sorted and projected to some of the fields
+        (see get_list). If parameters are not valid - error message and
+        status code 400.
+        If id specified -  the employee with the specified id
         serialized to json. If invalid id - error message and status code 404.
         """
         if not emp_id:
-            employees = EmployeeServices.get_all()
-            return self.employee_schema.dump(employees, many=True), 200
-        employee = EmployeeServices.get_by_id(emp_id)
+            try:
+                return self.get_list()
+            except (PaginationError, FilterError) as e:
+                return {"message": str(e)}, 400
+        employee = EmployeeServices.get_by_id(emp_id, options=[WITH_DEPARTMENT])
         if not employee:
             return {"message": f"Employee with id {emp_id} not found"}, 404
         return self.employee_schema.dump(employee), 200
 
+    @staticmethod
+    def get_list():
+        """
+        Get a page of employees filtered with the "salary_min", "salary_max",
+        "name" (the beginning of the name) and "department_id" (repeated
+        or comma-separated) query parameters, ordered by the "sort" parameter
+        (a column name, "-" prefix for the descending order). If the "fields"
+        parameter (comma-separated field names) is specified only these
+        columns are selected from DB and returned.
+        Employees are selected as plain rows and serialized with the fast
+        serializers (see serializers module), no ORM objects are built.
+        :return: a tuple (page of employees, 200, headers).
+        :raise PaginationError, FilterError: if parameters are not valid.
+        """
+        after, limit = parse_page_args()
+        filters = parse_employee_filters()
+        sort, after_key = parse_sort(EMPLOYEE_SORT_COLUMNS)
+        fields = parse_fields(EMPLOYEE_FIELDS)
+        column = sort.lstrip("-")
+
+        def sort_key(row):
+            return str(getattr(row, column))
+
+        rows, headers = paginate(
+            EmployeeServices.get_fields(
+                fields or EMPLOYEE_FIELDS,
+                after=after,
+                limit=limit + 1,
+                filters=filters,
+                sort=sort,
+                after_key=after_key,
+            ),
+            limit,
+            sort_key if column != "id" else None,
+        )
+        salary_stats = {}
+        if fields is None or "department" in fields:
+            salary_stats = DepartmentServices.get_salary_stats(
+                {row.department_id for row in rows}
+            )
+        return serialize_employees(rows, salary_stats, fields), 200, headers
+
     def post(self):
         """
         This method is called when POST request is sent to url "/api/v1/employees"
@@ -117,6 +213,187 @@ class EmployeesAPI(Resource):
         return "", 204
 
 
+class EmployeesBulkAPI(Resource):
+    """
+    This class defines the EmployeesBulkAPI Resource, available at the
+    "/api/v1/employees/bulk" url
+    """
+
+    employees_schema = EmployeeSchema(many=True)
+
+    def post(self):
+        """
+        This method is called when POST request is sent to url "/api/v1/employees/bulk"
+        with json data: {"insert": [<employee>, ...], "upsert": [<employee with id>, ...],
+        "delete": [<id>, ...]}, every key is optional.
+        Valid items are written in one transaction, invalid ones are skipped
+        and reported by their index in the list.
+        :return: the numbers of inserted, upserted and deleted employees and
+        the per-item errors in json format, status code 200. If the data is not
+        an object with lists or has too many items - error message, status code 400.
+        """
+        json_data = request.get_json(force=True)
+        if not isinstance(json_data, dict) or not all(
+            isinstance(json_data.get(key, []), list)
+            for key in ("insert", "upsert", "delete")
+        ):
+            return {"message": "Data should be an object with lists."}, 400
+        to_insert = json_data.get("insert", [])
+        to_upsert = json_data.get("upsert", [])
+        to_delete = json_data.get("delete", [])
+        max_items = current_app.config["API_BULK_MAX_ITEMS"]
+        if len(to_insert) + len(to_upsert) + len(to_delete) > max_items:
+            return {"message": f"Not more than {max_items} items allowed."}, 400
+        errors = {"insert": {}, "upsert": {}, "delete": {}}
+        to_insert = self.load(to_insert, errors["insert"])
+        for row in to_insert.values():
+            row.pop("id", None)
+        to_upsert = self.load(to_upsert, errors["upsert"])
+        for index, row in list(to_upsert.items()):
+            if "id" not in row:
+                errors["upsert"][index] = {"id": ["Missing data for required field."]}
+                del to_upsert[index]
+        to_delete = self.check_deleted(to_delete, errors["delete"])
+        try:
+            EmployeeServices.bulk_write(
+                list(to_insert.values()), list(to_upsert.values()), to_delete
+            )
+        except SQLAlchemyError:
+            return {"message": "Employees could not be saved."}, 400
+        return {
+            "inserted": len(to_insert),
+            "upserted": len(to_upsert),
+            "deleted": len(to_delete),
+            "errors": errors,
+        }, 200
+
+    def load(self, items, errors):
+        """
+        Validate and deserialize a list of employees, check that their
+        departments exist.
+        :param items: a list with employees data.
+        :param errors: a dict to put the error messages to by item index.
+        :return: a dict mapping the index of every valid item to its data.
+        """
+        try:
+            loaded = self.employees_schema.load(items)
+        except ValidationError as e:
+            errors.update(e.messages)
+            loaded = e.valid_data
+        rows = {
+            index: row for index, row in enumerate(loaded) if index not in errors
+        }
+        dep_ids = DepartmentServices.get_existing_ids(
+            {row["department_id"] for row in rows.values()}
+        )
+        for index, row in list(rows.items()):
+            if row["department_id"] not in dep_ids:
+                errors[index] = {"department_id": ["Not valid department id"]}
+                del rows[index]
+        return rows
+
+    @staticmethod
+    def check_deleted(ids, errors):
+        """
+        Check the ids of employees to delete.
+        :param ids: a list with employee ids.
+        :param errors: a dict to put the error messages to by item index.
+        :return: a list of ids of existing employees.
+        """
+        valid = {
+            index: emp_id
+            for index, emp_id in enumerate(ids)
+            if isinstance(emp_id, int) and not isinstance(emp_id, bool)
+        }
+        existing = EmployeeServices.get_existing_ids(valid.values())
+        for index, emp_id in enumerate(ids):
+            if index not in valid:
+                errors[index] = "Not a valid integer."
+            elif emp_id not in existing:
+                errors[index] = f"Employee with id {emp_id} not found"
+        return [emp_id for emp_id in valid.values() if emp_id in existing]
+
+
+class EmployeesExportAPI(Resource):
+    """
+    This class defines the EmployeesExportAPI Resource, available at the
+    "/api/v1/employees/export" url
+    """
+
+    csv_columns = [
+        "id",
+        "name",
+        "date_of_birth",
+        "salary",
+        "department_id",
+        "department_name",
+    ]
+
+    @conditional("employees", "departments")
+    def get(self):
+        """
+        This method is called when GET request is sent to "/api/v1/employees/export"
+        url. Streams all employees ordered by id, serializing them one by one
+        while the rows are fetched from the database, so the memory used does
+        not depend on the number of employees.
+        The "format" query parameter selects the output: "ndjson" (default) -
+        one json-serialized employee per line, "csv" - a csv table with header.
+        :return: the streamed response, status code 200. If unknown format -
+        error message and status code 400.
+        """
+        output_format = request.args.get("format", "ndjson")
+        if output_format == "ndjson":
+            rows, mimetype = self.ndjson_rows(), "application/x-ndjson"
+        elif output_format == "csv":
+            rows, mimetype = self.csv_rows(), "text/csv"
+        else:
+            return {"message": "Format should be 'ndjson' or 'csv'."}, 400
+        return Response(
+            stream_with_context(rows),
+            mimetype=mimetype,
+            headers={
+                "Content-Disposition": f"attachment; filename=employees.{output_format}"
+            },
+        )
+
+    @staticmethod
+    def employees():
+        """Iterate over all employees with their departments joined."""
+        return EmployeeServices.iter_all(
+            options=[WITH_DEPARTMENT],
+            batch_size=current_app.config["EXPORT_BATCH_SIZE"],
+        )
+
+    def ndjson_rows(self):
+        """Generate employees serialized to json, one per line."""
+        schema = EmployeeSchema(
+            context={"salary_stats": DepartmentServices.get_salary_stats()}
+        )
+        for employee in self.employees():
+            yield json.dumps(schema.dump(employee)) + "\n"
+
+    def csv_rows(self):
+        """Generate the csv header and rows with employees data."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        rows = (
+            [
+                employee.id,
+                employee.name,
+                employee.date_of_birth.isoformat(),
+                employee.salary,
+                employee.department_id,
+                employee.department.name,
+            ]
+            for employee in self.employees()
+        )
+        for row in itertools.chain([self.csv_columns], rows):
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+
 class EmployeesSearchAPI(Resource):
     """
     This class defines the EmployeesSearchAPI Resource, available at urls
@@ -126,6 +403,8 @@ class EmployeesSearchAPI(Resource):
 
     employee_schema = EmployeeSchema()
 
+    @conditional("employees", "departments")
+    @cache.cached(search_tags)
     def get(self, dep_id=None):
         """
         This method is called when GET request is sent to
@@ -134,30 +413,74 @@ class EmployeesSearchAPI(Resource):
         The method parses the "date_of_birth" and(optional) "date_for_interval"
         query parameters from the GET request, and based on them filters out
         the employees born on a specified date or in an interval between dates.
+        Alternatively the "birthday_from" and (optional) "birthday_to" parameters
+        in "MM-DD" format filter out the employees whose birthday regardless of
+        the year falls in a window of days, e.g. "birthday_from=12-25&birthday_to=01-07"
+        (the window wraps across the year end).
         Depending on url fetches employees for a specific department or all.
-        :return: if sent to "/api/v1/employees/search" returns the list all
+        :return: if sent to "/api/v1/employees/search" returns the page of
         employees born on a specified date or in an interval between dates in json format,
-        status code 200. if sent to "/api/v1//departments/<dep_id>/employees/search" -
+        status code 200 and the "Link" header pointing to the next page.
+        if sent to "/api/v1//departments/<dep_id>/employees/search" -
         the same but only for employees from specified department.
-        If no "date_of_birth" parameter provided - returns error message, status code 400.
+        If no "date_of_birth" or "birthday_from" parameter provided or birthdays
+        are not valid - returns error message, status code 400.
         If invalid department id provided - returns error message, status code 404.
         """
         date_of_birth = request.args.get("date_of_birth")
-        if not date_of_birth:
+        birthday_from = request.args.get("birthday_from")
+        if not date_of_birth and not birthday_from:
             return {"message": "Enter search data"}, 400
-        date_of_birth = datetime.strptime(date_of_birth, "%Y-%m-%d").date()
-        date_for_interval = request.args.get("date_for_interval")
-        if date_for_interval:
-            date_for_interval = datetime.strptime(date_for_interval, "%Y-%m-%d").date()
-        if not dep_id:
-            employees = EmployeeServices.get_by_date_of_birth(
-                date_of_birth, date_for_interval
+        try:
+            after, limit = parse_page_args()
+        except PaginationError as e:
+            return {"message": str(e)}, 400
+        if dep_id and not DepartmentServices.get_by_id(dep_id):
+            return {"message": f"Department with id {dep_id} not found"}, 404
+        if birthday_from:
+            try:
+                start = parse_month_day(birthday_from)
+                end = parse_month_day(request.args.get("birthday_to", birthday_from))
+            except ValueError:
+                return {
+                    "message": "Parameters 'birthday_from' and 'birthday_to' "
+                    "should be in MM-DD format."
+                }, 400
+            employees = EmployeeServices.get_by_birthday(
+                start,
+                end,
+                dep_id,
+                options=[WITH_DEPARTMENT],
+                after=after,
+                limit=limit + 1,
             )
         else:
-            department = DepartmentServices.get_by_id(dep_id)
-            if not department:
-                return {"message": f"Department with id {dep_id} not found"}, 404
-            employees = EmployeeServices.get_by_date_of_birth_from_department(
-                dep_id, date_of_birth, date_for_interval
-            )
-        return self.employee_schema.dump(employees, many=True), 200
+            date_of_birth = datetime.strptime(date_of_birth, "%Y-%m-%d").date()
+            date_for_interval = request.args.get("date_for_interval")
+            if date_for_interval:
+                date_for_interval = datetime.strptime(
+                    date_for_interval, "%Y-%m-%d"
+                ).date()
+            if not dep_id:
+                employees = EmployeeServices.get_by_date_of_birth(
+                    date_of_birth,
+                    date_for_interval,
+                    options=[WITH_DEPARTMENT],
+                    after=after,
+                    limit=limit + 1,
+                )
+            else:
+                employees = EmployeeServices.get_by_date_of_birth_from_department(
+                    dep_id,
+                    date_of_birth,
+                    date_for_interval,
+                    options=[WITH_DEPARTMENT],
+                    after=after,
+                    limit=limit + 1,
+                )
+        employees, headers = paginate(employees, limit)
+        salary_stats = DepartmentServices.get_salary_stats(
+            {employee.department_id for employee in employees}
+        )
+        schema = EmployeeSchema(context={"salary_stats": salary_stats})
+        return schema.dump(employees, many=True), 200, headers
@@ -0,0 +1,120 @@
+"""
+Module contains helpers parsing the filtering, sorting and field
+projection query parameters of the REST-API list endpoints.
+"""
+from datetime import date
+
+from flask import current_app, request
+
+
+class FilterError(ValueError):
+    """Raised when the filtering, sorting or fields query parameters are not valid."""
+
+
+def parse_int_arg(name):
+    """:return: the query parameter as int, None if not specified."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError as e:
+        raise FilterError(f"Parameter '{name}' should be an integer.") from e
+
+
+def parse_employee_filters():
+    """
+    Parse the "salary_min", "salary_max", "name" (the beginning of the name)
+    and "department_id" (can be repeated or comma-separated) query parameters.
+    :return: a dict with keyword arguments of EmployeeServices.filter.
+    :raise FilterError: if the parameters are not valid.
+    """
+    department_ids = []
+    for value in request.args.getlist("department_id"):
+        try:
+            department_ids += [int(dep_id) for dep_id in value.split(",")]
+        except ValueError as e:
+            raise FilterError(
+                "Parameter 'department_id' should be a list of integers."
+            ) from e
+    return {
+        "salary_min": parse_int_arg("salary_min"),
+        "salary_max": parse_int_arg("salary_max"),
+        "name": request.args.get("name"),
+        "department_ids": department_ids or None,
+    }
+
+
+def parse_sort(columns):
+    """
+    Parse the "sort" query parameter: a column name, "-" prefix for
+    the descending order. Sorting by a column other than "id" requires
+    the "after_key" parameter (the value of the column of the row "after")
+    on pages following the first one, the "Link" header includes it.
+    :param columns: The names of the columns allowed to sort by.
+    :return: a tuple (sort, after_key), "id" and None by default.
+    :raise FilterError: if the parameters are not valid.
+    """
+    sort = request.args.get("sort", "id")
+    if sort.lstrip("-") not in columns:
+        raise FilterError(
+            f"Parameter 'sort' should be one of: {', '.join(columns)}, "
+            "with '-' prefix for the descending order."
+        )
+    after_key = request.args.get("after_key")
+    if sort.lstrip("-") == "id" or "after" not in request.args:
+        return sort, None
+    if after_key is None:
+        raise FilterError("Parameter 'after_key' is required with 'sort' and 'after'.")
+    if sort.lstrip("-") == "date_of_birth":
+        try:
+            after_key = date.fromisoformat(after_key)
+        except ValueError as e:
+            raise FilterError("Parameter 'after_key' should be a date.") from e
+    return sort, after_key
+
+
+def parse_fields(fields):
+    """
+    Parse the "fields" query parameter: a comma-separated list of fields
+    to return (a sparse fieldset).
+    :param fields: The names of the fields allowed.
+    :return: a list of the requested fields, None if not specified.
+    :raise FilterError: if unknown fields are requested.
+    """
+    value = request.args.get("fields")
+    if value is None:
+        return None
+    requested = [field for field in value.split(",") if field]
+    unknown = [field for field in requested if field not in fields]
+    if not requested or unknown:
+        raise FilterError(f"Parameter 'fields' should be a list of: {', '.join(fields)}.")
+    return requested
+
+
+def parse_distribution_args():
+    """
+    Parse the "percentiles" (a comma-separated list of numbers from 0 to 100)
+    and "bucket_width" (a positive integer) query parameters of the salary
+    stats endpoints, SALARY_PERCENTILES and SALARY_HISTOGRAM_BUCKET_WIDTH
+    by default.
+    :return: a tuple (percentiles, bucket_width).
+    :raise FilterError: if the parameters are not valid.
+    """
+    percentiles = current_app.config["SALARY_PERCENTILES"]
+    value = request.args.get("percentiles")
+    if value is not None:
+        try:
+            percentiles = [float(item) for item in value.split(",") if item]
+        except ValueError:
+            percentiles = None
+        if not percentiles or not all(0 <= item <= 100 for item in percentiles):
+            raise FilterError(
+                "Parameter 'percentiles' should be a list of numbers from 0 to 100."
+            )
+    bucket_width = parse_int_arg("bucket_width")
+    if bucket_width is None:
+        bucket_width = current_app.config["SALARY_HISTOGRAM_BUCKET_WIDTH"]
+    if bucket_width <= 0:
+        raise FilterError("Parameter 'bucket_width' should be positive.")
+    return percentiles, bucket_width
@@ -0,0 +1,60 @@
+"""
+Module contains helpers for the keyset (cursor) pagination of
+the REST-API list endpoints.
+"""
+from urllib.parse import urlencode
+
+from flask import current_app, request
+
+
+class PaginationError(ValueError):
+    """Raised when the "limit" or "after" query parameters are not valid."""
+
+
+def parse_page_args():
+    """
+    Parse the "limit" and "after" query parameters of the current request.
+    The page size defaults to the API_PAGE_SIZE config value and is capped
+    at API_MAX_PAGE_SIZE whatever the client asks for.
+    :return: a tuple (after, limit), "after" is None for the first page.
+    :raise PaginationError: if parameters are not positive integers.
+    """
+    limit = request.args.get("limit", current_app.config["API_PAGE_SIZE"])
+    after = request.args.get("after")
+    try:
+        limit = int(limit)
+        after = int(after) if after is not None else None
+    except ValueError as e:
+        raise PaginationError(
+            "Parameters 'limit' and 'after' should be integers."
+        ) from e
+    if limit < 1 or (after is not None and after < 0):
+        raise PaginationError("Parameters 'limit' and 'after' should be positive.")
+    return after, min(limit, current_app.config["API_MAX_PAGE_SIZE"])
+
+
+def paginate(items, limit, sort_key=None):
+    """
+    Cut the page from items fetched with one extra row and make the
+    Link header pointing to the next page.
+    :param items: a list of objects with an "id" attribute ordered by id,
+    fetched with "limit + 1" as the limit.
+    :param limit: the page size.
+    :param sort_key: if the items are ordered by another column - a function
+    returning the value of the column of an item, passed to the next page
+    in the "after_key" parameter.
+    :return: a tuple (page, headers). Headers are empty for the last page.
+    """
+    if len(items) <= limit:
+        return items, {}
+    page = items[:limit]
+    args = [
+        (key, value)
+        for key, value in request.args.items(multi=True)
+        if key not in ("limit", "after", "after_key")
+    ]
+    args += [("limit", limit), ("after", page[-1].id)]
+    if sort_key:
+        args.append(("after_key", sort_key(page[-1])))
+    next_url = f"{request.base_url}?{urlencode(args)}"
+    return page, {"Link": f'<{next_url}>; rel="next"'}
@@ -0,0 +1,82 @@
+"""
+Module contains the JSON representation of the REST-API responses.
+The body is encoded with orjson when it is installed, with the stdlib json
+module otherwise (or if the API_JSON_ENCODER config value is "json").
+Both encoders produce the same compact UTF-8 JSON, with dates in ISO format.
+"""
+import json
+from datetime import date
+from decimal import Decimal
+
+from flask import current_app
+
+from department_app.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def default(value):
+    """Encode the values the stdlib json module does not support."""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(data, indent=None):
+    """Encode data to JSON bytes ending with a new line with the json module."""
+    separators = (",", ": ") if indent else (",", ":")
+    return (
+        json.dumps(
+            data,
+            default=default,
+            indent=indent,
+            separators=separators,
+            ensure_ascii=False,
+        )
+        + "\n"
+    ).encode()
+
+
+def encode_orjson(data, indent=None):
+    """Encode data to JSON bytes ending with a new line with orjson."""
+    option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=default, option=option)
+
+
+ENCODERS = {"json": encode_json}
+if orjson is not None:
+    ENCODERS["orjson"] = encode_orjson
+ENCODERS["auto"] = ENCODERS.get("orjson", encode_json)
+
+
+def get_encoder():
+    """
+    :return: The encoder selected by the API_JSON_ENCODER config value:
+    "auto" (orjson if installed), "orjson" or "json".
+    """
+    name = current_app.config["API_JSON_ENCODER"]
+    try:
+        return ENCODERS[name]
+    except KeyError as e:
+        raise ValueError(f"JSON encoder {name!r} is not available") from e
+
+
+def output_json(data, code, headers=None):
+    """
+    Make a Flask response with the JSON encoded body, replaces the default
+    representation of Flask-RESTful. The body is indented in debug mode.
+    """
+    with timed("serialize"):
+        body = get_encoder()(data, indent=2 if current_app.debug else None)
+    response = current_app.response_class(
+        body, status=code, mimetype="application/json"
+    )
+    response.headers.extend(headers or {})
+    return response
@@ -3,11 +3,20 @@
 """Module contains serializer schemas for Department and Employee classes."""
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from marshmallow import fields, validate
+from department_app.instrumentation import timed
 from department_app.models import Department, Employee
-from department_app.service import DepartmentServices
+from department_app.service import DepartmentServices, EMPTY_SALARY_STATS
 
 
-class DepartmentSchema(SQLAlchemyAutoSchema):
+class InstrumentedSchema(SQLAlchemyAutoSchema):
+    """Schema adding the time of dump to the "serialize" request timer."""
+
+    def dump(self, obj, *, many=None):
+        with timed("serialize"):
+            return super().dump(obj, many=many)
+
+
+class DepartmentSchema(InstrumentedSchema):
     """
     Marshmallow-SQLAlchemy schema for serializing/deserializing
     department related data.
@@ -23,16 +32,24 @@ class DepartmentSchema(SQLAlchemyAutoSchema):
         """Metaclass for DepartmentSchema"""
 
         model = Department
+        # a stable order of keys, so equal data is always serialized
+        # to the same bytes
+        ordered = True
 
     def get_avg_salary(self, obj):
         """
         A method to add the calculated average salary data
-        to the serialized data on the fly.
+        to the serialized data on the fly. Takes the value from the
+        "salary_stats" context entry (see DepartmentServices.get_salary_stats)
+        if provided, else queries the aggregate for this department.
         """
-        return DepartmentServices.get_avg_salary(obj)
+        salary_stats = self.context.get("salary_stats")
+        if salary_stats is None:
+            return DepartmentServices.get_avg_salary(obj)
+        return salary_stats.get(obj.id, EMPTY_SALARY_STATS)["avg_salary"]
 
 
-class EmployeeSchema(SQLAlchemyAutoSchema):
+class EmployeeSchema(InstrumentedSchema):
     """
     Marshmallow-SQLAlchemy schema for serializing/deserializing
     employee related data.
@@ -47,3 +64,6 @@ class EmployeeSchema(SQLAlchemyAutoSchema):
         """Metaclass for EmployeeSchema"""
 
         model = Employee
+        ordered = True
+        # derived from date_of_birth, used only for searching
+        exclude = ["birth_mmdd"]
@@ -0,0 +1,123 @@
+"""
+Module contains the fast serializers of the read endpoints. They turn rows
+selected as plain tuples (see EmployeeServices.get_fields) into dicts equal
+to the output of DepartmentSchema and EmployeeSchema for the corresponding
+ORM objects, with the keys in the same order, so the responses are byte
+for byte the same while no ORM objects are built and no schema is run.
+
+A serializer is generated once per schema as the source of a function
+returning a dict literal and compiled, so serializing a row is a single
+function call.
+"""
+import functools
+
+from department_app.instrumentation import timed
+from department_app.service import EMPTY_SALARY_STATS
+from .schemas import DepartmentSchema, EmployeeSchema
+
+AVG_SALARY = 'context["salary_stats"].get({}, EMPTY_SALARY_STATS)["avg_salary"]'
+
+
+def compile_serializer(name, schema, expressions, **helpers):
+    """
+    Generate a serializer function "name(row, context)".
+    :param name: The name of the function.
+    :param schema: An ordered schema instance, the keys of the returned dicts
+    are its dump fields in the same order.
+    :param expressions: A dict mapping every dump field to the python expression
+    of its value, using the "row" and "context" arguments.
+    :param helpers: Functions the expressions call, by name.
+    :return: The compiled function.
+    """
+    items = ", ".join(
+        f"{field!r}: {expressions[field]}" for field in schema.dump_fields
+    )
+    source = f"def {name}(row, context):\n    return {{{items}}}\n"
+    namespace = dict(helpers, EMPTY_SALARY_STATS=EMPTY_SALARY_STATS)
+    exec(compile(source, f"<{name}>", "exec"), namespace)  # pylint: disable=W0122
+    return namespace[name]
+
+
+def department_expressions(prefix):
+    """
+    :return: the expressions of the fields of a department with
+    the "id" and "name" columns named "<prefix>id" and "<prefix>name".
+    """
+    return {
+        "id": f"row.{prefix}id",
+        "name": f"row.{prefix}name",
+        "avg_salary": AVG_SALARY.format(f"row.{prefix}id"),
+        "employees": (
+            "[serialize_employee(item, context)"
+            ' for item in context["employees"].get(row.id, ())]'
+        ),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def employee_serializer(fields=None):
+    """
+    Get the serializer equivalent to EmployeeSchema(only=fields) for rows
+    with the columns selected by EmployeeServices.get_fields(fields).
+    The serializer takes a context dict with the "salary_stats" entry
+    (see DepartmentServices.get_salary_stats) if "department" is serialized.
+    :param fields: A tuple with names of the fields, None - all fields.
+    """
+    schema = EmployeeSchema(only=fields)
+    expressions = {
+        "id": "row.id",
+        "name": "row.name",
+        "date_of_birth": "row.date_of_birth.isoformat()",
+        "salary": "row.salary",
+    }
+    helpers = {}
+    if "department" in schema.dump_fields:
+        helpers["serialize_department"] = compile_serializer(
+            "serialize_department",
+            schema.dump_fields["department"].schema,
+            department_expressions("department_"),
+        )
+        expressions["department"] = "serialize_department(row, context)"
+    return compile_serializer("serialize_employee", schema, expressions, **helpers)
+
+
+@functools.lru_cache(maxsize=None)
+def department_serializer():
+    """
+    Get the serializer equivalent to DepartmentSchema for department rows
+    with the "id" and "name" columns. The serializer takes a context dict
+    with the "salary_stats" entry (see DepartmentServices.get_salary_stats)
+    and the "employees" entry mapping department ids to lists of rows of
+    their employees with all fields but "department".
+    """
+    schema = DepartmentSchema()
+    nested = schema.dump_fields["employees"].inner.schema
+    return compile_serializer(
+        "serialize_department",
+        schema,
+        department_expressions(""),
+        serialize_employee=employee_serializer(tuple(nested.dump_fields)),
+    )
+
+
+@timed("serialize")
+def serialize_employees(rows, salary_stats, fields=None):
+    """
+    Serialize rows selected by EmployeeServices.get_fields.
+    :return: A list of dicts equal to EmployeeSchema(only=fields).dump(many=True).
+    """
+    serializer = employee_serializer(tuple(fields) if fields else None)
+    context = {"salary_stats": salary_stats}
+    return [serializer(row, context) for row in rows]
+
+
+@timed("serialize")
+def serialize_departments(rows, salary_stats, employees):
+    """
+    Serialize department rows with their employees.
+    :param employees: A dict mapping department ids to lists of employee rows.
+    :return: A list of dicts equal to DepartmentSchema().dump(many=True).
+    """
+    serializer = department_serializer()
+    context = {"salary_stats": salary_stats, "employees": employees}
+    return [serializer(row, context) for row in rows]
@@ -0,0 +1,108 @@
+"""Module contains Flask-Restful Resources for salary stats of departments"""
+from flask import current_app
+from flask_restful import Resource
+
+from department_app.cache import cache
+from department_app.service import EMPTY_SALARY_STATS, DepartmentServices
+from .conditional import conditional
+from .department_resourses import department_tags
+from .filtering import FilterError, parse_distribution_args
+
+
+def percentile_key(percentile):
+    """:return: The key of a percentile in responses, e.g. "p50" or "p99.9"."""
+    return f"p{percentile:g}"
+
+
+def serialize_distribution(row, stats, distribution, percentiles, bucket_width):
+    """
+    :param row: The (id, name) row of a department.
+    :param stats: The salary stats of the department (see get_salary_stats).
+    :param distribution: The salary distribution of the department (see
+    get_salary_distributions), None if it has no employees.
+    :return: A dict with the salary stats, the percentiles and the histogram
+    of the department. The histogram has all buckets from the one of the
+    minimal salary to the one of the maximal salary, including empty ones.
+    """
+    if distribution is None:
+        values, counts = [None] * len(percentiles), {}
+    else:
+        values, counts = distribution["percentiles"], distribution["histogram"]
+    buckets = range(min(counts), max(counts) + 1) if counts else ()
+    return {
+        "id": row.id,
+        "name": row.name,
+        "headcount": stats["headcount"],
+        "avg_salary": stats["avg_salary"],
+        "min_salary": stats["min_salary"],
+        "max_salary": stats["max_salary"],
+        "percentiles": {
+            percentile_key(percentile): value
+            for percentile, value in zip(percentiles, values)
+        },
+        "histogram": {
+            "bucket_width": bucket_width,
+            "buckets": [
+                {
+                    "min": number * bucket_width,
+                    "max": (number + 1) * bucket_width,
+                    "count": counts.get(number, 0),
+                }
+                for number in buckets
+            ],
+        },
+    }
+
+
+class SalaryStatsAPI(Resource):
+    """
+    This class defines the SalaryStatsAPI Resource, available at the
+    "/api/v1/stats" and "/api/v1/departments/<int:dep_id>/stats" urls.
+    """
+
+    @conditional("departments", "employees")
+    @cache.cached(department_tags)
+    def get(self, dep_id=None):
+        """
+        This method is called when GET request is sent to "/api/v1/stats"
+        or "/api/v1/departments/<int:dep_id>/stats" url.
+        :return: the salary stats, percentiles (see the "percentiles" query
+        parameter) and histogram (see the "bucket_width" query parameter)
+        of all departments ordered by id or of the department with the
+        specified id, status code 200. If invalid parameters - error message
+        and status code 400. If invalid id - error message and status code 404.
+        """
+        try:
+            percentiles, bucket_width = parse_distribution_args()
+        except FilterError as e:
+            return {"message": str(e)}, 400
+        if dep_id:
+            department = DepartmentServices.get_by_id(dep_id)
+            if not department:
+                return {"message": f"Department with id {dep_id} not found"}, 404
+            rows, dep_ids = [department], [department.id]
+        else:
+            rows, dep_ids = DepartmentServices.get_rows(), None
+        salary_stats = DepartmentServices.get_salary_stats(dep_ids)
+        max_buckets = current_app.config["SALARY_HISTOGRAM_MAX_BUCKETS"]
+        for stats in salary_stats.values():
+            low, high = stats["min_salary"], stats["max_salary"]
+            if high // bucket_width - low // bucket_width >= max_buckets:
+                return {
+                    "message": f"Parameter 'bucket_width' is too small, histograms "
+                    f"are limited to {max_buckets} buckets."
+                }, 400
+        distributions = DepartmentServices.get_salary_distributions(
+            percentiles, bucket_width, dep_ids
+        )
+        result = [
+            serialize_distribution(
+                row,
+                salary_stats.get(row.id, EMPTY_SALARY_STATS),
+                distributions.get(row.id),
+                percentiles,
+                bucket_width,
+            )
+            for row in rows
+        ]
+        return (result[0] if dep_id else result), 200
@@ -1,26 +1,245 @@
 """"Module contains Service classes with methods for DB CRUD operations."""
-from department_app.models import Department, Employee, db
+import itertools
+from datetime import datetime
+
+from sqlalchemy import DateTime, func, literal, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload
+
+from department_app.cache import cache, id_tag
+from department_app.models import (
+    Department,
+    DepartmentStats,
+    Employee,
+    TableVersion,
+    db,
+)
+from department_app.replicas import record_write
+from department_app.service.distributions import get_histograms, get_percentiles
+
+# Loader strategies for the read methods, chosen per endpoint depending on
+# the related data it serializes. Department.employees is a collection, so it
+# is loaded with one extra "SELECT ... IN" query, Employee.department is
+# a many-to-one relationship and is joined to the main query.
+WITH_EMPLOYEES = selectinload(Department.employees)
+WITH_DEPARTMENT = joinedload(Employee.department)
+
+# Columns the employees lists can be sorted by, all of them are indexed.
+EMPLOYEE_SORT_COLUMNS = ("id", "date_of_birth")
+# Columns of employees the lists can be projected to.
+EMPLOYEE_FIELDS = ("id", "name", "date_of_birth", "salary", "department")
+
+
+def keyset(query, model, after=None, limit=None, sort="id", after_key=None):
+    """
+    Order the query and apply the keyset pagination to it. Rows are ordered
+    by the sort column, then by the primary key.
+    :param query: The query to paginate.
+    :param model: The model class which columns the query is ordered by.
+    :param after: Only rows following the row with this id are returned.
+    :param limit: The maximal number of rows to return, None - no limit.
+    :param sort: The name of the column to order by, "-" prefix for
+    the descending order, e.g. "-date_of_birth".
+    :param after_key: The value of the sort column of the row with id "after",
+    required if the sort column is not "id".
+    :return: The paginated query.
+    """
+    descending = sort.startswith("-")
+    column = getattr(model, sort.lstrip("-"))
+    order = [column] if column is model.id else [column, model.id]
+    if after is not None:
+        if column is model.id:
+            position, last = model.id, after
+        else:
+            position, last = tuple_(column, model.id), tuple_(after_key, after)
+        query = query.filter(position < last if descending else position > last)
+    if descending:
+        order = [item.desc() for item in order]
+    return query.order_by(*order).limit(limit)
+
+
+def commit(*tables, stats=None):
+    """
+    Commit the current session. If the commit fails the session is rolled
+    back, so it stays usable in the same request (e.g. after an IntegrityError
+    the views keep rendering the page) and the error is re-raised.
+    :param tables: Names of the tables written in the transaction,
+    their versions are incremented with the same commit.
+    :param stats: Changes of department stats made by the transaction
+    (see salary_changes), applied with the same commit.
+    The request is then read from the primary database (see record_write).
+    """
+    try:
+        if stats:
+            db.session.flush()
+            for dep_id, (headcount, salary_sum) in stats.items():
+                adjust_stats(dep_id, headcount, salary_sum)
+        if tables:
+            bump_versions(*tables)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+    record_write()
+
+
+def bump_versions(*tables):
+    """
+    Increment the versions of the tables in the current transaction,
+    so they change only if the write they are made with is committed.
+    :param tables: Names of the written tables.
+    """
+    table = TableVersion.__table__
+    result = db.session.execute(
+        table.update()
+        .where(table.c.name.in_(tables))
+        .values(version=table.c.version + 1)
+    )
+    if result.rowcount < len(tables):
+        # the rows are created by the migration, but not by db.create_all()
+        existing = get_versions(tables)
+        db.session.execute(
+            table.insert(),
+            [{"name": name, "version": 1} for name in tables if name not in existing],
+        )
+
+
+def get_versions(tables):
+    """
+    :param tables: Names of the tables.
+    :return: A dict mapping the table names to their versions,
+    tables never written are missing.
+    """
+    query = db.session.query(TableVersion.name, TableVersion.version).filter(
+        TableVersion.name.in_(list(tables))
+    )
+    return dict(query)
+
+
+def salary_changes(before=None, after=None):
+    """
+    :param before: (department id, salary) of an employee before a write,
+    None if the employee is created.
+    :param after: (department id, salary) of the employee after the write,
+    None if the employee is deleted.
+    :return: A dict mapping ids of departments whose stats change to
+    (headcount change, salary sum change).
+    """
+    if before == after:
+        return {}
+    changes = {}
+    if before is not None:
+        changes[before[0]] = (-1, -before[1])
+    if after is not None:
+        headcount, salary_sum = changes.get(after[0], (0, 0))
+        changes[after[0]] = (headcount + 1, salary_sum + after[1])
+    return changes
+
+
+def adjust_stats(dep_id, headcount=0, salary_sum=0):
+    """
+    Apply a change to the stats of a department in the current transaction.
+    The headcount and the sum are incremented in place, so concurrent writes
+    do not overwrite each other, min and max salaries are read from
+    the (department_id, salary) index. The employees should be flushed.
+    :param dep_id: Id of the department.
+    :param headcount: The change of the number of employees.
+    :param salary_sum: The change of the sum of salaries.
+    """
+    table = DepartmentStats.__table__
+    employees = Employee.__table__
+
+    def extreme(function):
+        return (
+            select(function(employees.c.salary))
+            .where(employees.c.department_id == dep_id)
+            .scalar_subquery()
+        )
+
+    result = db.session.execute(
+        table.update()
+        .where(table.c.department_id == dep_id)
+        .values(
+            headcount=table.c.headcount + headcount,
+            salary_sum=table.c.salary_sum + salary_sum,
+            min_salary=extreme(func.min),
+            max_salary=extreme(func.max),
+            last_modified=datetime.utcnow(),
+        )
+    )
+    if not result.rowcount:
+        # the department was inserted bypassing the service layer
+        DepartmentServices._rebuild_stats([dep_id])
+
+
+def aggregate_salaries(dep_ids=None):
+    """
+    :param dep_ids: Ids of departments to aggregate, None - all departments.
+    :return: A select of (department id, headcount, salary sum, min salary,
+    max salary) rows aggregated from the employees, departments without
+    employees included.
+    """
+    departments, employees = Department.__table__, Employee.__table__
+    query = (
+        select(
+            departments.c.id,
+            func.count(employees.c.id),
+            func.coalesce(func.sum(employees.c.salary), 0),
+            func.min(employees.c.salary),
+            func.max(employees.c.salary),
+        )
+        .select_from(departments.outerjoin(employees))
+        .group_by(departments.c.id)
+    )
+    if dep_ids is not None:
+        query = query.where(departments.c.id.in_(list(dep_ids)))
+    return query
+
+
+EMPTY_SALARY_STATS = {
+    "headcount": 0,
+    "salary_sum": 0,
+    "avg_salary": 0,
+    "min_salary": 0,
+    "max_salary": 0,
+}
 
 
 class DepartmentServices:
     """Class with methods for DB CRUD operation on departments."""
 
     @staticmethod
-    def get_all():
+    def get_all(options=(), after=None, limit=None):
         """
-        This method returns a list with all Department objects from the DB.
-        Or an empty list if no department entries in DB.
+        This method returns a list with all Department objects from the DB
+        ordered by id. Or an empty list if no department entries in DB.
+        :param options: Loader options to apply to the query (e.g. WITH_EMPLOYEES).
+        :param after: Return only departments with id greater than "after".
+        :param limit: The maximal number of departments to return.
         """
-        return Department.query.all()
+        query = Department.query.options(*options)
+        return keyset(query, Department, after, limit).all()
 
     @staticmethod
-    def get_by_id(dep_id):
+    def get_rows(after=None, limit=None):
+        """
+        The same as get_all, but only the "id" and "name" columns
+        are selected instead of the whole Department objects.
+        :return: A list of (id, name) rows.
+        """
+        query = db.session.query(Department.id, Department.name)
+        return keyset(query, Department, after, limit).all()
+
+    @staticmethod
+    def get_by_id(dep_id, options=()):
         """
         Get a specific department by id from DB.
         :param dep_id: Id of the department to fetch (int)
+        :param options: Loader options to apply to the query (e.g. WITH_EMPLOYEES).
         :return: Department with id=dep_id, None if no such department.
         """
-        return Department.query.filter_by(id=dep_id).first()
+        return Department.query.options(*options).filter_by(id=dep_id).first()
 
     @staticmethod
     def create(data):
@@ -30,8 +249,10 @@ class DepartmentServices:
         :return: the created instance
         """
         department = Department(**data)
+        department.stats = DepartmentStats()
         db.session.add(department)
-        db.session.commit()
+        commit("departments")
+        cache.invalidate("departments")
         return department
 
     @staticmethod
@@ -45,7 +266,10 @@ class DepartmentServices:
         for key in data:
             if key in department.__dict__.keys():
                 department.__setattr__(key, data[key])
-        db.session.commit()
+        commit("departments")
+        cache.invalidate(
+            "departments", "employees", id_tag("department", department.id)
+        )
         return department
 
     @staticmethod
@@ -55,49 +279,263 @@ class DepartmentServices:
         :param department: The department to be deleted.
         :return: None
         """
+        dep_id = department.id
         db.session.delete(department)
-        db.session.commit()
+        commit("departments", "employees")
+        cache.invalidate("departments", "employees", id_tag("department", dep_id))
+
+    @staticmethod
+    def get_existing_ids(dep_ids):
+        """
+        Check which of the department ids exist in DB with one query.
+        :param dep_ids: An iterable with department ids.
+        :return: A set with ids of existing departments.
+        """
+        query = db.session.query(Department.id).filter(
+            Department.id.in_(list(dep_ids))
+        )
+        return {dep_id for dep_id, in query}
 
     @staticmethod
     def get_avg_salary(department):
         """
-        Calculate the average salary for employees in working department.
-        :param department: A Department instance to calculate the average for.
+        Get the average salary for employees in working department
+        from the department stats, so the employees are not aggregated.
+        :param department: A Department instance to get the average for.
         :return: The average salary round to 2 digits after point.
                  0 if no employees in the department.
         """
-        if not department.employees:
-            return 0
-        return round(
-            sum([employee.salary for employee in department.employees])
-            / len(department.employees),
-            2,
+        stats = DepartmentServices.get_salary_stats([department.id])
+        return stats.get(department.id, EMPTY_SALARY_STATS)["avg_salary"]
+
+    @staticmethod
+    def get_salary_stats(dep_ids=None):
+        """
+        Read salary aggregates of departments from the department stats
+        table with a single query. The average is derived from the sum and
+        the count, so it is rounded exactly as get_avg_salary always did.
+        :param dep_ids: An iterable with ids of departments to get the
+        aggregates for. If None - aggregates for all departments are read.
+        :return: A dict mapping department id to a dict with "headcount",
+        "salary_sum", "avg_salary", "min_salary" and "max_salary" keys.
+        Departments without employees are absent from the dict,
+        EMPTY_SALARY_STATS should be used for them.
+        """
+        query = db.session.query(
+            DepartmentStats.department_id,
+            DepartmentStats.headcount,
+            DepartmentStats.salary_sum,
+            DepartmentStats.min_salary,
+            DepartmentStats.max_salary,
+        ).filter(DepartmentStats.headcount > 0)
+        if dep_ids is not None:
+            query = query.filter(DepartmentStats.department_id.in_(list(dep_ids)))
+        return {
+            dep_id: {
+                "headcount": headcount,
+                "salary_sum": salary_sum,
+                "avg_salary": round(salary_sum / headcount, 2),
+                "min_salary": min_salary,
+                "max_salary": max_salary,
+            }
+            for dep_id, headcount, salary_sum, min_salary, max_salary in query
+        }
+
+    @staticmethod
+    def get_salary_distributions(percentiles, bucket_width, dep_ids=None):
+        """
+        Get the percentiles and the histograms of salaries of departments,
+        see department_app.service.distributions.
+        :param percentiles: A list of percentiles from 0 to 100.
+        :param bucket_width: The width of the histogram buckets.
+        :param dep_ids: Ids of departments, None - all departments.
+        :return: A dict mapping department id to a dict with "percentiles"
+        (a list of values in the order of the percentiles argument) and
+        "histogram" (a dict mapping the numbers of non-empty buckets to
+        the counts) keys. Departments without employees are absent.
+        """
+        histograms = get_histograms(bucket_width, dep_ids)
+        return {
+            dep_id: {"percentiles": values, "histogram": histograms.get(dep_id, {})}
+            for dep_id, values in get_percentiles(percentiles, dep_ids).items()
+        }
+
+    @staticmethod
+    def rebuild_stats(dep_ids=None):
+        """
+        Recalculate the department stats from the employees, e.g. to repair
+        them after employees were written bypassing the service layer.
+        :param dep_ids: Ids of departments to recalculate, None - all.
+        :return: None
+        """
+        DepartmentServices._rebuild_stats(dep_ids)
+        commit("departments", "employees")
+        cache.invalidate("departments", "employees")
+
+    @staticmethod
+    def _rebuild_stats(dep_ids=None):
+        """Recalculate the department stats in the current transaction."""
+        table = DepartmentStats.__table__
+        delete = table.delete()
+        if dep_ids is not None:
+            delete = delete.where(table.c.department_id.in_(list(dep_ids)))
+        db.session.execute(delete)
+        aggregates = aggregate_salaries(dep_ids).add_columns(
+            literal(datetime.utcnow(), DateTime)
+        )
+        db.session.execute(
+            table.insert().from_select(
+                [
+                    "department_id",
+                    "headcount",
+                    "salary_sum",
+                    "min_salary",
+                    "max_salary",
+                    "last_modified",
+                ],
+                aggregates,
+            )
         )
 
+    @staticmethod
+    def check_stats():
+        """
+        Compare the department stats with the aggregates of the employees.
+        :return: A list of (department id, expected, actual) tuples for
+        the departments whose stats differ, expected and actual are
+        (headcount, salary sum, min salary, max salary) tuples,
+        actual is None if the stats row is missing, expected is None
+        if the department does not exist.
+        """
+        expected = {
+            dep_id: tuple(values)
+            for dep_id, *values in db.session.execute(aggregate_salaries())
+        }
+        actual = {
+            dep_id: tuple(values)
+            for dep_id, *values in db.session.query(
+                DepartmentStats.department_id,
+                DepartmentStats.headcount,
+                DepartmentStats.salary_sum,
+                DepartmentStats.min_salary,
+                DepartmentStats.max_salary,
+            )
+        }
+        return [
+            (dep_id, expected.get(dep_id), actual.get(dep_id))
+            for dep_id in sorted(expected.keys() | actual.keys())
+            if expected.get(dep_id) != actual.get(dep_id)
+        ]
+
 
 class EmployeeServices:
     """Class with methods for DB CRUD operation on departments."""
 
     @staticmethod
-    def get_all():
+    def get_all(
+        options=(), after=None, limit=None, filters=None, sort="id", after_key=None
+    ):
         """
-        This method returns a list with all Employee objects from the DB.
-        Or an empty list if no employees in DB.
+        This method returns a list with all Employee objects from the DB
+        ordered by id. Or an empty list if no employees in DB.
+        :param options: Loader options to apply to the query (e.g. WITH_DEPARTMENT).
+        :param after: Return only employees following the one with id "after".
+        :param limit: The maximal number of employees to return.
+        :param filters: A dict with keyword arguments of EmployeeServices.filter.
+        :param sort: The column to order by (see keyset and EMPLOYEE_SORT_COLUMNS).
+        :param after_key: The value of the sort column of the employee "after".
         """
-        return Employee.query.all()
+        query = EmployeeServices.filter(
+            Employee.query.options(*options), **(filters or {})
+        )
+        return keyset(query, Employee, after, limit, sort, after_key).all()
 
     @staticmethod
-    def get_all_for_department(dep_id):
+    def get_fields(
+        fields, after=None, limit=None, filters=None, sort="id", after_key=None
+    ):
+        """
+        The same as get_all, but only the specified columns are selected
+        instead of the whole Employee objects.
+        :param fields: Names of the columns to select (see EMPLOYEE_FIELDS),
+        "department" selects the id and the name of the department.
+        :return: A list of rows with the requested columns, "id", "department_id"
+        and the sort column are always selected, the name of the department
+        is labeled "department_name".
+        """
+        names = {"id", sort.lstrip("-")} | set(fields)
+        columns = [
+            getattr(Employee, name)
+            for name in EMPLOYEE_FIELDS
+            if name in names and name != "department"
+        ]
+        query = db.session.query(*columns, Employee.department_id)
+        if "department" in names:
+            query = query.join(Employee.department).add_columns(
+                Department.name.label("department_name")
+            )
+        query = EmployeeServices.filter(query, **(filters or {}))
+        return keyset(query, Employee, after, limit, sort, after_key).all()
+
+    @staticmethod
+    def filter(
+        query, salary_min=None, salary_max=None, name=None, department_ids=None
+    ):
+        """
+        Filter a query of employees, the filters not specified are not applied.
+        :param query: The query to filter.
+        :param salary_min: The minimal salary.
+        :param salary_max: The maximal salary.
+        :param name: The beginning of the name.
+        :param department_ids: A list of ids of departments the employees work in,
+        an empty list matches no employees.
+        :return: The filtered query.
+        """
+        if salary_min is not None:
+            query = query.filter(Employee.salary >= salary_min)
+        if salary_max is not None:
+            query = query.filter(Employee.salary <= salary_max)
+        if name:
+            query = query.filter(Employee.name.startswith(name, autoescape=True))
+        if department_ids is not None:
+            query = query.filter(Employee.department_id.in_(department_ids))
+        return query
+
+    @staticmethod
+    def iter_all(options=(), batch_size=1000):
+        """
+        Iterate over all employees ordered by id without loading them into
+        memory at once. Rows are fetched with a server-side cursor (where
+        the database driver supports it) in batches of "batch_size".
+        :param options: Loader options to apply to the query (e.g. WITH_DEPARTMENT).
+        :param batch_size: The number of rows fetched from the cursor at a time.
+        :return: An iterator over Employee instances.
+        """
+        return (
+            Employee.query.options(*options)
+            .order_by(Employee.id)
+            .execution_options(stream_results=True)
+            .yield_per(batch_size)
+        )
+
+    @staticmethod
+    def get_all_for_department(dep_id, options=(), after=None, limit=None):
         """
         Get all employees working in a specified departmentю
         :param dep_id: ID of the department(int)
+        :param options: Loader options to apply to the query (e.g. WITH_DEPARTMENT).
+        :param after: Return only employees with id greater than "after".
+        :param limit: The maximal number of employees to return.
         :return: A list with all Employee instances with "department_id=dep_id"
-        Or an empty list if no employees in department with id=dep_id.
+        ordered by id. Or an empty list if no employees in department with id=dep_id.
         """
-        return Employee.query.filter_by(department_id=dep_id).all()
+        query = Employee.query.options(*options).filter_by(department_id=dep_id)
+        return keyset(query, Employee, after, limit).all()
 
     @staticmethod
-    def get_by_date_of_birth(date, date_for_interval=None):
+    def get_by_date_of_birth(
+        date, date_for_interval=None, options=(), after=None, limit=None
+    ):
         """
         Get employees born on a specific date or in an interval between dates.
         :param date: date object to get employees born on specific date
@@ -105,17 +543,25 @@ class EmployeeServices:
         (if date_for_interval passed).
         :param date_for_interval: date object to specify the upper point
         for interval to get employees born in interval.
+        :param options: Loader options to apply to the query (e.g. WITH_DEPARTMENT).
+        :param after: Return only employees with id greater than "after".
+        :param limit: The maximal number of employees to return.
         :return: a list of employees with date_of_birth matching the provided
-        parameters. Empty list if no matches.
+        parameters ordered by id. Empty list if no matches.
         """
+        query = Employee.query.options(*options)
         if not date_for_interval:
-            return Employee.query.filter_by(date_of_birth=date).all()
-        return Employee.query.filter(
-            Employee.date_of_birth.between(date, date_for_interval)
-        ).all()
+            query = query.filter_by(date_of_birth=date)
+        else:
+            query = query.filter(
+                Employee.date_of_birth.between(date, date_for_interval)
+            )
+        return keyset(query, Employee, after, limit).all()
 
     @staticmethod
-    def get_by_date_of_birth_from_department(dep_id, date, date_for_interval=None):
+    def get_by_date_of_birth_from_department(
+        dep_id, date, date_for_interval=None, options=(), after=None, limit=None
+    ):
         """
         Get employees born on a specific date or in an interval between dates,
         who work in a specified department.
@@ -125,31 +571,60 @@ class EmployeeServices:
         (if date_for_interval passed).
         :param date_for_interval: date object to specify the upper point
         for interval to get employees born in interval.
+        :param options: Loader options to apply to the query (e.g. WITH_DEPARTMENT).
+        :param after: Return only employees with id greater than "after".
+        :param limit: The maximal number of employees to return.
         :return: a list of employees with date_of_birth matching the provided
-        parameters. Empty list if no matches.
+        parameters ordered by id. Empty list if no matches.
         """
+        query = Employee.query.options(*options).filter_by(department_id=dep_id)
         if not date_for_interval:
-            return (
-                Employee.query.filter_by(date_of_birth=date)
-                    .filter_by(department_id=dep_id)
-                    .all()
-            )
-        return (
-            Employee.query.filter(
+            query = query.filter_by(date_of_birth=date)
+        else:
+            query = query.filter(
                 Employee.date_of_birth.between(date, date_for_interval)
             )
-                .filter_by(department_id=dep_id)
-                .all()
-        )
+        return keyset(query, Employee, after, limit).all()
 
     @staticmethod
-    def get_by_id(emp_id):
+    def get_by_birthday(start, end, dep_id=None, options=(), after=None, limit=None):
+        """
+        Get employees whose birthday (regardless of the year of birth) falls
+        in a window of days, searched by the indexed Employee.birth_mmdd column.
+        :param start: The first day of the window as month and day, e.g. 1225
+        for December 25 (see month_day).
+        :param end: The last day of the window in the same format. If it is
+        before start the window wraps across the year end, e.g. 1225 - 0107.
+        :param dep_id: Search only among employees of this department if specified.
+        :param options: Loader options to apply to the query (e.g. WITH_DEPARTMENT).
+        :param after: Return only employees with id greater than "after".
+        :param limit: The maximal number of employees to return.
+        :return: a list of found employees ordered by id. Empty list if no matches.
+        """
+        query = Employee.query.options(*options)
+        if dep_id is not None:
+            query = query.filter_by(department_id=dep_id)
+        if start <= end:
+            query = query.filter(Employee.birth_mmdd.between(start, end))
+        else:
+            # two closed ranges, so each of them is an index range scan
+            query = query.filter(
+                or_(
+                    Employee.birth_mmdd.between(start, 1231),
+                    Employee.birth_mmdd.between(101, end),
+                )
+            )
+        return keyset(query, Employee, after, limit).all()
+
+    @staticmethod
+    def get_by_id(emp_id, options=()):
         """
         Get a specific employee by id from DB.
         :param emp_id: Id of the employee to fetch (int)
+        :param options: Loader options to apply to the query (e.g. WITH_DEPARTMENT).
         :return: Employee with id=dep_id, None if no such department.
         """
-        return Employee.query.filter_by(id=emp_id).first()
+        return Employee.query.options(*options).filter_by(id=emp_id).first()
 
     @staticmethod
     def create(data):
@@ -158,10 +633,15 @@ class EmployeeServices:
         :param data: A dict with data to create an employee from.
         :return: the created instance
         """
-        db.session.execute("pragma foreign_keys=on")
         employee = Employee(**data)
         db.session.add(employee)
-        db.session.commit()
+        commit(
+            "employees",
+            stats=salary_changes(after=(employee.department_id, employee.salary)),
+        )
+        cache.invalidate(
+            "departments", "employees", id_tag("department", employee.department_id)
+        )
         return employee
 
     @staticmethod
@@ -172,11 +652,23 @@ class EmployeeServices:
         :param data: A dict with data to update the employee with.
         :return: The updated instance.
         """
-        db.session.execute("pragma foreign_keys=on")
+        old_dep_id, old_salary = employee.department_id, employee.salary
         for key in data:
             if key in employee.__dict__.keys():
                 employee.__setattr__(key, data[key])
-        db.session.commit()
+        commit(
+            "employees",
+            stats=salary_changes(
+                (old_dep_id, old_salary), (employee.department_id, employee.salary)
+            ),
+        )
+        cache.invalidate(
+            "departments",
+            "employees",
+            id_tag("employee", employee.id),
+            id_tag("department", old_dep_id),
+            id_tag("department", employee.department_id),
+        )
         return employee
 
     @staticmethod
@@ -186,5 +678,98 @@ class EmployeeServices:
         :param employee: The employee to be deleted.
         :return: None
         """
+        emp_id, dep_id = employee.id, employee.department_id
         db.session.delete(employee)
-        db.session.commit()
+        commit("employees", stats=salary_changes(before=(dep_id, employee.salary)))
+        cache.invalidate(
+            "departments",
+            "employees",
+            id_tag("employee", emp_id),
+            id_tag("department", dep_id),
+        )
+
+    @staticmethod
+    def get_existing_ids(emp_ids):
+        """
+        Check which of the employee ids exist in DB with one query.
+        :param emp_ids: An iterable with employee ids.
+        :return: A set with ids of existing employees.
+        """
+        query = db.session.query(Employee.id).filter(
+            Employee.id.in_(list(emp_ids))
+        )
+        return {emp_id for emp_id, in query}
+
+    @staticmethod
+    def bulk_write(to_insert=(), to_upsert=(), to_delete=()):
+        """
+        Insert, upsert and delete many employees in one transaction. Rows are
+        written with one executemany statement per operation, bypassing the ORM.
+        The data should be validated beforehand, if any statement fails
+        the whole transaction is rolled back and the error is re-raised.
+        :param to_insert: A list of dicts with data of new employees.
+        :param to_upsert: A list of dicts with data of employees including "id",
+        existing employees are updated, others are inserted.
+        :param to_delete: A list of ids of employees to delete.
+        :return: None
+        """
+        table = Employee.__table__
+        emp_ids = {row["id"] for row in to_upsert} | set(to_delete)
+        dep_ids = {
+            row["department_id"] for row in itertools.chain(to_insert, to_upsert)
+        }
+        if emp_ids:
+            # employees may move away from or be deleted from these departments
+            dep_ids |= {
+                dep_id
+                for dep_id, in db.session.query(Employee.department_id)
+                .filter(Employee.id.in_(list(emp_ids)))
+                .distinct()
+            }
+        if to_insert:
+            db.session.execute(table.insert(), to_insert)
+        if to_upsert:
+            EmployeeServices._upsert(to_upsert)
+        if to_delete:
+            db.session.execute(table.delete().where(table.c.id.in_(list(to_delete))))
+        # many rows may change, the stats of the affected departments are
+        # recalculated from the (department_id, salary) index instead
+        DepartmentServices._rebuild_stats(dep_ids)
+        commit("employees")
+        cache.invalidate(
+            "departments",
+            "employees",
+            *(id_tag("employee", emp_id) for emp_id in emp_ids),
+            *(id_tag("department", dep_id) for dep_id in dep_ids),
+        )
+
+    @staticmethod
+    def _upsert(rows):
+        """
+        Upsert employees with "INSERT ... ON CONFLICT (id) DO UPDATE" on
+        PostgreSQL and SQLite, with merge() of every row on other databases.
+        """
+        table = Employee.__table__
+        dialect = db.engine.dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            for row in rows:
+                db.session.merge(Employee(**row))
+            db.session.flush()
+            return
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                column.name: statement.excluded[column.name]
+                for column in table.columns
+                if column.name != "id"
+            },
+        )
+        db.session.execute(statement, rows)
+        if dialect == "postgresql":
+            # explicit ids do not advance the sequence, move it past them
+            db.session.execute(
+                "SELECT setval(pg_get_serial_sequence('employees', 'id'), "
+                "(SELECT max(id) FROM employees))"
+            )
@@ -0,0 +1,109 @@
+"""
+Module contains the salary distributions of departments: percentiles and
+fixed-width histograms. Histograms are counted by the database, percentiles
+are computed with percentile_cont on PostgreSQL. Other databases stream the
+salaries ordered by the (department_id, salary) index, one department is
+held in memory at a time as a NumPy array and its percentiles are computed
+with numpy.percentile, whose linear interpolation between the closest ranks
+gives the same results as percentile_cont.
+"""
+import itertools
+
+import numpy
+from sqlalchemy import func, literal, select
+
+from department_app.models import Employee, db
+
+# The number of salaries fetched from the cursor at a time.
+STREAM_BATCH_SIZE = 10000
+
+
+def compute_percentiles(salaries, percentiles):
+    """
+    :param salaries: A non-empty iterable of salaries.
+    :param percentiles: A list of percentiles from 0 to 100.
+    :return: A list of the percentiles of the salaries as floats.
+    """
+    array = numpy.fromiter(salaries, dtype=numpy.float64)
+    return numpy.percentile(array, percentiles).tolist()
+
+
+def salary_rows(dep_ids=None):
+    """
+    :param dep_ids: Ids of departments, None - all departments.
+    :return: A select of (department id, salary) rows of the employees.
+    """
+    employees = Employee.__table__
+    query = select(employees.c.department_id, employees.c.salary)
+    if dep_ids is not None:
+        query = query.where(employees.c.department_id.in_(list(dep_ids)))
+    return query
+
+
+def get_percentiles(percentiles, dep_ids=None):
+    """
+    :param percentiles: A list of percentiles from 0 to 100.
+    :param dep_ids: Ids of departments, None - all departments.
+    :return: A dict mapping department id to the list of the percentiles
+    of its salaries. Departments without employees are absent.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return get_percentiles_in_db(percentiles, dep_ids)
+    return get_percentiles_streamed(percentiles, dep_ids)
+
+
+def get_percentiles_in_db(percentiles, dep_ids=None):
+    """The same as get_percentiles, computed with percentile_cont."""
+    query = salary_rows(dep_ids)
+    salary = query.selected_columns.salary
+    department_id = query.selected_columns.department_id
+    query = query.with_only_columns(
+        department_id,
+        *(
+            func.percentile_cont(percentile / 100).within_group(salary)
+            for percentile in percentiles
+        ),
+    ).group_by(department_id)
+    return {
+        dep_id: [float(value) for value in values]
+        for dep_id, *values in db.session.execute(query)
+    }
+
+
+def get_percentiles_streamed(percentiles, dep_ids=None):
+    """
+    The same as get_percentiles, computed from the salaries streamed
+    in the order of the (department_id, salary) index.
+    """
+    query = salary_rows(dep_ids)
+    query = query.order_by(*query.selected_columns)
+    rows = db.session.execute(
+        query, execution_options={"stream_results": True}
+    ).yield_per(STREAM_BATCH_SIZE)
+    return {
+        dep_id: compute_percentiles((salary for _, salary in group), percentiles)
+        for dep_id, group in itertools.groupby(rows, key=lambda row: row[0])
+    }
+
+
+def get_histograms(bucket_width, dep_ids=None):
+    """
+    Count the salaries of departments in buckets of the same width,
+    the bucket "n" holds the salaries from n * width to (n + 1) * width.
+    :param bucket_width: The width of the buckets.
+    :param dep_ids: Ids of departments, None - all departments.
+    :return: A dict mapping department id to a dict mapping the numbers
+    of non-empty buckets to the numbers of salaries in them.
+    Departments without employees are absent.
+    """
+    query = salary_rows(dep_ids)
+    department_id = query.selected_columns.department_id
+    # integer division on both SQLite and PostgreSQL
+    bucket = (query.selected_columns.salary / literal(bucket_width)).label("bucket")
+    query = query.with_only_columns(department_id, bucket, func.count()).group_by(
+        department_id, bucket
+    )
+    histograms = {}
+    for dep_id, number, count in db.session.execute(query):
+        histograms.setdefault(dep_id, {})[number] = count
+    return histograms
@@ -4,6 +4,7 @@ import time
 
 import pytest
 from flask import request
+from sqlalchemy import event
 
 from department_app import create_app, db
 from department_app.models.insert_data import populate_db
@@ -100,3 +101,19 @@ def server(module_app):
     import requests
 
     requests.post("http://localhost:5000/shutdown")
+
+
+@pytest.fixture
+def sql_statements(app):
+    """
+    A pytest fixture collecting the SQL statements sent to the database
+    while the test runs. Used to check the number of queries an endpoint issues.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
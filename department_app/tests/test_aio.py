@@ -0,0 +1,198 @@
+# pylint: disable=C0116
+"""Module contains tests for the ASGI serving mode"""
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+import uvicorn
+from sqlalchemy.util import greenlet_spawn
+
+from config import TestConfig
+from department_app.aio import (
+    async_database_url,
+    build_environ,
+    create_asgi_app,
+    run_blocking,
+)
+from department_app.models import db
+from department_app.models.insert_data import populate_db
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("sqlite:////tmp/app.db", "sqlite+aiosqlite:////tmp/app.db"),
+        ("postgresql://user:pass@db/app", "postgresql+asyncpg://user:pass@db/app"),
+        ("postgresql+asyncpg://db/app", "postgresql+asyncpg://db/app"),
+    ],
+)
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected
+
+
+def test_async_database_url_unsupported():
+    with pytest.raises(ValueError):
+        async_database_url("mysql://db/app")
+
+
+def test_build_environ():
+    scope = {
+        "method": "POST",
+        "path": "/api/v1/employees",
+        "query_string": b"a=1&b=%C3%A9",
+        "http_version": "1.1",
+        "server": ("127.0.0.1", 8000),
+        "client": ("10.0.0.1", 5555),
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", b"2"),
+            (b"accept", b"text/html"),
+            (b"accept", b"application/json"),
+        ],
+    }
+    environ = build_environ(scope, b"{}")
+    assert environ["PATH_INFO"] == "/api/v1/employees"
+    assert environ["QUERY_STRING"] == "a=1&b=%C3%A9"
+    assert environ["CONTENT_TYPE"] == "application/json"
+    assert environ["CONTENT_LENGTH"] == "2"
+    assert environ["HTTP_ACCEPT"] == "text/html,application/json"
+    assert environ["REMOTE_ADDR"] == "10.0.0.1"
+    assert environ["wsgi.input"].read() == b"{}"
+
+
+def test_run_blocking():
+    async def run():
+        return await greenlet_spawn(run_blocking, threading.get_ident)
+
+    assert asyncio.run(run()) != threading.get_ident()
+    assert run_blocking(threading.get_ident) == threading.get_ident()
+
+
+async def call(app, method, path, body=b"", query=b""):
+    """:return: (status, headers, body chunks) of a request to the ASGI app."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "http_version": "1.1",
+        "headers": [(b"content-type", b"application/json")],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    chunks = [message["body"] for message in sent[1:] if message["body"]]
+    return sent[0]["status"], dict(sent[0]["headers"]), chunks
+
+
+@pytest.fixture
+def asgi_app():
+    return make_asgi_app(TestConfig)
+
+
+def make_asgi_app(config_class):
+    app = create_asgi_app(config_class)
+
+    def setup():
+        with app.app.app_context():
+            db.create_all()
+            populate_db()
+
+    asyncio.run(greenlet_spawn(setup))
+    return app
+
+
+def test_asgi_requests(asgi_app):
+    data = {
+        "name": "New Employee",
+        "date_of_birth": "1994-04-05",
+        "salary": 777,
+        "department_id": 1,
+    }
+
+    async def run():
+        created = await call(
+            asgi_app, "POST", "/api/v1/employees", json.dumps(data).encode()
+        )
+        responses = await asyncio.gather(
+            *(call(asgi_app, "GET", f"/api/v1/employees/{num}") for num in range(1, 7)),
+            call(asgi_app, "GET", "/api/v1/employees/export"),
+            call(asgi_app, "GET", "/departments"),
+            call(asgi_app, "GET", "/api/v1/stats", query=b"percentiles=50"),
+        )
+        return created, responses
+
+    created, responses = asyncio.run(run())
+    assert created[0] == 201
+    *employees, export, view, stats = responses
+    assert [status for status, _, _ in employees] == [200] * 6
+    assert json.loads(b"".join(employees[5][2]))["salary"] == 777
+    assert b"".join(export[2]).count(b"\n") == 6
+    assert view[0] == 200 and view[1][b"content-type"].startswith(b"text/html")
+    assert json.loads(b"".join(stats[2]))[0]["percentiles"] == {"p50": 1000.0}
+
+
+def test_asgi_lifespan(asgi_app):
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(asgi_app({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def test_asgi_replicas_use_async_driver(tmp_path):
+    class ReplicaConfig(TestConfig):
+        DATABASE_REPLICA_URLS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+
+    app = create_asgi_app(ReplicaConfig)
+    (engine,) = app.app.extensions["replicas"].engines
+    assert engine.dialect.driver == "aiosqlite"
+    app.dispose()
+
+
+def test_asgi_http_views_backend():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    class HttpViewsConfig(TestConfig):
+        VIEWS_BACKEND = "http"
+        API_BASE_URL = f"http://127.0.0.1:{port}"
+        API_CLIENT_READ_TIMEOUT = 2
+        API_CLIENT_RETRIES = 0
+
+    app = make_asgi_app(HttpViewsConfig)
+
+    async def run():
+        # the REST-API is served by the same event loop as the page
+        config = uvicorn.Config(app, port=port, lifespan="off", log_level="warning")
+        server = uvicorn.Server(config)
+        serving = asyncio.ensure_future(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        try:
+            return await asyncio.wait_for(call(app, "GET", "/departments/2"), 10)
+        finally:
+            server.should_exit = True
+            await serving
+
+    status, _, chunks = asyncio.run(run())
+    assert status == 200
+    page = b"".join(chunks)
+    assert b"Dep 2" in page and b"Employee 3" in page
@@ -0,0 +1,205 @@
+# pylint: disable=C0116
+"""Module contains tests for the response cache and its backends."""
+import pytest
+
+from department_app import create_app, db
+from department_app.cache import cache
+from department_app.cache.backends import LRUCache, SharedCache
+from department_app.models.insert_data import populate_db
+from config import TestConfig
+
+
+# Tests for the backends
+def test_lru_cache_evicts_least_recently_used():
+    backend = LRUCache(maxsize=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    assert backend.get("a") == 1
+    backend.set("c", 3)
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    backend = LRUCache(ttl=-1)
+    backend.set("a", 1)
+    assert backend.get("a") is None
+
+
+def test_lru_cache_invalidates_by_tag():
+    backend = LRUCache()
+    backend.set("a", 1, ["x"])
+    backend.set("b", 2, ["x", "y"])
+    backend.set("c", 3, ["y"])
+    backend.invalidate(["x"])
+    assert backend.get("a") is None
+    assert backend.get("b") is None
+    assert backend.get("c") == 3
+    assert (backend.hits, backend.misses) == (1, 2)
+
+
+def test_shared_cache_instances_share_entries():
+    store = {}
+    first, second = SharedCache(store=store), SharedCache(store=store)
+    first.set("a", {"value": 1}, ["x"])
+    assert second.get("a") == {"value": 1}
+    second.invalidate(["x"])
+    assert first.get("a") is None
+
+
+# Tests for cached REST-API responses
+def test_cache_hit_and_miss(client):
+    first = client.get("/api/v1/employees/1")
+    second = client.get("/api/v1/employees/1")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json == first.json
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_cache_keys_include_query_string(client):
+    client.get("/api/v1/employees?limit=2")
+    response = client.get("/api/v1/employees?limit=3")
+    assert response.headers["X-Cache"] == "MISS"
+    assert len(response.json) == 3
+
+
+def test_cache_does_not_store_errors(client):
+    client.get("/api/v1/employees/42")
+    response = client.get("/api/v1/employees/42")
+    assert response.status_code == 404
+    assert response.headers["X-Cache"] == "MISS"
+
+
+def test_cache_disabled():
+    class NullCacheConfig(TestConfig):
+        CACHE_TYPE = "null"
+
+    app = create_app(config_class=NullCacheConfig)
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get("/api/v1/departments")
+        response = client.get("/api/v1/departments")
+    assert response.headers["X-Cache"] == "MISS"
+
+
+def test_unknown_cache_type():
+    class WrongCacheConfig(TestConfig):
+        CACHE_TYPE = "wrong"
+
+    with pytest.raises(ValueError):
+        create_app(config_class=WrongCacheConfig)
+
+
+# Tests for invalidation: no read returns stale data after a write
+def test_employee_update_invalidates_cached_reads(client):
+    urls = [
+        "/api/v1/employees",
+        "/api/v1/employees/1",
+        "/api/v1/departments",
+        "/api/v1/departments/1",
+        "/api/v1/departments/2",
+        "/api/v1/departments/2/employees",
+        "/api/v1/employees/search?date_of_birth=1991-01-01",
+    ]
+    for url in urls:
+        client.get(url)
+    client.patch("/api/v1/employees/1", json={"salary": 5000, "department_id": 2})
+    for url in urls:
+        assert client.get(url).headers["X-Cache"] == "MISS", url
+    assert client.get("/api/v1/employees/1").json["salary"] == 5000
+    assert client.get("/api/v1/departments/1").json["avg_salary"] == 1000
+    employees = client.get("/api/v1/departments/2/employees").json
+    assert 1 in [employee["id"] for employee in employees]
+
+
+def test_employee_create_and_delete_invalidate_cached_reads(client):
+    client.get("/api/v1/departments/1")
+    client.get("/api/v1/employees")
+    response = client.post(
+        "/api/v1/employees",
+        json={
+            "name": "New Employee",
+            "date_of_birth": "1990-01-01",
+            "salary": 4000,
+            "department_id": 1,
+        },
+    )
+    assert len(client.get("/api/v1/employees").json) == 6
+    assert client.get("/api/v1/departments/1").json["avg_salary"] == 2000
+    client.delete(f"/api/v1/employees/{response.json['id']}")
+    assert len(client.get("/api/v1/employees").json) == 5
+    assert client.get("/api/v1/departments/1").json["avg_salary"] == 1000
+
+
+def test_department_update_invalidates_cached_reads(client):
+    client.get("/api/v1/departments")
+    client.get("/api/v1/employees/1")
+    client.put("/api/v1/departments/1", json={"name": "Renamed"})
+    assert client.get("/api/v1/departments").json[0]["name"] == "Renamed"
+    assert client.get("/api/v1/employees/1").json["department"]["name"] == "Renamed"
+
+
+def test_department_create_and_delete_invalidate_cached_reads(client):
+    client.get("/api/v1/departments")
+    client.get("/api/v1/employees")
+    client.post("/api/v1/departments", json={"name": "Dep 3"})
+    assert len(client.get("/api/v1/departments").json) == 3
+    client.delete("/api/v1/departments/1")
+    assert len(client.get("/api/v1/departments").json) == 2
+    assert len(client.get("/api/v1/employees").json) == 3
+
+
+def test_bulk_write_invalidates_cached_reads(client):
+    client.get("/api/v1/employees/1")
+    client.get("/api/v1/employees/3")
+    client.get("/api/v1/departments/1")
+    client.get("/api/v1/departments/2")
+    client.post(
+        "/api/v1/employees/bulk",
+        json={
+            "upsert": [
+                {
+                    "id": 1,
+                    "name": "Moved",
+                    "date_of_birth": "1991-01-01",
+                    "salary": 1000,
+                    "department_id": 2,
+                }
+            ],
+            "delete": [3],
+        },
+    )
+    assert client.get("/api/v1/employees/1").json["name"] == "Moved"
+    assert client.get("/api/v1/employees/3").status_code == 404
+    assert client.get("/api/v1/departments/1").json["avg_salary"] == 1000
+    assert client.get("/api/v1/departments/2").headers["X-Cache"] == "MISS"
+
+
+def test_write_of_other_process_is_seen(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+
+    # two worker processes with their own "lru" caches on one database
+    first, second = create_app(FileConfig), create_app(FileConfig)
+    with first.app_context():
+        db.create_all()
+        populate_db()
+    client = first.test_client()
+    stale = client.get("/api/v1/departments/1")
+    assert client.get("/api/v1/departments/1").headers["X-Cache"] == "HIT"
+    second.test_client().put("/api/v1/departments/1", json={"name": "Renamed"})
+
+    response = client.get("/api/v1/departments/1")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json["name"] == "Renamed"
+    assert response.headers["ETag"] != stale.headers["ETag"]
+    response = client.get(
+        "/api/v1/departments/1", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    for app in (first, second):
+        with app.app_context():
+            db.engine.dispose()
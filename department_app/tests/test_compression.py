@@ -0,0 +1,81 @@
+# pylint: disable=W0613
+# pylint: disable=C0116
+"""Module contains tests for the compression of responses."""
+import gzip
+
+import pytest
+
+from department_app.models.insert_data import seed_db
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def seeded(app):
+    seed_db(departments=5, employees=200, seed=3)
+
+
+def test_large_response_compressed(client, seeded):
+    plain = client.get("/api/v1/employees")
+    response = client.get("/api/v1/employees", headers=GZIP)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    assert len(response.data) < len(plain.data) / 4
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_not_compressed_without_accept_encoding(client, seeded):
+    response = client.get("/api/v1/employees")
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+@pytest.mark.parametrize("accept", ["identity", "gzip;q=0", "compress"])
+def test_not_compressed_unless_accepted(client, seeded, accept):
+    response = client.get("/api/v1/employees", headers={"Accept-Encoding": accept})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_small_response_not_compressed(app, client):
+    app.config["COMPRESS_MIN_SIZE"] = 10 ** 6
+    response = client.get("/api/v1/employees", headers=GZIP)
+    assert "Content-Encoding" not in response.headers
+
+
+def test_compression_level(app, client, seeded):
+    fast = client.get("/api/v1/departments", headers=GZIP).data
+    app.config["COMPRESS_LEVEL"] = 9
+    app.extensions["cache"].clear()
+    best = client.get("/api/v1/departments", headers=GZIP).data
+    assert len(best) <= len(fast)
+    assert gzip.decompress(best) == gzip.decompress(fast)
+
+
+@pytest.mark.parametrize("output_format", ["ndjson", "csv"])
+def test_streamed_response_compressed(client, seeded, output_format):
+    url = f"/api/v1/employees/export?format={output_format}"
+    plain = client.get(url)
+    response = client.get(url, headers=GZIP)
+    assert response.is_streamed
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_compressed_response_etag(client, seeded):
+    etag = client.get("/api/v1/employees").headers["ETag"]
+    compressed_etag = client.get("/api/v1/employees", headers=GZIP).headers["ETag"]
+    assert compressed_etag == etag[:-1] + '-gzip"'
+    for tag in (etag, compressed_etag):
+        response = client.get(
+            "/api/v1/employees", headers=dict(GZIP, **{"If-None-Match": tag})
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == tag
+
+
+def test_errors_not_compressed_when_small(client):
+    response = client.get("/api/v1/employees/100", headers=GZIP)
+    assert response.status_code == 404
+    assert "Content-Encoding" not in response.headers
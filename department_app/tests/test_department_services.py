@@ -2,8 +2,11 @@
 # pylint: disable=C0116
 """Module contains test for DepartmentServices class's methods"""
 
+from datetime import date
+
 import pytest
 
+from department_app.models import db
 from department_app.service import DepartmentServices, EmployeeServices
 
 
@@ -70,3 +73,127 @@ def test_avg_salary_empty_department(app):
     dep_3 = DepartmentServices.create(dict(name="Dep 3"))
     salary_3 = DepartmentServices.get_avg_salary(dep_3)
     assert salary_3 == 0
+
+
+def test_salary_stats_all_departments(app):
+    stats = DepartmentServices.get_salary_stats()
+    assert stats[1] == {
+        "headcount": 2,
+        "salary_sum": 2000,
+        "avg_salary": 1000,
+        "min_salary": 1000,
+        "max_salary": 1000,
+    }
+    assert stats[2]["headcount"] == 3
+    assert stats[2]["avg_salary"] == 2000
+
+
+def test_salary_stats_for_specified_departments(app):
+    stats = DepartmentServices.get_salary_stats([2])
+    assert list(stats) == [2]
+
+
+def test_salary_stats_rounding(app):
+    EmployeeServices.create(
+        dict(
+            name="Employee 6",
+            date_of_birth=date(1996, 6, 6),
+            salary=1001,
+            department_id=1,
+        )
+    )
+    stats = DepartmentServices.get_salary_stats([1])
+    assert stats[1]["avg_salary"] == round((1000 + 1000 + 1001) / 3, 2)
+
+
+def test_salary_stats_empty_department(app):
+    dep_3 = DepartmentServices.create(dict(name="Dep 3"))
+    stats = DepartmentServices.get_salary_stats()
+    assert dep_3.id not in stats
+
+
+def stored_stats(dep_id):
+    stats = DepartmentServices.get_salary_stats([dep_id]).get(dep_id)
+    return stats and (
+        stats["headcount"],
+        stats["salary_sum"],
+        stats["min_salary"],
+        stats["max_salary"],
+    )
+
+
+def test_stats_kept_current_by_employee_writes(app):
+    employee = EmployeeServices.create(
+        dict(
+            name="Employee 6",
+            date_of_birth=date(1996, 6, 6),
+            salary=500,
+            department_id=1,
+        )
+    )
+    assert stored_stats(1) == (3, 2500, 500, 1000)
+    EmployeeServices.update(employee, {"salary": 3000})
+    assert stored_stats(1) == (3, 5000, 1000, 3000)
+    EmployeeServices.update(employee, {"department_id": 2})
+    assert stored_stats(1) == (2, 2000, 1000, 1000)
+    assert stored_stats(2) == (4, 9000, 2000, 3000)
+    EmployeeServices.delete(employee)
+    assert stored_stats(2) == (3, 6000, 2000, 2000)
+    for employee in DepartmentServices.get_by_id(1).employees:
+        EmployeeServices.delete(employee)
+    assert stored_stats(1) is None
+    assert DepartmentServices.check_stats() == []
+
+
+def test_stats_kept_current_by_bulk_write(app):
+    EmployeeServices.bulk_write(
+        to_insert=[
+            dict(
+                name="Employee 6",
+                date_of_birth=date(1996, 6, 6),
+                salary=4000,
+                department_id=1,
+            )
+        ],
+        to_delete=[5],
+    )
+    assert stored_stats(1) == (3, 6000, 1000, 4000)
+    assert stored_stats(2) == (2, 4000, 2000, 2000)
+    assert DepartmentServices.check_stats() == []
+
+
+def test_stats_deleted_with_department(app):
+    DepartmentServices.delete(DepartmentServices.get_by_id(2))
+    assert stored_stats(2) is None
+    assert DepartmentServices.check_stats() == []
+
+
+def test_check_and_rebuild_stats(app):
+    db.session.execute(
+        "UPDATE department_stats SET headcount = 7 WHERE department_id = 1"
+    )
+    db.session.execute("DELETE FROM department_stats WHERE department_id = 2")
+    assert DepartmentServices.check_stats() == [
+        (1, (2, 2000, 1000, 1000), (7, 2000, 1000, 1000)),
+        (2, (3, 6000, 2000, 2000), None),
+    ]
+    DepartmentServices.rebuild_stats()
+    assert DepartmentServices.check_stats() == []
+    assert stored_stats(2) == (3, 6000, 2000, 2000)
+
+
+def test_stats_commands(app):
+    runner = app.test_cli_runner()
+    db.session.execute("DELETE FROM department_stats WHERE department_id = 2")
+    db.session.commit()
+    result = runner.invoke(args=["check-stats"])
+    assert result.exit_code == 1
+    assert "department 2: expected (3, 6000, 2000, 2000), stored None" in result.output
+    assert runner.invoke(args=["check-stats", "--repair"]).exit_code == 0
+    result = runner.invoke(args=["check-stats"])
+    assert result.exit_code == 0
+    assert "consistent" in result.output
+    db.session.execute("DELETE FROM department_stats")
+    db.session.commit()
+    assert runner.invoke(args=["rebuild-stats"]).exit_code == 0
+    assert DepartmentServices.check_stats() == []
@@ -234,3 +234,56 @@ def test_departments_employees_delete(client):
     dep_id = 1
     response = client.delete(f"/api/v1/departments/{dep_id}/employees")
     assert response.status_code == 405
+
+
+def test_departments_get_all_avg_salary(client):
+    response = client.get("/api/v1/departments")
+    assert [dep["avg_salary"] for dep in response.json] == [1000.0, 2000.0]
+
+
+def test_departments_get_all_avg_salary_empty_department(client):
+    client.post("/api/v1/departments", json={"name": "Dep 3"})
+    response = client.get("/api/v1/departments")
+    assert response.json[-1]["avg_salary"] == 0
+
+
+# Tests for pagination
+def test_departments_get_page(client):
+    response = client.get("/api/v1/departments?limit=1")
+    assert [dep["id"] for dep in response.json] == [1]
+    assert 'after=1>; rel="next"' in response.headers["Link"]
+    response = client.get("/api/v1/departments?limit=1&after=1")
+    assert [dep["id"] for dep in response.json] == [2]
+    assert "Link" not in response.headers
+
+
+def test_departments_employees_get_page(client):
+    response = client.get("/api/v1/departments/2/employees?limit=2&after=3")
+    assert [emp["id"] for emp in response.json] == [4, 5]
+    assert "Link" not in response.headers
+
+
+def test_departments_employees_get_page_wrong_params(client):
+    response = client.get("/api/v1/departments/2/employees?limit=-5")
+    assert response.status_code == 400
+
+
+# Tests for conditional GET requests
+def test_departments_get_etag(client):
+    etag = client.get("/api/v1/departments/1").headers["ETag"]
+    response = client.get("/api/v1/departments/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_departments_get_etag_changes_after_employee_write(client):
+    etag = client.get("/api/v1/departments/1").headers["ETag"]
+    client.delete("/api/v1/employees/1")
+    response = client.get("/api/v1/departments/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json["employees"]) == 1
+
+
+def test_departments_get_no_etag_on_error(client):
+    response = client.get("/api/v1/departments/42")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
@@ -64,6 +64,44 @@ def test_get_by_date_of_birth_from_department_with_interval(app):
     assert all(emp.department_id == dep_id for emp in employees)
 
 
+def test_get_by_birthday(app):
+    employees = EmployeeServices.get_by_birthday(201, 401)
+    assert [emp.id for emp in employees] == [2, 3]
+
+
+def test_get_by_birthday_across_year_end(app):
+    employees = EmployeeServices.get_by_birthday(1215, 215)
+    assert [emp.id for emp in employees] == [1, 2]
+
+
+def test_get_by_birthday_from_department(app):
+    employees = EmployeeServices.get_by_birthday(1215, 315, dep_id=2)
+    assert [emp.id for emp in employees] == [3]
+
+
+def test_birth_mmdd_follows_date_of_birth(app):
+    employee = EmployeeServices.get_by_id(1)
+    assert employee.birth_mmdd == 101
+    EmployeeServices.update(employee, dict(date_of_birth=date(1990, 12, 31)))
+    assert EmployeeServices.get_by_birthday(1231, 1231) == [employee]
+
+
+def test_bulk_write_sets_birth_mmdd(app):
+    EmployeeServices.bulk_write(
+        to_insert=[
+            dict(
+                name="New Employee",
+                date_of_birth=date(1999, 9, 9),
+                salary=3000,
+                department_id=1,
+            )
+        ]
+    )
+    assert [emp.name for emp in EmployeeServices.get_by_birthday(909, 909)] == [
+        "New Employee"
+    ]
+
+
 def test_create(app):
     new_employee = EmployeeServices.create(
         dict(
@@ -1,6 +1,12 @@
 # pylint: disable=C0301
 # pylint: disable=C0116
 """Module contains test for EmployeesAPI and EmployeesSearchAPI classes"""
+import csv
+import io
+import json
+
+import pytest
+
 
 # Tests for EmployeesAPI
 
@@ -233,6 +239,36 @@ def test_employees_search_two_querystrings(client):
     )
 
 
+def test_employees_search_birthday_window(client):
+    response = client.get(
+        "/api/v1/employees/search?birthday_from=12-20&birthday_to=02-10"
+    )
+    assert response.status_code == 200
+    assert [emp["id"] for emp in response.json] == [1, 2]
+    assert "birth_mmdd" not in response.json[0]
+
+
+def test_employees_search_birthday_one_day(client):
+    response = client.get("/api/v1/employees/search?birthday_from=03-03")
+    assert response.status_code == 200
+    assert [emp["id"] for emp in response.json] == [3]
+
+
+@pytest.mark.parametrize("birthday", ["13-01", "02-30", "0101", "abc"])
+def test_employees_search_birthday_wrong_format(client, birthday):
+    response = client.get(f"/api/v1/employees/search?birthday_from={birthday}")
+    assert response.status_code == 400
+    assert "MM-DD" in response.json["message"]
+
+
+def test_departments_employees_search_birthday(client):
+    response = client.get(
+        "/api/v1/departments/2/employees/search?birthday_from=01-01&birthday_to=04-30"
+    )
+    assert response.status_code == 200
+    assert [emp["id"] for emp in response.json] == [3, 4]
+
+
 # Tests for searching employees in department
 
 
@@ -273,3 +309,266 @@ def test_departments_employees_search_one_querystring_nonexistent_department(cli
     )
     assert response.status_code == 404
     assert f"id {wrong_dep_id} not found" in response.json["message"]
+
+
+# Tests for pagination
+def test_employees_get_page(client):
+    response = client.get("/api/v1/employees?limit=2")
+    assert response.status_code == 200
+    assert [emp["id"] for emp in response.json] == [1, 2]
+    assert 'after=2>; rel="next"' in response.headers["Link"]
+
+
+def test_employees_get_next_page(client):
+    response = client.get("/api/v1/employees?limit=2&after=2")
+    assert [emp["id"] for emp in response.json] == [3, 4]
+
+
+def test_employees_get_last_page(client):
+    response = client.get("/api/v1/employees?limit=2&after=4")
+    assert [emp["id"] for emp in response.json] == [5]
+    assert "Link" not in response.headers
+
+
+def test_employees_follow_link_header(client):
+    url, ids = "/api/v1/employees?limit=2", []
+    while url:
+        response = client.get(url)
+        ids += [emp["id"] for emp in response.json]
+        url = response.headers.get("Link", "").partition(">")[0][1:]
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_employees_get_page_size_capped(app, client):
+    app.config["API_MAX_PAGE_SIZE"] = 3
+    response = client.get("/api/v1/employees?limit=1000")
+    assert len(response.json) == 3
+    assert "limit=3" in response.headers["Link"]
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=ten", "after=-1", "after=x"])
+def test_employees_get_page_wrong_params(client, query):
+    response = client.get(f"/api/v1/employees?{query}")
+    assert response.status_code == 400
+
+
+def test_employees_search_page(client):
+    response = client.get(
+        "/api/v1/employees/search?date_of_birth=1990-01-01"
+        "&date_for_interval=2000-01-01&limit=3"
+    )
+    assert [emp["id"] for emp in response.json] == [1, 2, 3]
+    assert "date_of_birth=1990-01-01" in response.headers["Link"]
+    assert "after=3" in response.headers["Link"]
+
+
+# Tests for EmployeesExportAPI
+def test_employees_export_ndjson(client):
+    response = client.get("/api/v1/employees/export")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+    lines = response.data.decode().splitlines()
+    exported = [json.loads(line) for line in lines]
+    assert exported == client.get("/api/v1/employees").json
+
+
+def test_employees_export_csv(client):
+    response = client.get("/api/v1/employees/export?format=csv")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(response.data.decode())))
+    assert rows[0] == [
+        "id",
+        "name",
+        "date_of_birth",
+        "salary",
+        "department_id",
+        "department_name",
+    ]
+    assert rows[1] == ["1", "Employee 1", "1991-01-01", "1000", "1", "Dep 1"]
+    assert len(rows) == 6
+
+
+def test_employees_export_small_batches(app, client):
+    app.config["EXPORT_BATCH_SIZE"] = 2
+    response = client.get("/api/v1/employees/export")
+    assert len(response.data.decode().splitlines()) == 5
+
+
+def test_employees_export_wrong_format(client):
+    response = client.get("/api/v1/employees/export?format=xml")
+    assert response.status_code == 400
+
+
+# Tests for EmployeesBulkAPI
+def make_employee_data(number, department_id=1):
+    return {
+        "name": f"Bulk Employee {number}",
+        "date_of_birth": "1990-01-01",
+        "salary": 1000 + number,
+        "department_id": department_id,
+    }
+
+
+def test_employees_bulk_insert(client):
+    data = {"insert": [make_employee_data(number) for number in range(100)]}
+    response = client.post("/api/v1/employees/bulk", json=data)
+    assert response.status_code == 200
+    assert response.json["inserted"] == 100
+    employees = client.get("/api/v1/departments/1/employees?limit=1000").json
+    assert len(employees) == 102
+
+
+def test_employees_bulk_upsert(client):
+    data = {
+        "upsert": [
+            dict(make_employee_data(1, department_id=2), id=1),
+            dict(make_employee_data(2), id=42),
+        ]
+    }
+    response = client.post("/api/v1/employees/bulk", json=data)
+    assert response.status_code == 200
+    assert response.json["upserted"] == 2
+    updated = client.get("/api/v1/employees/1").json
+    assert updated["name"] == "Bulk Employee 1"
+    assert updated["department"]["id"] == 2
+    assert client.get("/api/v1/employees/42").json["name"] == "Bulk Employee 2"
+
+
+def test_employees_bulk_delete(client):
+    response = client.post("/api/v1/employees/bulk", json={"delete": [1, 2]})
+    assert response.status_code == 200
+    assert response.json["deleted"] == 2
+    assert client.get("/api/v1/employees/1").status_code == 404
+    assert len(client.get("/api/v1/employees").json) == 3
+
+
+def test_employees_bulk_reports_item_errors(client):
+    data = {
+        "insert": [make_employee_data(1), {"name": "E"}, make_employee_data(3, 42)],
+        "upsert": [make_employee_data(4)],
+        "delete": [5, 42, "five"],
+    }
+    response = client.post("/api/v1/employees/bulk", json=data)
+    assert response.status_code == 200
+    assert response.json["inserted"] == 1
+    assert response.json["upserted"] == 0
+    assert response.json["deleted"] == 1
+    errors = response.json["errors"]
+    assert set(errors["insert"]) == {"1", "2"}
+    assert errors["insert"]["2"] == {"department_id": ["Not valid department id"]}
+    assert "id" in errors["upsert"]["0"]
+    assert set(errors["delete"]) == {"1", "2"}
+
+
+def test_employees_bulk_wrong_data(client):
+    response = client.post("/api/v1/employees/bulk", json=[make_employee_data(1)])
+    assert response.status_code == 400
+    response = client.post("/api/v1/employees/bulk", json={"insert": {}})
+    assert response.status_code == 400
+
+
+def test_employees_bulk_too_many_items(app, client):
+    app.config["API_BULK_MAX_ITEMS"] = 2
+    data = {"insert": [make_employee_data(number) for number in range(3)]}
+    response = client.post("/api/v1/employees/bulk", json=data)
+    assert response.status_code == 400
+
+
+# Tests for conditional GET requests
+def test_employees_get_etag(client):
+    response = client.get("/api/v1/employees")
+    etag = response.headers["ETag"]
+    response = client.get("/api/v1/employees", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_employees_get_etag_changes_after_write(client):
+    etag = client.get("/api/v1/employees/1").headers["ETag"]
+    client.patch("/api/v1/employees/1", json={"salary": 4200})
+    response = client.get("/api/v1/employees/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json["salary"] == 4200
+    assert response.headers["ETag"] != etag
+
+
+def test_employees_get_etag_depends_on_url(client):
+    first = client.get("/api/v1/employees?limit=2").headers["ETag"]
+    second = client.get("/api/v1/employees?limit=3").headers["ETag"]
+    assert first != second
+
+
+def test_employees_export_etag(client):
+    etag = client.get("/api/v1/employees/export").headers["ETag"]
+    response = client.get("/api/v1/employees/export", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+# Tests for filtering, sorting and fields of the employees list
+def test_employees_get_filtered(client):
+    response = client.get("/api/v1/employees?salary_min=1500&salary_max=2000")
+    assert [emp["id"] for emp in response.json] == [3, 4, 5]
+    response = client.get("/api/v1/employees?name=Employee%202")
+    assert [emp["id"] for emp in response.json] == [2]
+    response = client.get("/api/v1/employees?name=%25")
+    assert response.json == []
+
+
+def test_employees_get_filtered_by_departments(client):
+    client.post("/api/v1/departments", json={"name": "Dep 3"})
+    client.post(
+        "/api/v1/departments/3/employees",
+        json={"name": "Employee 6", "date_of_birth": "1990-01-01", "salary": 10},
+    )
+    response = client.get("/api/v1/employees?department_id=1,3")
+    assert [emp["id"] for emp in response.json] == [1, 2, 6]
+    response = client.get("/api/v1/employees?department_id=2&department_id=3")
+    assert [emp["id"] for emp in response.json] == [3, 4, 5, 6]
+
+
+def test_employees_get_sorted_pages(client):
+    client.patch("/api/v1/employees/5", json={"date_of_birth": "1993-03-03"})
+    ids, url = [], "/api/v1/employees?sort=-date_of_birth&limit=2"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        ids += [emp["id"] for emp in response.json]
+        url = response.headers.get("Link", "").partition(">")[0][1:]
+    assert ids == [4, 5, 3, 2, 1]
+
+
+def test_employees_get_fields(client):
+    response = client.get("/api/v1/employees?fields=name,salary&limit=2")
+    assert response.json == [
+        {"name": "Employee 1", "salary": 1000},
+        {"name": "Employee 2", "salary": 1000},
+    ]
+    assert "after=2" in response.headers["Link"]
+
+
+def test_employees_get_fields_with_department(client):
+    response = client.get("/api/v1/employees/1")
+    expected = {key: response.json[key] for key in ("id", "department")}
+    response = client.get("/api/v1/employees?fields=id,department&limit=1")
+    assert response.json == [expected]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "salary_min=x",
+        "department_id=1,x",
+        "sort=name",
+        "sort=date_of_birth&after=2",
+        "sort=date_of_birth&after=2&after_key=x",
+        "fields=department_id",
+        "fields=",
+    ],
+)
+def test_employees_get_wrong_list_args(client, query):
+    response = client.get(f"/api/v1/employees?{query}")
+    assert response.status_code == 400
+    assert "message" in response.json
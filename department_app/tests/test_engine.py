@@ -0,0 +1,83 @@
+# pylint: disable=C0116
+"""Module contains tests for the configuration of the database engine"""
+import pytest
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+from config import TestConfig
+from department_app import create_app
+from department_app.models import db
+from department_app.models.engine import engine_options
+from department_app.models.insert_data import populate_db
+
+
+def options_for(url):
+    config = {name: getattr(TestConfig, name) for name in dir(TestConfig)}
+    return engine_options(dict(config, SQLALCHEMY_DATABASE_URI=url))
+
+
+def test_engine_options():
+    assert "pool_size" not in options_for("sqlite://")
+    options = options_for("sqlite:////tmp/app.db")
+    assert options["poolclass"] is QueuePool
+    assert options["pool_size"] == TestConfig.DB_POOL_SIZE
+    assert options["connect_args"] == {"check_same_thread": False}
+    assert options_for("sqlite+aiosqlite:////tmp/app.db")["poolclass"] is (
+        AsyncAdaptedQueuePool
+    )
+    options = options_for("postgresql://db/app")
+    assert "poolclass" not in options
+    assert options["max_overflow"] == TestConfig.DB_MAX_OVERFLOW
+    assert options["pool_recycle"] == TestConfig.DB_POOL_RECYCLE
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        populate_db()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_sqlite_pragmas(file_app):
+    assert isinstance(db.engine.pool, QueuePool)
+    with db.engine.connect() as connection:
+        pragmas = {
+            name: connection.execute(f"PRAGMA {name}").scalar()
+            for name in ("journal_mode", "synchronous", "foreign_keys", "cache_size")
+        }
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,
+        "foreign_keys": 1,
+        "cache_size": TestConfig.SQLITE_CACHE_SIZE,
+    }
+
+
+def test_memory_database_pragmas(app):
+    assert isinstance(db.engine.pool, StaticPool)
+    assert db.session.execute("PRAGMA foreign_keys").scalar() == 1
+
+
+def test_readers_and_writer_do_not_block(file_app):
+    pooled = [db.engine.raw_connection(), db.engine.raw_connection()]
+    reader, writer = (connection.connection for connection in pooled)
+    try:
+        for connection in (reader, writer):
+            connection.isolation_level = None
+            connection.execute("PRAGMA busy_timeout=0")
+        reader.execute("BEGIN")
+        assert reader.execute("SELECT sum(salary) FROM employees").fetchone() == (8000,)
+        # a commit while a read transaction is open fails in the rollback journal mode
+        writer.execute("UPDATE employees SET salary = salary + 1")
+        assert reader.execute("SELECT sum(salary) FROM employees").fetchone() == (8000,)
+        reader.execute("COMMIT")
+        assert reader.execute("SELECT sum(salary) FROM employees").fetchone() == (8005,)
+    finally:
+        for connection in pooled:
+            connection.invalidate()
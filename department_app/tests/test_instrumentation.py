@@ -0,0 +1,172 @@
+# pylint: disable=W0613
+# pylint: disable=C0116
+"""Module contains tests for the per-request instrumentation."""
+import logging
+import re
+import time
+
+from flask import g
+
+from config import TestConfig
+from department_app import create_app, db
+from department_app.instrumentation import (
+    EXPLAIN,
+    RequestStats,
+    current_stats,
+    timed,
+)
+from department_app.service import EmployeeServices
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) statements", serialize;dur=[\d.]+, '
+    r"client;dur=[\d.]+, total;dur=[\d.]+"
+)
+
+
+def test_server_timing_header(client, sql_statements):
+    response = client.get("/api/v1/employees")
+    match = SERVER_TIMING.fullmatch(response.headers["Server-Timing"])
+    assert match and int(match.group(1)) == len(sql_statements)
+
+
+def test_server_timing_on_views_and_errors(client):
+    assert "Server-Timing" in client.get("/departments").headers
+    assert "Server-Timing" in client.get("/api/v1/employees/100").headers
+
+
+def test_request_logged(client, caplog):
+    with caplog.at_level(logging.INFO):
+        client.get("/api/v1/departments/1?x=1")
+    line = caplog.records[-1].getMessage()
+    assert line.startswith("request method=GET path=/api/v1/departments/1 ")
+    assert "endpoint=/api/v1/departments/<dep_id> status=200" in line
+    assert re.search(r"db_statements=\d+ db_ms=[\d.]+ serialize_ms=[\d.]+", line)
+
+
+def test_access_log_has_own_file(tmp_path, monkeypatch):
+    class LoggingConfig(TestConfig):
+        TESTING = False
+
+    monkeypatch.chdir(tmp_path)
+    app = create_app(LoggingConfig)
+    access_logger = app.logger.getChild("access")
+    handlers = list(app.logger.handlers)
+    try:
+        with app.app_context():
+            db.create_all()
+        client = app.test_client()
+        for _ in range(3):
+            client.get("/api/v1/departments")
+        app.logger.warning("slow query")
+    finally:
+        for logger in (app.logger, access_logger):
+            for handler in logger.handlers:
+                handler.close()
+        app.logger.handlers = handlers[:-1]
+        access_logger.handlers = []
+        access_logger.propagate = True
+    access = (tmp_path / "log" / "access.log").read_text()
+    assert access.count("request method=GET path=/api/v1/departments ") == 3
+    assert (tmp_path / "log" / "departments.log").read_text().count("\n") == 1
+
+
+def test_metrics(client):
+    client.get("/api/v1/employees/1")
+    client.get("/api/v1/employees/2")
+    client.get("/api/v1/employees/100")
+    body = client.get("/metrics").data.decode()
+    sample = 'method="GET",endpoint="/api/v1/employees/<emp_id>"'
+    assert f'http_requests_total{{{sample},status="200"}} 2' in body
+    assert f'http_requests_total{{{sample},status="404"}} 1' in body
+    assert f'http_request_duration_seconds_bucket{{{sample},le="+Inf"}} 3' in body
+    assert f"http_request_duration_seconds_count{{{sample}}} 3" in body
+    assert 'db_statements_total{endpoint="/api/v1/employees/<emp_id>"}' in body
+    assert 'component="serialize"' in body
+
+
+def test_metrics_cache_stats(client):
+    client.get("/api/v1/employees/1")
+    client.get("/api/v1/employees/1")
+    body = client.get("/metrics").data.decode()
+    assert 'response_cache_requests_total{result="hit"} 1' in body
+    assert 'response_cache_requests_total{result="miss"} 1' in body
+
+
+def test_timed_counts_nested_blocks_once(app):
+    g.request_stats = stats = RequestStats()
+    with timed("serialize"):
+        time.sleep(0.02)
+        with timed("serialize"):
+            time.sleep(0.02)
+    assert 0.04 <= stats.timings["serialize"] < 0.06
+
+
+def test_timed_excludes_statements(app):
+    g.request_stats = stats = RequestStats()
+    start = time.perf_counter()
+    with timed("serialize"):
+        EmployeeServices.get_all()
+    elapsed = time.perf_counter() - start
+    assert stats.statements == 1
+    assert stats.timings["serialize"] + stats.timings["db"] <= elapsed
+
+
+def test_timed_outside_of_requests():
+    with timed("serialize"):
+        pass
+    assert current_stats() is None
+
+
+def slow_queries(caplog):
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("slow query ")
+    ]
+
+
+def test_slow_query_logged_with_plan(app, client, caplog):
+    app.config["SLOW_QUERY_THRESHOLD"] = 1e-9
+    with caplog.at_level(logging.WARNING):
+        client.get("/api/v1/departments/2/employees")
+    lines = slow_queries(caplog)
+    assert lines
+    line = next(line for line in lines if "FROM employees" in line)
+    assert "endpoint=/api/v1/departments/<dep_id>/employees" in line
+    assert re.search(r"parameters=\(.*2.*\)", line)
+    assert "SEARCH employees USING INDEX" in line.split(" plan=")[1]
+    body = client.get("/metrics").data.decode()
+    endpoint = "/api/v1/departments/<dep_id>/employees"
+    assert f'db_slow_statements_total{{endpoint="{endpoint}"}}' in body
+
+
+def test_slow_query_without_plan(app, client, caplog):
+    app.config["SLOW_QUERY_THRESHOLD"] = 1e-9
+    data = {
+        "name": "New Employee",
+        "date_of_birth": "1994-04-05",
+        "salary": 777,
+        "department_id": 1,
+    }
+    with caplog.at_level(logging.WARNING):
+        client.post("/api/v1/employees", json=data)
+    line = next(line for line in slow_queries(caplog) if "INSERT INTO" in line)
+    assert line.endswith("plan=None")
+
+
+def test_failed_explain_keeps_transaction(app, client, caplog, monkeypatch):
+    app.config["SLOW_QUERY_THRESHOLD"] = 1e-9
+    monkeypatch.setitem(EXPLAIN, "sqlite", "EXPLAIN NOTHING ")
+    with caplog.at_level(logging.WARNING):
+        response = client.patch("/api/v1/employees/1", json={"salary": 4200})
+    assert response.status_code == 200
+    line = next(line for line in slow_queries(caplog) if "UPDATE employees" in line)
+    assert line.endswith("plan=None")
+    assert EmployeeServices.get_by_id(1).salary == 4200
+
+
+def test_slow_query_log_disabled(app, client, caplog):
+    app.config["SLOW_QUERY_THRESHOLD"] = 0
+    with caplog.at_level(logging.WARNING):
+        client.get("/api/v1/departments/2/employees")
+    assert not slow_queries(caplog)
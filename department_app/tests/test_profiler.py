@@ -0,0 +1,71 @@
+# pylint: disable=W0613
+# pylint: disable=C0116
+"""Module contains tests for the profiler of single requests."""
+import os
+import pstats
+
+import pytest
+from itsdangerous import URLSafeTimedSerializer
+
+from department_app.profiler import SALT, check_token, make_token
+
+
+@pytest.fixture
+def profiler(app, tmp_path):
+    app.config["PROFILER_ENABLED"] = True
+    app.config["PROFILER_DIR"] = str(tmp_path)
+    return tmp_path
+
+
+def test_token(app):
+    assert check_token(app.config, make_token(app.config))
+    assert not check_token(app.config, "wrong")
+    other = URLSafeTimedSerializer("other secret", salt=SALT).dumps("profile")
+    assert not check_token(app.config, other)
+
+
+def test_profile_saved_to_file(client, profiler):
+    expected = client.get("/api/v1/departments").data
+    token = make_token(client.application.config)
+    response = client.get("/api/v1/departments", headers={"X-Profile": token})
+    assert response.status_code == 200
+    assert response.data == expected
+    path = profiler / response.headers["X-Profile-File"]
+    stats = pstats.Stats(str(path))
+    assert any(name == "get_rows" for _, _, name in stats.stats)
+    assert response.headers["X-Cache"] == "MISS"
+
+
+def test_profile_inline(client, profiler):
+    token = make_token(client.application.config)
+    response = client.get(
+        f"/api/v1/employees/100?profile={token}&profile_output=inline"
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Profiled-Status"] == "404 NOT FOUND"
+    assert response.mimetype == "text/plain"
+    assert "function calls" in response.data.decode()
+    assert not os.listdir(profiler)
+
+
+def test_profile_streamed_response(client, profiler):
+    token = make_token(client.application.config)
+    response = client.get("/api/v1/employees/export", headers={"X-Profile": token})
+    assert response.data.count(b"\n") == 5
+    assert os.listdir(profiler) == [response.headers["X-Profile-File"]]
+
+
+@pytest.mark.parametrize("enabled, token", [(False, "valid"), (True, "wrong")])
+def test_not_profiled(app, client, profiler, enabled, token):
+    app.config["PROFILER_ENABLED"] = enabled
+    if token == "valid":
+        token = make_token(app.config)
+    response = client.get("/api/v1/departments", headers={"X-Profile": token})
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+    assert not os.listdir(profiler)
+
+
+def test_profile_token_command(app):
+    result = app.test_cli_runner().invoke(args=["profile-token"])
+    assert check_token(app.config, result.output.strip())
@@ -0,0 +1,169 @@
+# pylint: disable=W0613
+# pylint: disable=W0621
+# pylint: disable=C0116
+"""
+Module contains tests limiting the number of SQL statements issued
+by the REST-API endpoints and the views. The limits do not depend on the amount of data,
+so the tests fail if a lazy load per row (N+1 queries) is introduced.
+"""
+from datetime import date
+
+import pytest
+
+from department_app import db
+from department_app.models import Department, Employee
+from department_app.service import DepartmentServices
+
+
+@pytest.fixture
+def more_data(app):
+    """Adds more departments with employees to make N+1 queries visible."""
+    for dep_number in range(3, 8):
+        department = Department(name=f"Dep {dep_number}")
+        department.employees = [
+            Employee(
+                name=f"Employee {dep_number}-{emp_number}",
+                date_of_birth=date(1990, dep_number, emp_number + 1),
+                salary=1000 * emp_number + 1,
+            )
+            for emp_number in range(4)
+        ]
+        db.session.add(department)
+    db.session.commit()
+    DepartmentServices.rebuild_stats()
+    db.session.expire_all()
+
+
+@pytest.mark.parametrize(
+    "url, max_statements",
+    [
+        ("/api/v1/departments", 4),
+        ("/api/v1/departments/3", 4),
+        ("/api/v1/departments/3/employees", 4),
+        ("/api/v1/employees", 3),
+        ("/api/v1/employees/7", 3),
+        ("/api/v1/employees/search?date_of_birth=1990-01-01", 3),
+        (
+            "/api/v1/employees/search?date_of_birth=1990-01-01"
+            "&date_for_interval=2000-01-01",
+            3,
+        ),
+        (
+            "/api/v1/departments/3/employees/search?date_of_birth=1990-01-01"
+            "&date_for_interval=2000-01-01",
+            4,
+        ),
+        ("/api/v1/employees/search?birthday_from=01-01&birthday_to=12-31", 3),
+        # keyset pages
+        ("/api/v1/departments?limit=2&after=2", 4),
+        ("/api/v1/employees?limit=5&after=5", 3),
+        (
+            "/api/v1/employees?limit=5&sort=date_of_birth&after=5"
+            "&after_key=1990-03-01",
+            3,
+        ),
+        ("/api/v1/employees?department_id=3,4&fields=name,department", 3),
+        ("/api/v1/departments/3/employees?limit=2&after=10", 4),
+        ("/api/v1/employees?after=99999", 3),
+        # export
+        ("/api/v1/employees/export", 3),
+        ("/api/v1/employees/export?format=csv", 2),
+        # stats and distributions
+        ("/api/v1/stats", 5),
+        ("/api/v1/departments/3/stats", 5),
+        ("/api/v1/stats?percentiles=10,50,99&bucket_width=500", 5),
+    ],
+)
+def test_get_statements_count(client, more_data, sql_statements, url, max_statements):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(sql_statements) <= max_statements
+
+
+@pytest.mark.parametrize(
+    "method, url, data, max_statements",
+    [
+        ("post", "/api/v1/departments", {"name": "Dep 42"}, 6),
+        ("put", "/api/v1/departments/3", {"name": "Dep 42"}, 6),
+        ("patch", "/api/v1/departments/3", {"name": "Dep 42"}, 6),
+        ("delete", "/api/v1/departments/3", None, 7),
+        (
+            "post",
+            "/api/v1/employees",
+            {
+                "name": "Employee 42",
+                "date_of_birth": "1990-01-01",
+                "salary": 1000,
+                "department_id": 3,
+            },
+            6,
+        ),
+        ("patch", "/api/v1/employees/7", {"salary": 4200}, 7),
+        ("delete", "/api/v1/employees/7", None, 4),
+    ],
+)
+def test_write_statements_count(
+    client, more_data, sql_statements, method, url, data, max_statements
+):
+    response = getattr(client, method)(url, json=data)
+    assert response.status_code < 300
+    assert len(sql_statements) <= max_statements
+
+
+@pytest.mark.parametrize("count", [5, 200])
+def test_bulk_statements_count(client, more_data, sql_statements, count):
+    employee = {"date_of_birth": "1990-01-01", "salary": 1000}
+    data = {
+        "insert": [
+            dict(employee, name=f"Bulk Employee {number}", department_id=3 + number % 4)
+            for number in range(count)
+        ],
+        "upsert": [dict(employee, id=7, name="Upserted Employee", department_id=4)],
+        "delete": [8, 9, 10],
+    }
+    response = client.post("/api/v1/employees/bulk", json=data)
+    assert response.json["inserted"] == count
+    # the same statements whatever the number of items
+    assert len(sql_statements) <= 10
+
+
+@pytest.mark.parametrize(
+    "url, max_statements",
+    [
+        ("/departments", 2),
+        ("/departments/3", 6),
+        ("/departments/3/edit", 4),
+        ("/employees", 4),
+        ("/employees/7/edit/0", 6),
+        ("/employees/search?date_of_birth=1990-01-01&date_for_interval=2000-01-01", 2),
+    ],
+)
+def test_views_statements_count(client, more_data, sql_statements, url, max_statements):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(sql_statements) <= max_statements
+
+
+def test_not_modified_statements_count(client, more_data, sql_statements):
+    etag = client.get("/api/v1/employees").headers["ETag"]
+    sql_statements.clear()
+    response = client.get("/api/v1/employees", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(sql_statements) == 1
+
+
+def test_fields_statements_count(client, more_data, sql_statements):
+    response = client.get("/api/v1/employees?fields=name,salary")
+    assert response.status_code == 200
+    # the table versions and the projected columns, no salary stats
+    assert len(sql_statements) == 2
+    assert "JOIN" not in sql_statements[-1]
+
+
+def test_empty_page_statements_count(client, more_data, sql_statements):
+    response = client.get("/api/v1/departments?after=99999")
+    assert response.status_code == 200
+    assert response.json == []
+    # the table versions and the page of departments, no employees are loaded
+    assert len(sql_statements) == 2
+    assert not any("FROM employees" in statement for statement in sql_statements)
@@ -0,0 +1,117 @@
+# pylint: disable=C0116
+"""Module contains tests for the routing of reads to the read replicas"""
+import sqlite3
+import time
+
+import pytest
+
+from config import TestConfig
+from department_app import create_app
+from department_app.models import Department, db
+from department_app.models.insert_data import populate_db
+from department_app.replicas import STICKY_COOKIE
+from department_app.service import DepartmentServices
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary}"
+        DATABASE_REPLICA_URLS = [f"sqlite:///{replica}"]
+        CACHE_TYPE = "null"
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        populate_db()
+        with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+            source.backup(target)
+            # tells the databases apart
+            target.execute("UPDATE departments SET name = 'Replica' WHERE id = 1")
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+        app.extensions["replicas"].dispose()
+
+
+def test_get_reads_from_replica(replica_app):
+    client = replica_app.test_client()
+    response = client.get("/api/v1/departments/1")
+    assert response.json["name"] == "Replica"
+    assert STICKY_COOKIE not in response.headers.get("Set-Cookie", "")
+
+
+def test_write_goes_to_primary_and_sticks(replica_app):
+    client = replica_app.test_client()
+    response = client.post("/api/v1/departments", json={"name": "Dep 3"})
+    assert response.status_code == 201
+    assert STICKY_COOKIE in response.headers["Set-Cookie"]
+    # the client reads its write from the primary
+    assert len(client.get("/api/v1/departments").json) == 3
+    assert client.get("/api/v1/departments/1").json["name"] == "Dep 1"
+
+    # other clients read from the replica after the write window of the process
+    replica_app.extensions["replicas"].last_write = 0
+    other = replica_app.test_client()
+    assert len(other.get("/api/v1/departments").json) == 2
+
+
+def test_write_of_get_request_sticks(replica_app):
+    client = replica_app.test_client()
+    # the html views delete with GET requests
+    response = client.get("/departments/1/delete")
+    assert response.status_code == 302
+    assert STICKY_COOKIE in response.headers["Set-Cookie"]
+    assert client.get("/api/v1/departments/1").status_code == 404
+
+
+def test_writing_get_views_read_primary(replica_app):
+    client = replica_app.test_client()
+    client.patch("/api/v1/employees/1", json={"salary": 5000})
+    created = client.post(
+        "/api/v1/employees",
+        json={
+            "name": "New Employee",
+            "date_of_birth": "1990-01-01",
+            "salary": 700,
+            "department_id": 2,
+        },
+    ).json
+    # the replica has neither write, other clients delete both
+    for emp_id in (created["id"], 1):
+        replica_app.extensions["replicas"].last_write = 0
+        other = replica_app.test_client()
+        response = other.get(f"/employees/{emp_id}/delete", follow_redirects=True)
+        assert b"deleted successfully" in response.data
+    assert DepartmentServices.check_stats() == []
+
+
+def test_sticky_window_ends(replica_app):
+    client = replica_app.test_client()
+    client.set_cookie("localhost", STICKY_COOKIE, str(time.time() + 60))
+    assert client.get("/api/v1/departments/1").json["name"] == "Dep 1"
+    client.set_cookie("localhost", STICKY_COOKIE, str(time.time() - 1))
+    assert client.get("/api/v1/departments/1").json["name"] == "Replica"
+
+
+def test_failed_write_does_not_stick(replica_app):
+    client = replica_app.test_client()
+    response = client.post("/api/v1/departments", json={"title": "Dep 3"})
+    assert response.status_code == 400
+    assert STICKY_COOKIE not in response.headers.get("Set-Cookie", "")
+    assert client.get("/api/v1/departments/1").json["name"] == "Replica"
+
+
+def test_session_writes_to_primary(replica_app):
+    with replica_app.test_request_context("/api/v1/departments"):
+        replica_app.preprocess_request()
+        assert db.session.query(Department.name).filter_by(id=1).scalar() == "Replica"
+        db.session.execute(
+            Department.__table__.update().where(Department.id == 1).values(name="Dep 0")
+        )
+        db.session.commit()
+    with replica_app.test_request_context("/api/v1/departments", method="POST"):
+        replica_app.preprocess_request()
+        assert db.session.query(Department.name).filter_by(id=1).scalar() == "Dep 0"
@@ -0,0 +1,63 @@
+# pylint: disable=C0116
+"""Module contains tests for the JSON representation of the REST-API responses."""
+import json
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from department_app.rest.representations import ENCODERS, output_json
+
+DATA = [
+    OrderedDict([("name", "Employee"), ("date_of_birth", date(1990, 1, 2))]),
+    {"errors": {0: ["Not valid."]}, "avg_salary": Decimal("1000.5"), "ok": None},
+    {"name": "Ольга Żółć"},
+]
+
+
+@pytest.mark.parametrize("name", sorted(ENCODERS))
+def test_encoders_produce_the_same_json(name):
+    body = ENCODERS[name](DATA)
+    assert body == ENCODERS["json"](DATA)
+    assert ENCODERS[name](DATA, indent=2) == ENCODERS["json"](DATA, indent=2)
+    assert body.endswith(b"\n")
+    assert json.loads(body)[:2] == [
+        {"name": "Employee", "date_of_birth": "1990-01-02"},
+        {"errors": {"0": ["Not valid."]}, "avg_salary": 1000.5, "ok": None},
+    ]
+    # non-ASCII characters are written as UTF-8, not escaped
+    assert "Ольга Żółć".encode() in body
+
+
+@pytest.mark.parametrize("name", sorted(ENCODERS))
+def test_encoders_reject_unknown_types(name):
+    with pytest.raises(TypeError):
+        ENCODERS[name]({"value": object()})
+
+
+def test_output_json(app):
+    response = output_json(DATA, 201, {"X-Test": "1"})
+    assert response.status_code == 201
+    assert response.mimetype == "application/json"
+    assert response.headers["X-Test"] == "1"
+    assert response.data == ENCODERS["auto"](DATA)
+
+
+def test_output_json_indented_in_debug_mode(app):
+    app.debug = True
+    assert b'\n    "name": "Employee"' in output_json(DATA, 200).data
+
+
+def test_output_json_unknown_encoder(app):
+    app.config["API_JSON_ENCODER"] = "wrong"
+    with pytest.raises(ValueError):
+        output_json(DATA, 200)
+
+
+def test_api_uses_configured_encoder(app, client):
+    app.config["API_JSON_ENCODER"] = "json"
+    body = client.get("/api/v1/employees/1").data
+    app.config["API_JSON_ENCODER"] = "auto"
+    app.extensions["cache"].clear()
+    assert client.get("/api/v1/employees/1").data == body
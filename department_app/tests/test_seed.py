@@ -0,0 +1,75 @@
+# pylint: disable=W0613
+# pylint: disable=C0116
+"""Module contains tests for the data generator and the "flask seed" command."""
+import pytest
+
+from department_app.models import Department, Employee
+from department_app.models.insert_data import clear_db, seed_db
+from department_app.service import DepartmentServices, EmployeeServices
+
+
+def dump_employees():
+    return [
+        (emp.name, emp.date_of_birth, emp.salary, emp.department.name)
+        for emp in Employee.query.order_by(Employee.id)
+    ]
+
+
+def test_seed_db_counts(app):
+    stats = seed_db(departments=3, employees=25, seed=1, chunk_size=10)
+    assert stats["departments"][0] == 3
+    assert stats["employees"][0] == 25
+    assert len(DepartmentServices.get_all()) == 5
+    assert len(EmployeeServices.get_all()) == 30
+
+
+def test_seed_db_is_deterministic(app):
+    clear_db()
+    seed_db(departments=3, employees=20, seed=42)
+    first = dump_employees()
+    clear_db()
+    seed_db(departments=3, employees=20, seed=42, chunk_size=7)
+    assert dump_employees() == first
+    clear_db()
+    seed_db(departments=3, employees=20, seed=43)
+    assert dump_employees() != first
+
+
+def test_seed_db_reports_progress(app):
+    reports = []
+    seed_db(3, 25, chunk_size=10, report=lambda *args: reports.append(args[:2]))
+    assert reports == [
+        ("departments", 3),
+        ("employees", 10),
+        ("employees", 20),
+        ("employees", 25),
+    ]
+
+
+def test_seed_db_employees_without_departments(app):
+    with pytest.raises(ValueError):
+        seed_db(departments=0, employees=5)
+
+
+def test_clear_db(app):
+    clear_db()
+    assert Department.query.count() == 0
+    assert Employee.query.count() == 0
+
+
+def test_seed_command(app):
+    result = app.test_cli_runner().invoke(
+        args=["seed", "--departments", "2", "--employees", "7", "--clear"]
+    )
+    assert result.exit_code == 0
+    assert "employees: 7 rows in" in result.output
+    assert "rows/s" in result.output
+    assert Employee.query.count() == 7
+
+
+def test_seed_command_not_empty_db(app):
+    departments = Department.query.count()
+    result = app.test_cli_runner().invoke(args=["seed", "--departments", "2"])
+    assert result.exit_code == 1
+    assert "database is not empty, use --clear" in result.output
+    assert Department.query.count() == departments
@@ -0,0 +1,97 @@
+# pylint: disable=W0613
+# pylint: disable=C0116
+"""
+Module contains parity tests of the fast serializers against
+the marshmallow schemas: both should produce the same json.
+"""
+import json
+
+import pytest
+
+from department_app.models.insert_data import seed_db
+from department_app.rest.representations import get_encoder
+from department_app.rest.schemas import DepartmentSchema, EmployeeSchema
+from department_app.rest.serializers import (
+    serialize_departments,
+    serialize_employees,
+)
+from department_app.service import (
+    EMPLOYEE_FIELDS,
+    WITH_DEPARTMENT,
+    WITH_EMPLOYEES,
+    DepartmentServices,
+    EmployeeServices,
+)
+
+
+@pytest.fixture
+def seeded(app):
+    seed_db(departments=12, employees=300, seed=7)
+    DepartmentServices.create({"name": "Empty Department"})
+
+
+def test_employees_parity(seeded):
+    stats = DepartmentServices.get_salary_stats()
+    expected = EmployeeSchema(context={"salary_stats": stats}).dump(
+        EmployeeServices.get_all(options=[WITH_DEPARTMENT]), many=True
+    )
+    rows = EmployeeServices.get_fields(EMPLOYEE_FIELDS)
+    assert json.dumps(serialize_employees(rows, stats)) == json.dumps(expected)
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        ["id"],
+        ["salary", "name"],
+        ["department", "date_of_birth"],
+        ["date_of_birth", "id", "department", "salary", "name"],
+    ],
+)
+def test_employee_fields_parity(seeded, fields):
+    stats = DepartmentServices.get_salary_stats()
+    expected = EmployeeSchema(only=fields, context={"salary_stats": stats}).dump(
+        EmployeeServices.get_all(options=[WITH_DEPARTMENT]), many=True
+    )
+    rows = EmployeeServices.get_fields(fields)
+    assert json.dumps(serialize_employees(rows, stats, fields)) == json.dumps(
+        expected
+    )
+
+
+def test_departments_parity(seeded):
+    stats = DepartmentServices.get_salary_stats()
+    expected = DepartmentSchema(context={"salary_stats": stats}).dump(
+        DepartmentServices.get_all(options=[WITH_EMPLOYEES]), many=True
+    )
+    employees = {}
+    for row in EmployeeServices.get_fields(("id", "name", "date_of_birth", "salary")):
+        employees.setdefault(row.department_id, []).append(row)
+    result = serialize_departments(DepartmentServices.get_rows(), stats, employees)
+    assert json.dumps(result) == json.dumps(expected)
+    assert result[-1]["employees"] == [] and result[-1]["avg_salary"] == 0
+
+
+def test_departments_endpoint_keeps_schema_output(client, seeded):
+    response = client.get("/api/v1/departments")
+    expected = DepartmentSchema(
+        context={"salary_stats": DepartmentServices.get_salary_stats()}
+    ).dump(DepartmentServices.get_all(options=[WITH_EMPLOYEES]), many=True)
+    assert response.data == get_encoder()(expected)
+
+
+@pytest.mark.parametrize(
+    "url, dep_id",
+    [("/api/v1/employees?limit=1000", None), ("/api/v1/departments/3/employees", 3)],
+)
+def test_employees_endpoints_keep_schema_output(client, seeded, url, dep_id):
+    response = client.get(url)
+    employees = [
+        employee
+        for employee in EmployeeServices.get_all(options=[WITH_DEPARTMENT])
+        if dep_id is None or employee.department_id == dep_id
+    ]
+    expected = EmployeeSchema(
+        context={"salary_stats": DepartmentServices.get_salary_stats()}
+    ).dump(employees, many=True)
+    assert response.data == get_encoder()(expected)
@@ -0,0 +1,129 @@
+# pylint: disable=C0116
+"""Module contains tests for SalaryStatsAPI and the salary distributions"""
+import random
+
+import pytest
+
+from department_app.service import distributions
+from department_app.service.distributions import (
+    compute_percentiles,
+    get_percentiles_streamed,
+)
+
+
+def interpolate(values, percentiles):
+    """The reference percentiles: percentile_cont of sorted values."""
+    result = []
+    for percentile in percentiles:
+        rank = (len(values) - 1) * percentile / 100
+        low = int(rank)
+        high = min(low + 1, len(values) - 1)
+        result.append(values[low] + (values[high] - values[low]) * (rank - low))
+    return result
+
+
+def add_employees(client, dep_id, salaries):
+    for salary in salaries:
+        data = {"name": "New Employee", "date_of_birth": "1994-04-05", "salary": salary}
+        client.post(f"/api/v1/departments/{dep_id}/employees", json=data)
+
+
+def test_stats_get_all(client):
+    response = client.get("/api/v1/stats")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json] == [1, 2]
+    assert response.json[1] == {
+        "id": 2,
+        "name": "Dep 2",
+        "headcount": 3,
+        "avg_salary": 2000.0,
+        "min_salary": 2000,
+        "max_salary": 2000,
+        "percentiles": {"p50": 2000.0, "p90": 2000.0},
+        "histogram": {
+            "bucket_width": 1000,
+            "buckets": [{"min": 2000, "max": 3000, "count": 3}],
+        },
+    }
+
+
+def test_stats_get_with_id(client):
+    add_employees(client, 1, [1500, 3999, 4000])
+    response = client.get(
+        "/api/v1/departments/1/stats?percentiles=0,25,50,99.9&bucket_width=1000"
+    )
+    assert response.status_code == 200
+    assert response.json["percentiles"] == {
+        "p0": 1000.0,
+        "p25": 1000.0,
+        "p50": 1500.0,
+        "p99.9": pytest.approx(3999.996),
+    }
+    assert response.json["histogram"]["buckets"] == [
+        {"min": 1000, "max": 2000, "count": 3},
+        {"min": 2000, "max": 3000, "count": 0},
+        {"min": 3000, "max": 4000, "count": 1},
+        {"min": 4000, "max": 5000, "count": 1},
+    ]
+
+
+def test_stats_of_department_without_employees(client):
+    client.post("/api/v1/departments", json={"name": "Dep 3"})
+    response = client.get("/api/v1/departments/3/stats")
+    assert response.json["headcount"] == 0
+    assert response.json["percentiles"] == {"p50": None, "p90": None}
+    assert response.json["histogram"]["buckets"] == []
+
+
+def test_stats_get_with_nonexistent_id(client):
+    response = client.get("/api/v1/departments/42/stats")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "query", ["percentiles=x", "percentiles=101", "percentiles=", "bucket_width=0"]
+)
+def test_stats_wrong_parameters(client, query):
+    response = client.get(f"/api/v1/stats?{query}")
+    assert response.status_code == 400
+
+
+def test_stats_too_many_buckets(app, client):
+    app.config["SALARY_HISTOGRAM_MAX_BUCKETS"] = 500
+    add_employees(client, 2, [2500])
+    assert client.get("/api/v1/stats?bucket_width=2").status_code == 200
+    response = client.get("/api/v1/stats?bucket_width=1")
+    assert response.status_code == 400
+    assert "500 buckets" in response.json["message"]
+
+
+def test_stats_cached_per_data_version(client):
+    first = client.get("/api/v1/departments/1/stats")
+    assert client.get("/api/v1/departments/1/stats").headers["X-Cache"] == "HIT"
+    response = client.get(
+        "/api/v1/departments/1/stats", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    add_employees(client, 1, [5000])
+    response = client.get("/api/v1/departments/1/stats")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json["headcount"] == 3
+
+
+def test_streamed_percentiles(app, monkeypatch):
+    monkeypatch.setattr(distributions, "STREAM_BATCH_SIZE", 2)
+    assert get_percentiles_streamed([50, 90]) == {
+        1: [1000.0, 1000.0],
+        2: [2000.0, 2000.0],
+    }
+
+
+@pytest.mark.parametrize("size", [1, 2, 101, 1000])
+def test_percentiles_match_reference(size):
+    rng = random.Random(size)
+    values = sorted(rng.randrange(500, 10000) for _ in range(size))
+    percentiles = [0, 10, 37.5, 50, 90, 99.9, 100]
+    result = compute_percentiles(iter(values), percentiles)
+    assert result == pytest.approx(interpolate(values, percentiles))
+    assert all(isinstance(value, float) for value in result)
+    assert compute_percentiles([1, 2, 3, 4], [50, 90]) == pytest.approx([2.5, 3.7])
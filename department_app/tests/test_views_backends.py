@@ -0,0 +1,116 @@
+# pylint: disable=W0613
+# pylint: disable=C0116
+"""Module contains tests for the views data-access backends."""
+import time
+
+import pytest
+import requests
+from flask import g
+
+from department_app.instrumentation import RequestStats
+from department_app.views.backends import HttpBackend, ServiceBackend, get_backend
+from department_app.views.client import ApiClient
+
+
+def test_get_backend_default(app):
+    assert isinstance(get_backend(), ServiceBackend)
+
+
+def test_get_backend_http(app):
+    app.config["VIEWS_BACKEND"] = "http"
+    app.config["API_BASE_URL"] = "http://api:8000/"
+    app.config["API_CLIENT_POOL_SIZE"] = 8
+    app.extensions.pop("views_backend", None)
+    backend = get_backend()
+    assert isinstance(backend, HttpBackend)
+    assert backend.client.base_url == "http://api:8000"
+    assert backend.client.session.get_adapter("http://api:8000")._pool_maxsize == 8
+    assert get_backend() is backend
+
+
+def test_api_client_timeouts_and_retries(app):
+    app.config["API_CLIENT_CONNECT_TIMEOUT"] = 1
+    app.config["API_CLIENT_READ_TIMEOUT"] = 5
+    app.config["API_CLIENT_RETRIES"] = 3
+    client = ApiClient.from_config(app.config)
+    assert client.timeout == (1, 5)
+    assert client.session.get_adapter("https://api").max_retries.total == 3
+
+
+def test_service_backend_get_departments(app):
+    departments = ServiceBackend().get_departments()
+    assert [dep["name"] for dep in departments] == ["Dep 1", "Dep 2"]
+    assert [dep["avg_salary"] for dep in departments] == [1000, 2000]
+
+
+def test_service_backend_get_department_not_found(app):
+    result, status = ServiceBackend().get_department(42)
+    assert status == 404
+    assert "id 42 not found" in result["message"]
+
+
+def test_service_backend_create_department_duplicate_name(app):
+    backend = ServiceBackend()
+    result, status = backend.create_department({"name": "Dep 1"})
+    assert status == 400
+    assert result["message"] == "Department names should be unique."
+    assert len(backend.get_departments()) == 2
+
+
+def test_service_backend_create_employee_wrong_department(app):
+    data = {
+        "name": "New Employee",
+        "date_of_birth": "1999-01-01",
+        "salary": 100,
+        "department_id": 42,
+    }
+    result, status = ServiceBackend().create_employee(data)
+    assert status == 400
+    assert result["message"] == "Not valid department id"
+
+
+def test_service_backend_search_employees(app):
+    employees = ServiceBackend().search_employees("1992-01-01", "1994-01-01", 2)
+    assert [emp["name"] for emp in employees] == ["Employee 3"]
+
+
+def test_service_backend_matches_rest_api(app, client):
+    backend = ServiceBackend()
+    assert backend.get_employees() == client.get("/api/v1/employees").json
+    assert backend.get_employee(1)[0] == client.get("/api/v1/employees/1").json
+
+
+def test_http_backend_matches_service_backend(module_app, server):
+    time.sleep(2)
+    http_backend = HttpBackend(ApiClient.from_config(module_app.config))
+    service_backend = ServiceBackend()
+    assert http_backend.get_employees() == service_backend.get_employees()
+    assert http_backend.get_department_employees(1) == (
+        service_backend.get_department_employees(1)
+    )
+    http_department, status = http_backend.get_department(1)
+    assert status == 200
+    assert http_department["name"] == service_backend.get_department(1)[0]["name"]
+    assert http_backend.get_department(42)[1] == 404
+    assert http_backend.get_department_employees(42) == (
+        service_backend.get_department_employees(42)
+    )
+    with pytest.raises(requests.HTTPError):
+        http_backend.search_employees("1990-13-45")
+
+
+def test_http_backend_department_page(module_app, server):
+    http_backend = HttpBackend(ApiClient.from_config(module_app.config))
+    g.request_stats = stats = RequestStats()
+    departments, (department, status), employees = http_backend.get_department_page(2)
+    del g.request_stats
+    # the time the request waited for the concurrent calls
+    assert stats.timings["client"] > 0
+    assert [dep["id"] for dep in departments] == [1, 2]
+    assert status == 200
+    assert department["name"] == "Dep 2"
+    assert [emp["name"] for emp in employees] == [
+        "Employee 3",
+        "Employee 4",
+        "Employee 5",
+    ]
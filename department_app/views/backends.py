@@ -0,0 +1,327 @@
+"""
+Module contains the data-access backends used by the view functions.
+ServiceBackend (default) calls the service layer and the serializer schemas
+in-process, HttpBackend calls the REST-API over HTTP and is meant for
+deployments where the UI and the API run as separate services.
+Both backends return data in the same shape the REST-API does: lists of
+json-like dicts, or (data, status_code) tuples for calls that can fail.
+"""
+import atexit
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from department_app.aio import run_blocking
+from department_app.instrumentation import timed
+from department_app.rest.schemas import DepartmentSchema, EmployeeSchema
+from department_app.service import (
+    DepartmentServices,
+    EmployeeServices,
+    WITH_DEPARTMENT,
+)
+from department_app.views.client import ApiClient
+
+
+class ServiceBackend:
+    """Backend calling DepartmentServices and EmployeeServices directly."""
+
+    department_schema = DepartmentSchema()
+    employee_schema = EmployeeSchema()
+
+    @staticmethod
+    def _departments_schema(dep_ids=None):
+        """
+        Make a schema to dump departments without their employees lists
+        (the views never show them) with average salaries calculated in
+        one query.
+        """
+        return DepartmentSchema(
+            exclude=["employees"],
+            context={"salary_stats": DepartmentServices.get_salary_stats(dep_ids)},
+        )
+
+    @staticmethod
+    def _employees_schema(dep_ids=None):
+        """Make a schema to dump employees with their departments."""
+        return EmployeeSchema(
+            context={"salary_stats": DepartmentServices.get_salary_stats(dep_ids)}
+        )
+
+    def get_departments(self):
+        """:return: the list of all departments."""
+        departments = DepartmentServices.get_all()
+        return self._departments_schema().dump(departments, many=True)
+
+    def get_department(self, dep_id):
+        """:return: (department, 200) or (error message, 404)."""
+        department = DepartmentServices.get_by_id(dep_id)
+        if not department:
+            return {"message": f"Department with id {dep_id} not found"}, 404
+        return self._departments_schema([department.id]).dump(department), 200
+
+    def get_department_page(self, dep_id):
+        """
+        Get the data for the department detail page.
+        :return: a tuple (departments, (department, status), employees).
+        """
+        return (
+            self.get_departments(),
+            self.get_department(dep_id),
+            self.get_department_employees(dep_id),
+        )
+
+    def create_department(self, data):
+        """:return: (created department, 201) or (error message, 400)."""
+        try:
+            data = self.department_schema.load(data)
+        except ValidationError as e:
+            return e.messages, 400
+        try:
+            department = DepartmentServices.create(data)
+        except IntegrityError:
+            return {"message": "Department names should be unique."}, 400
+        return self._departments_schema([department.id]).dump(department), 201
+
+    def update_department(self, dep_id, data):
+        """:return: (updated department, 200) or (error message, 400/404)."""
+        department = DepartmentServices.get_by_id(dep_id)
+        if not department:
+            return {"message": f"Department with id {dep_id} not found"}, 404
+        try:
+            data = self.department_schema.load(data)
+        except ValidationError as e:
+            return e.messages, 400
+        try:
+            department = DepartmentServices.update(department, data)
+        except IntegrityError:
+            return {"message": "Department names should be unique."}, 400
+        return self._departments_schema([department.id]).dump(department), 200
+
+    @staticmethod
+    def delete_department(dep_id):
+        """:return: ("", 204) or (error message, 404)."""
+        department = DepartmentServices.get_by_id(dep_id)
+        if not department:
+            return {"message": f"Department with id {dep_id} not found"}, 404
+        DepartmentServices.delete(department)
+        return "", 204
+
+    def get_department_employees(self, dep_id):
+        """:return: the list of employees working in the department."""
+        employees = EmployeeServices.get_all_for_department(
+            dep_id, options=[WITH_DEPARTMENT]
+        )
+        return self._employees_schema([dep_id]).dump(employees, many=True)
+
+    def get_employees(self):
+        """:return: the list of all employees."""
+        employees = EmployeeServices.get_all(options=[WITH_DEPARTMENT])
+        return self._employees_schema().dump(employees, many=True)
+
+    def get_employee(self, emp_id):
+        """:return: (employee, 200) or (error message, 404)."""
+        employee = EmployeeServices.get_by_id(emp_id, options=[WITH_DEPARTMENT])
+        if not employee:
+            return {"message": f"Employee with id {emp_id} not found"}, 404
+        return self._employees_schema([employee.department_id]).dump(employee), 200
+
+    def create_employee(self, data):
+        """:return: (created employee, 201) or (error message, 400)."""
+        try:
+            data = self.employee_schema.load(data)
+        except ValidationError as e:
+            return {"message": e.messages}, 400
+        try:
+            employee = EmployeeServices.create(data)
+        except IntegrityError:
+            return {"message": "Not valid department id"}, 400
+        return self._employees_schema([employee.department_id]).dump(employee), 201
+
+    def update_employee(self, emp_id, data):
+        """:return: (updated employee, 200) or (error message, 400/404)."""
+        employee = EmployeeServices.get_by_id(emp_id)
+        if not employee:
+            return {"message": f"Employee with id {emp_id} not found"}, 404
+        try:
+            data = self.employee_schema.load(data)
+        except ValidationError as e:
+            return {"message": e.messages}, 400
+        try:
+            employee = EmployeeServices.update(employee, data)
+        except IntegrityError:
+            return {"message": "Not valid department id"}, 400
+        return self._employees_schema([employee.department_id]).dump(employee), 200
+
+    @staticmethod
+    def delete_employee(emp_id):
+        """:return: ("", 204) or (error message, 404)."""
+        employee = EmployeeServices.get_by_id(emp_id)
+        if not employee:
+            return {"message": f"Employee with id {emp_id} not found"}, 404
+        EmployeeServices.delete(employee)
+        return "", 204
+
+    def search_employees(self, date_of_birth, date_for_interval=None, dep_id=None):
+        """
+        :param date_of_birth: "%Y-%m-%d" string, the date or lower point of interval.
+        :param date_for_interval: "%Y-%m-%d" string, upper point of interval.
+        :param dep_id: search only among employees of this department if specified.
+        :return: the list of found employees.
+        """
+        if not date_of_birth:
+            return []
+        date_of_birth = datetime.strptime(date_of_birth, "%Y-%m-%d").date()
+        if date_for_interval:
+            date_for_interval = datetime.strptime(date_for_interval, "%Y-%m-%d").date()
+        if dep_id:
+            employees = EmployeeServices.get_by_date_of_birth_from_department(
+                dep_id, date_of_birth, date_for_interval, options=[WITH_DEPARTMENT]
+            )
+        else:
+            employees = EmployeeServices.get_by_date_of_birth(
+                date_of_birth, date_for_interval, options=[WITH_DEPARTMENT]
+            )
+        dep_ids = {employee.department_id for employee in employees}
+        return self._employees_schema(dep_ids).dump(employees, many=True)
+
+
+class HttpBackend:
+    """
+    Backend calling the REST-API over HTTP with a pooled keep-alive client.
+    Independent calls needed by one page are sent concurrently.
+    """
+
+    def __init__(self, client):
+        """
+        :param client: ApiClient instance to send the requests with.
+        """
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=client.pool_size)
+        atexit.register(self.close)
+
+    def close(self):
+        """Stop the threads of the executor and close the pooled connections."""
+        self.executor.shutdown(wait=False)
+        self.client.close()
+
+    def _get_list(self, url, params=None):
+        """
+        Get all pages of a REST-API list endpoint following the "Link" headers.
+        :return: the list of items, empty if the endpoint answers with 404
+        (e.g. the department does not exist) like the service backend.
+        :raise requests.HTTPError: if the endpoint answers with another error.
+        """
+        items = []
+        while url:
+            response = self.client.get(url, params=params)
+            if response.status_code == 404:
+                return []
+            response.raise_for_status()
+            items += response.json()
+            url, params = response.links.get("next", {}).get("url"), None
+        return items
+
+    @staticmethod
+    def _result(response):
+        """:return: (json data, status code) of the response."""
+        if response.status_code == 204:
+            return "", 204
+        return response.json(), response.status_code
+
+    def get_departments(self):
+        """:return: the list of all departments."""
+        return self._get_list("/api/v1/departments")
+
+    def get_department(self, dep_id):
+        """:return: (department, 200) or (error message, 404)."""
+        return self._result(self.client.get(f"/api/v1/departments/{dep_id}"))
+
+    def get_department_page(self, dep_id):
+        """
+        Get the data for the department detail page with concurrent requests.
+        The executor threads have no app context, so the time the request
+        waits for them is counted as its "client" time.
+        :return: a tuple (departments, (department, status), employees).
+        """
+        futures = (
+            self.executor.submit(self.get_departments),
+            self.executor.submit(self.get_department, dep_id),
+            self.executor.submit(self.get_department_employees, dep_id),
+        )
+        with timed("client"):
+            # in the ASGI mode the API may be served by the same event loop
+            run_blocking(wait, futures)
+        return tuple(future.result() for future in futures)
+
+    def create_department(self, data):
+        """:return: (created department, 201) or (error message, 400)."""
+        return self._result(self.client.post("/api/v1/departments", json=data))
+
+    def update_department(self, dep_id, data):
+        """:return: (updated department, 200) or (error message, 400/404)."""
+        return self._result(
+            self.client.put(f"/api/v1/departments/{dep_id}", json=data)
+        )
+
+    def delete_department(self, dep_id):
+        """:return: ("", 204) or (error message, 404)."""
+        return self._result(self.client.delete(f"/api/v1/departments/{dep_id}"))
+
+    def get_department_employees(self, dep_id):
+        """:return: the list of employees working in the department."""
+        return self._get_list(f"/api/v1/departments/{dep_id}/employees")
+
+    def get_employees(self):
+        """:return: the list of all employees."""
+        return self._get_list("/api/v1/employees")
+
+    def get_employee(self, emp_id):
+        """:return: (employee, 200) or (error message, 404)."""
+        return self._result(self.client.get(f"/api/v1/employees/{emp_id}"))
+
+    def create_employee(self, data):
+        """:return: (created employee, 201) or (error message, 400)."""
+        return self._result(self.client.post("/api/v1/employees", json=data))
+
+    def update_employee(self, emp_id, data):
+        """:return: (updated employee, 200) or (error message, 400/404)."""
+        return self._result(self.client.put(f"/api/v1/employees/{emp_id}", json=data))
+
+    def delete_employee(self, emp_id):
+        """:return: ("", 204) or (error message, 404)."""
+        return self._result(self.client.delete(f"/api/v1/employees/{emp_id}"))
+
+    def search_employees(self, date_of_birth, date_for_interval=None, dep_id=None):
+        """
+        :param date_of_birth: "%Y-%m-%d" string, the date or lower point of interval.
+        :param date_for_interval: "%Y-%m-%d" string, upper point of interval.
+        :param dep_id: search only among employees of this department if specified.
+        :return: the list of found employees.
+        """
+        params = {"date_of_birth": date_of_birth}
+        if date_for_interval:
+            params["date_for_interval"] = date_for_interval
+        if dep_id:
+            url = f"/api/v1/departments/{dep_id}/employees/search"
+        else:
+            url = "/api/v1/employees/search"
+        return self._get_list(url, params)
+
+
+def get_backend():
+    """
+    Get the views backend of the current application, selected by
+    the VIEWS_BACKEND config value ("service" or "http"). The backend
+    (and the connection pool of the http one) is shared by all requests.
+    """
+    backend = current_app.extensions.get("views_backend")
+    if backend is None:
+        if current_app.config["VIEWS_BACKEND"] == "http":
+            backend = HttpBackend(ApiClient.from_config(current_app.config))
+        else:
+            backend = ServiceBackend()
+        current_app.extensions["views_backend"] = backend
+    return backend
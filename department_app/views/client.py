@@ -0,0 +1,92 @@
+"""
+Module contains the HTTP client used by the views to call the REST-API
+when the UI and the API are deployed as separate services.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from department_app.aio import run_blocking
+from department_app.instrumentation import timed
+
+
+class ApiClient:
+    """
+    A keep-alive HTTP client for the REST-API. Connections are reused from
+    a pool shared by all threads of the process, every request has
+    a timeout, and idempotent requests are retried on connection errors
+    and 502/503/504 responses.
+    """
+
+    def __init__(self, base_url, pool_size=4, timeout=(3.05, 10), retries=2):
+        """
+        :param base_url: The url the REST-API is served at, e.g. "http://api:5000".
+        :param pool_size: The maximal number of kept-alive connections.
+        :param timeout: (connect timeout, read timeout) in seconds.
+        :param retries: The number of retries of failed idempotent requests.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.1,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"GET", "PUT", "DELETE"}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        """Make a client configured with the API_CLIENT_* values of app config."""
+        return cls(
+            config["API_BASE_URL"],
+            pool_size=config["API_CLIENT_POOL_SIZE"],
+            timeout=(
+                config["API_CLIENT_CONNECT_TIMEOUT"],
+                config["API_CLIENT_READ_TIMEOUT"],
+            ),
+            retries=config["API_CLIENT_RETRIES"],
+        )
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request to the REST-API.
+        :param method: HTTP method name.
+        :param url: A path relative to the base url (e.g. "/api/v1/employees")
+        or an absolute url (e.g. taken from a "Link" header).
+        :return: requests.Response instance.
+        """
+        if url.startswith("/"):
+            url = self.base_url + url
+        kwargs.setdefault("timeout", self.timeout)
+        with timed("client"):
+            # in the ASGI mode the event loop serves other requests meanwhile
+            return run_blocking(self.session.request, method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        """Send a PUT request."""
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """Send a DELETE request."""
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
@@ -1,34 +1,34 @@
 # pylint: disable=C0301
 """Module contains the view functions for departments."""
-import requests as client
 from flask import render_template, request, redirect, flash, url_for, abort
 from department_app.forms import DepartmentForm, EmployeeForm
+from department_app.replicas import read_primary
 from department_app.views import bp
-
-BASE_URL = "http://127.0.0.1:5000"
+from department_app.views.backends import get_backend
 
 
 @bp.route("/", methods=["GET", "POST"])
 @bp.route("/departments", methods=["GET", "POST"])
 def departments_list_view():
     """
-    On GET request obtains the list of departments from the REST-API and renders the
+    On GET request obtains the list of departments from the backend and renders the
     "departments_list.html" template with form to create a new department.
     On form submission validates the form data, if validation fails rerenders
-    the template with error messages. If valid data send in in a post request to the REST-API.
+    the template with error messages. If valid data passes it to the backend.
     If it returns status code 201 redirects to self and flashes a success message,
-    else flashes the API-sent error message.
+    else flashes the backend error message.
     """
+    backend = get_backend()
     form = DepartmentForm()
     if form.validate_on_submit():
         data = {"name": request.form["name"]}
-        response = client.post(f"{BASE_URL}/api/v1/departments", json=data)
-        if response.status_code == 201:
+        result, status = backend.create_department(data)
+        if status == 201:
             flash("Department created successfully.")
         else:
-            flash(response.json()["message"])
+            flash(result["message"])
         return redirect(url_for("views.departments_list_view"))
-    departments = client.get(f"{BASE_URL}/api/v1/departments").json()
+    departments = backend.get_departments()
     return render_template(
         "departments_list.html",
         departments=departments,
@@ -44,15 +44,14 @@ def department_detail_view(dep_id):
     working in the specified department and a form to add employees to it.
     If invalid dep_id passed in the url - aborts with 404 error.
     """
-    departments = client.get(f"{BASE_URL}/api/v1/departments").json()
+    page = get_backend().get_department_page(dep_id)
+    departments, (department, status), employees = page
+    if status == 404:
+        abort(404, description=department["message"])
     form = EmployeeForm(departments)
-    response = client.get(f"{BASE_URL}/api/v1/departments/{dep_id}")
-    if response.status_code == 404:
-        abort(404, description=response.json()["message"])
-    employees = client.get(f"{BASE_URL}/api/v1/departments/{dep_id}/employees").json()
     return render_template(
         "department_detail.html",
-        department=response.json(),
+        department=department,
         employees=employees,
         active="departments",
         form=form,
@@ -64,11 +63,12 @@ def department_detail_view(dep_id):
 def create_employee_for_department(dep_id):
     """Processes the form submission in "department_detail.html", validates the date,
     if invalid - redirects back with validation errors. If valid adds to the data
-    the department id and  posts it to the REST API. If response status code is 201 -
+    the department id and  passes it to the backend. If result status code is 201 -
     redirects to department_detail view with success massage. Else redirects with error
     message and the prefilled form.
     """
-    departments = client.get(f"{BASE_URL}/api/v1/departments").json()
+    backend = get_backend()
+    departments = backend.get_departments()
     form = EmployeeForm(departments, request.form, department_id=dep_id)
     if form.validate():
         data = {
@@ -77,15 +77,15 @@ def create_employee_for_department(dep_id):
             "salary": request.form["salary"],
             "department_id": dep_id,
         }
-        response = client.post(
-            f"{BASE_URL}/api/v1/departments/{dep_id}/employees", json=data
-        )
-        if response.status_code == 201:
+        result, status = backend.create_employee(data)
+        if status == 201:
             flash("Employee created successfully")
             return redirect(url_for("views.department_detail_view", dep_id=dep_id))
-        flash(response.json()["message"])
-    department = client.get(f"{BASE_URL}/api/v1/departments/{dep_id}").json()
-    employees = client.get(f"{BASE_URL}/api/v1/departments/{dep_id}/employees").json()
+        flash(result["message"])
+    department, status = backend.get_department(dep_id)
+    if status == 404:
+        abort(404, description=department["message"])
+    employees = backend.get_department_employees(dep_id)
     return render_template(
         "department_detail.html",
         department=department,
@@ -102,22 +102,23 @@ def department_edit(dep_id):
     On GET request renders the "departments_list.html" template with
     form filled with data of the department to edit, if invalid dep_id
     specified in url - aborts with 404 error. On form submitting validates
-    the data. If validation passes - PUTs data to REST API. If response code
+    the data. If validation passes - passes data to the backend. If result code
     is 200 redirects to departments_list_view with success message. Else -
     with error message and filled form.
     """
-    response = client.get(f"{BASE_URL}/api/v1/departments/{dep_id}")
-    if response.status_code == 404:
-        abort(404, description=response.json()["message"])
-    form = DepartmentForm(data=response.json())
+    backend = get_backend()
+    department, status = backend.get_department(dep_id)
+    if status == 404:
+        abort(404, description=department["message"])
+    form = DepartmentForm(data=department)
     if form.validate_on_submit():
         data = {"name": request.form["name"]}
-        response = client.put(f"{BASE_URL}/api/v1/departments/{dep_id}", json=data)
-        if response.status_code == 200:
+        result, status = backend.update_department(dep_id, data)
+        if status == 200:
             flash("Department updated successfully.")
             return redirect(url_for("views.departments_list_view"))
-        flash(response.json()["message"])
-    departments = client.get(f"{BASE_URL}/api/v1/departments").json()
+        flash(result["message"])
+    departments = backend.get_departments()
     return render_template(
         "departments_list.html",
         departments=departments,
@@ -127,16 +128,17 @@ def department_edit(dep_id):
 
 
 @bp.route("/departments/<int:dep_id>/delete")
+@read_primary
 def department_delete(dep_id):
     """
-    Performs a delete request to REST API with the department id.
-    If response code is 404 aborts with 404 error.
+    Deletes the department with the specified id through the backend.
+    If result code is 404 aborts with 404 error.
     Else - redirects to departments_list_view with "deleted successfully"
     message.
     """
-    response = client.delete(f"{BASE_URL}/api/v1/departments/{dep_id}")
-    if response.status_code == 404:
-        abort(404, description=response.json()["message"])
+    result, status = get_backend().delete_department(dep_id)
+    if status == 404:
+        abort(404, description=result["message"])
     else:
         flash("Department deleted successfully.")
     return redirect(url_for("views.departments_list_view"))
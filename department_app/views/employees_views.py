@@ -2,25 +2,25 @@
 """Module contains the view functions for employees."""
 from datetime import datetime
 
-import requests as client
 from flask import render_template, request, redirect, flash, url_for, abort
 from department_app.forms import EmployeeForm
+from department_app.replicas import read_primary
 from department_app.views import bp
-
-BASE_URL = "http://127.0.0.1:5000"
+from department_app.views.backends import get_backend
 
 
 @bp.route("/employees", methods=["GET", "POST"])
 def employees_list_view():
     """
-    On GET request obtains the list of employees from the REST-API and renders the
+    On GET request obtains the list of employees from the backend and renders the
     "employees_list.html" template with form to create a new employee.
     On form submission validates the form data, if validation fails rerenders
-    the template with error messages. If valid data send in in a post request to the REST-API.
+    the template with error messages. If valid data passes it to the backend.
     If it returns status code 201 redirects to self and flashes a success message,
-    else flashes the API-sent error message.
+    else flashes the backend error message.
     """
-    departments = client.get(f"{BASE_URL}/api/v1/departments").json()
+    backend = get_backend()
+    departments = backend.get_departments()
     form = EmployeeForm(departments)
     if form.validate_on_submit():
         data = {
@@ -29,12 +29,12 @@ def employees_list_view():
             "salary": request.form["salary"],
             "department_id": request.form["department_id"],
         }
-        response = client.post(f"{BASE_URL}/api/v1/employees", json=data)
-        if response.status_code == 201:
+        result, status = backend.create_employee(data)
+        if status == 201:
             flash("Employee created successfully")
             return redirect(url_for("views.employees_list_view"))
-        flash(response.json()["message"])
-    employees = client.get(f"{BASE_URL}/api/v1/employees").json()
+        flash(result["message"])
+    employees = backend.get_employees()
     return render_template(
         "employees_list.html", employees=employees, active="employees", form=form
     )
@@ -46,20 +46,20 @@ def employee_edit_view(emp_id, from_dep=0):
     On GET request renders the "employees_list.html" template with
     form filled with data of the employee to edit, if invalid emp_id
     specified in url - aborts with 404 error. On form submitting validates
-    the data. If validation passes - PUTs data to REST API. If response code
+    the data. If validation passes - passes data to the backend. If result code
     is 200 redirects  with success message. Else - with error message and filled
     form. The redirect point to employees list view or to a department detail
     view, depending on where the "Edit" was requested.
     """
-    response = client.get(f"{BASE_URL}/api/v1/employees/{emp_id}")
-    if response.status_code == 404:
-        abort(404, description=response.json()["message"])
-    response_data = response.json()
+    backend = get_backend()
+    response_data, status = backend.get_employee(emp_id)
+    if status == 404:
+        abort(404, description=response_data["message"])
     response_data["date_of_birth"] = datetime.strptime(
         response_data["date_of_birth"], "%Y-%m-%d"
     ).date()
     response_data["department_id"] = response_data["department"]["id"]
-    departments = client.get(f"{BASE_URL}/api/v1/departments").json()
+    departments = backend.get_departments()
     form = EmployeeForm(departments, data=response_data)
     if form.validate_on_submit():
         data = {
@@ -68,8 +68,8 @@ def employee_edit_view(emp_id, from_dep=0):
             "salary": request.form["salary"],
             "department_id": request.form["department_id"],
         }
-        response = client.put(f"{BASE_URL}/api/v1/employees/{emp_id}", json=data)
-        if response.status_code == 200:
+        result, status = backend.update_employee(emp_id, data)
+        if status == 200:
             flash("Employee updated successfully.")
             return (
                 redirect(url_for("views.employees_list_view"))
@@ -81,8 +81,8 @@ def employee_edit_view(emp_id, from_dep=0):
                     )
                 )
             )
-        flash(response.json()["message"])
-    employees = client.get(f"{BASE_URL}/api/v1/employees").json()
+        flash(result["message"])
+    employees = backend.get_employees()
     return render_template(
         "employees_list.html",
         employees=employees,
@@ -94,15 +94,16 @@ def employee_edit_view(emp_id, from_dep=0):
 
 
 @bp.route("/employees/<int:emp_id>/delete")
+@read_primary
 def employee_delete_view(emp_id):
     """
-    Performs a delete request to REST API with the employee id.
-    If response code is 404 aborts with 404 error.
+    Deletes the employee with the specified id through the backend.
+    If result code is 404 aborts with 404 error.
     Else - redirects to the previous url.
     """
-    response = client.delete(f"{BASE_URL}/api/v1/employees/{emp_id}/")
-    if response.status_code == 404:
-        abort(404, description=response.json()["message"])
+    result, status = get_backend().delete_employee(emp_id)
+    if status == 404:
+        abort(404, description=result["message"])
     else:
         flash("Employee deleted successfully.")
     return redirect(request.referrer)
@@ -113,44 +114,27 @@ def employee_delete_view(emp_id):
 def employees_search_view(dep_id=None):
     """
     Gets the "date_of_birth" and "date_for_interval"(if provided) query
-    parameters and makes a request to the REST API with them. Renders the
+    parameters and searches employees with them through the backend. Renders the
     "department_detail.html" or "employees_list.html" template (depending on
-    where is called from) with the list of employees obtained from API.
+    where is called from) with the list of found employees.
     If invalid dep_id specified in url - aborts with 404 error.
     """
+    backend = get_backend()
+    date_of_birth = request.args.get("date_of_birth")
+    date_for_interval = request.args.get("date_for_interval")
     if dep_id:
-        response = client.get(f"{BASE_URL}/api/v1/departments/{dep_id}")
-        if response.status_code == 404:
-            abort(404, description=response.json()["message"])
-        date_of_birth = request.args.get("date_of_birth")
-        date_for_interval = request.args.get("date_for_interval")
-        if date_for_interval:
-            employees = client.get(
-                f"{BASE_URL}/api/v1/departments/{dep_id}/employees/search?date_of_birth={date_of_birth}&date_for_interval={date_for_interval}"
-            ).json()
-        else:
-            employees = client.get(
-                f"{BASE_URL}/api/v1/departments/{dep_id}/employees/search?date_of_birth={date_of_birth}"
-            ).json()
+        department, status = backend.get_department(dep_id)
+        if status == 404:
+            abort(404, description=department["message"])
+        employees = backend.search_employees(date_of_birth, date_for_interval, dep_id)
         return render_template(
             "department_detail.html",
-            department=response.json(),
+            department=department,
             employees=employees,
             active="departments",
-            back_url=url_for(
-                "views.department_detail_view", dep_id=response.json()["id"]
-            ),
+            back_url=url_for("views.department_detail_view", dep_id=department["id"]),
         )
-    date_of_birth = request.args.get("date_of_birth")
-    date_for_interval = request.args.get("date_for_interval")
-    if date_for_interval:
-        employees = client.get(
-            f"{BASE_URL}/api/v1/employees/search?date_of_birth={date_of_birth}&date_for_interval={date_for_interval}"
-        ).json()
-    else:
-        employees = client.get(
-            f"{BASE_URL}/api/v1/employees/search?date_of_birth={date_of_birth}"
-        ).json()
+    employees = backend.search_employees(date_of_birth, date_for_interval)
     return render_template(
         "employees_list.html",
         employees=employees,
@@ -27,7 +27,7 @@ if [ ! -f department_app.db ]; then
 
 	echo "Populating database with test data"
 	sleep 1
-	python3 insert_data.py
+	flask seed
 fi
 
 echo "Running gunicorn..."
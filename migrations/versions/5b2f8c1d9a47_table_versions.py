@@ -0,0 +1,32 @@
+"""add table_versions
+
+Revision ID: 5b2f8c1d9a47
+Revises: e3ea0fef5b7d
+Create Date: 2026-10-18 10:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5b2f8c1d9a47"
+down_revision = "e3ea0fef5b7d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_versions = op.create_table(
+        "table_versions",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.bulk_insert(
+        table_versions,
+        [{"name": "departments", "version": 0}, {"name": "employees", "version": 0}],
+    )
+
+
+def downgrade():
+    op.drop_table("table_versions")
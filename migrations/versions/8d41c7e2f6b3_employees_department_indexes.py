@@ -0,0 +1,34 @@
+"""add employees department indexes
+
+Revision ID: 8d41c7e2f6b3
+Revises: 5b2f8c1d9a47
+Create Date: 2026-10-18 11:02:47.918204
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d41c7e2f6b3"
+down_revision = "5b2f8c1d9a47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_employees_department_id_date_of_birth",
+        "employees",
+        ["department_id", "date_of_birth"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_employees_department_id_salary",
+        "employees",
+        ["department_id", "salary"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_employees_department_id_salary", table_name="employees")
+    op.drop_index("ix_employees_department_id_date_of_birth", table_name="employees")
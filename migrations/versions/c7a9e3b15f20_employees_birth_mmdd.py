@@ -0,0 +1,44 @@
+"""add employees birth_mmdd
+
+Revision ID: c7a9e3b15f20
+Revises: 8d41c7e2f6b3
+Create Date: 2026-10-18 11:48:05.530771
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c7a9e3b15f20"
+down_revision = "8d41c7e2f6b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "employees", sa.Column("birth_mmdd", sa.SmallInteger(), nullable=True)
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "UPDATE employees "
+            "SET birth_mmdd = CAST(to_char(date_of_birth, 'MMDD') AS INTEGER)"
+        )
+    else:
+        op.execute(
+            "UPDATE employees "
+            "SET birth_mmdd = CAST(strftime('%m%d', date_of_birth) AS INTEGER)"
+        )
+    with op.batch_alter_table("employees") as batch_op:
+        batch_op.alter_column(
+            "birth_mmdd", existing_type=sa.SmallInteger(), nullable=False
+        )
+    op.create_index(
+        op.f("ix_employees_birth_mmdd"), "employees", ["birth_mmdd"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_employees_birth_mmdd"), table_name="employees")
+    with op.batch_alter_table("employees") as batch_op:
+        batch_op.drop_column("birth_mmdd")
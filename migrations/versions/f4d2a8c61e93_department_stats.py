@@ -0,0 +1,45 @@
+"""add department_stats
+
+Revision ID: f4d2a8c61e93
+Revises: c7a9e3b15f20
+Create Date: 2026-10-18 14:05:47.118392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "f4d2a8c61e93"
+down_revision = "c7a9e3b15f20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "department_stats",
+        sa.Column("department_id", sa.Integer(), nullable=False),
+        sa.Column("headcount", sa.Integer(), nullable=False),
+        sa.Column("salary_sum", sa.BigInteger(), nullable=False),
+        sa.Column("min_salary", sa.Integer(), nullable=True),
+        sa.Column("max_salary", sa.Integer(), nullable=True),
+        sa.Column("last_modified", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["department_id"], ["departments.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("department_id"),
+    )
+    op.execute(
+        "INSERT INTO department_stats (department_id, headcount, salary_sum, "
+        "min_salary, max_salary, last_modified) "
+        "SELECT departments.id, count(employees.id), "
+        "coalesce(sum(employees.salary), 0), min(employees.salary), "
+        "max(employees.salary), CURRENT_TIMESTAMP "
+        "FROM departments LEFT OUTER JOIN employees "
+        "ON employees.department_id = departments.id "
+        "GROUP BY departments.id"
+    )
+
+
+def downgrade():
+    op.drop_table("department_stats")
@@ -8,7 +8,7 @@ if [ ! -f flag.txt ]; then
 
 	echo "Populating database with test data"
 	sleep 1
-	python3 insert_data.py
+	flask seed
 	touch flag.txt
 fi
 
@@ -17,5 +17,5 @@ setup(
     ],
     include_package_data=True,
     zip_safe=False,
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks"]),
 )